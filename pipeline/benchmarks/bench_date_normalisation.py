@@ -0,0 +1,105 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise.dates import DateNormalizer
+
+
+def _legacy_normalize_date(value: str) -> str:
+    # Pre-engine implementation, kept here as the benchmark baseline.
+    v = (value or "").strip()
+    if not v:
+        return ""
+    if len(v) == 12 and v.isdigit():
+        return f"{v[6:8]}/{v[4:6]}/{v[0:4]}"
+    if len(v) == 8 and v.isdigit():
+        return f"{v[6:8]}/{v[4:6]}/{v[0:4]}"
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            d = datetime.strptime(v, fmt)
+            return d.strftime("%d/%m/%Y")
+        except ValueError:
+            continue
+    return v
+
+
+# (column, is DATE in the target catalog, value generator) for a FCEEXT/ADMITDISCH-like table.
+def _columns(rng: random.Random):
+    def ddmmyyyy() -> str:
+        return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1930, 2025)}"
+
+    def ccyymmdd() -> str:
+        return f"{rng.randint(2015, 2025)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+
+    def ccyymmddhhmm() -> str:
+        return ccyymmdd() + f"{rng.randint(0, 23):02d}{rng.randint(0, 59):02d}"
+
+    return [
+        ("PtDoB", True, ddmmyyyy),
+        ("AdmIntDate", True, ccyymmdd),
+        ("EpsActvDtimeInt", True, ccyymmddhhmm),
+        ("InternalPatientNumber", False, lambda: f"P{rng.randint(1, 10**7):07d}"),
+        ("Surname", False, lambda: rng.choice(["SMITH", "JONES", "TAYLOR", "BROWN", "WILLIAMS"])),
+        ("Specialty", False, lambda: rng.choice(["100", "101", "110", "300", "320"])),
+    ]
+
+
+def _time(label: str, fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the contract ETL date-normalisation engine.")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    cols = _columns(rng)
+    data: List[List[str]] = [[gen() for _, _, gen in cols] for _ in range(args.rows)]
+    hints = [is_date for _, is_date, _ in cols]
+    print(f"rows={args.rows} columns={len(cols)} cells={args.rows * len(cols)}")
+
+    def legacy():
+        for row in data:
+            [_legacy_normalize_date(v) for v in row]
+
+    engine = DateNormalizer()
+
+    def memo_only():
+        for row in data:
+            [engine.normalize(v) for v in row]
+
+    hinted = DateNormalizer()
+    plan = [hinted.normalize if is_date else str.strip for is_date in hints]
+
+    def memo_and_hints():
+        for row in data:
+            [fn(v) for fn, v in zip(plan, row)]
+
+    base = _time("legacy _normalize_date (every cell)", legacy)
+    memo = _time("DateNormalizer (every cell)", memo_only)
+    full = _time("DateNormalizer + column type hints", memo_and_hints)
+    print(f"speedup memo/fast paths: {base / memo:5.2f}x")
+    print(f"speedup with type hints: {base / full:5.2f}x")
+    print(f"cache: {hinted.cache_info()}")
+
+    sample = data[: min(len(data), 10000)]
+    mismatches = sum(
+        1 for row in sample for v, is_date in zip(row, hints) if is_date and engine.normalize(v) != _legacy_normalize_date(v)
+    )
+    print(f"date-column mismatches vs legacy (first {len(sample)} rows): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_HISTORY = ROOT / "reports" / "benchmarks" / "pipeline_scale_history.json"
+DEFAULT_BASELINE = ROOT / "reports" / "benchmarks" / "pipeline_scale_baseline.json"
+DEFAULT_MAX_REGRESSION_PCT = 20.0
+
+# Steps run in this order at every size; "generate" is recorded but not regression-gated.
+STEPS = ("generate", "build_contract_targets", "check_source_quality", "check_target_referential_integrity", "semantic_mapping")
+GATED_STEPS = STEPS[1:]
+
+# Files a workspace needs so every step runs against its own ROOT, never the repo's data.
+# They are refreshed on every run; only the generated mock_data is kept between runs.
+_WORKSPACE_COPY = ("pipeline", "schemas", "reports/mapping_contract.csv")
+# Generated data is reused while these are unchanged (and the size and seed match).
+_GENERATOR_INPUTS = (
+    "pipeline/generate_all_mock_data.py",
+    "schemas/target_schema_catalog.csv",
+    "schemas/source_schema_catalog.csv",
+)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _csv_rows(folder: Path) -> int:
+    from enterprise.io import count_csv_rows
+
+    return sum(count_csv_rows(p) for p in folder.glob("*.csv"))
+
+
+def _run_step(step: str, rows: int, seed: int, workers: int) -> Dict[str, object]:
+    """Run one step in this (child) process; units are what the step's throughput counts."""
+    ws = Path(__file__).resolve().parents[2]
+    source_dir = ws / "mock_data" / "source"
+    output_dir = ws / "mock_data" / "target_contract"
+    units_label = "rows"
+    start = time.perf_counter()
+    if step == "generate":
+        import generate_all_mock_data
+
+        sys.argv = ["generate_all_mock_data.py", "--rows", str(rows), "--seed", str(seed)]
+        generate_all_mock_data.main()
+        elapsed = time.perf_counter() - start
+        units, units_label = rows, "patients"
+    elif step == "build_contract_targets":
+        from enterprise.contract_etl import build_contract_targets
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        stats, _, _ = build_contract_targets(
+            root=ws,
+            source_dir=source_dir,
+            output_dir=output_dir,
+            contract_csv=ws / "reports" / "mapping_contract.csv",
+            target_catalog_csv=ws / "schemas" / "target_schema_catalog.csv",
+            crosswalk_dir=ws / "schemas" / "crosswalks",
+            impute_mode="pre_production",
+            workers=workers,
+        )
+        elapsed = time.perf_counter() - start
+        units, units_label = sum(s.rows_written for s in stats), "target rows"
+    elif step == "check_source_quality":
+        from enterprise.checks import check_source_quality
+
+        check_source_quality(source_dir, rows)
+        elapsed = time.perf_counter() - start
+        units, units_label = _csv_rows(source_dir), "source rows"
+    elif step == "check_target_referential_integrity":
+        from enterprise.checks import check_target_referential_integrity
+
+        check_target_referential_integrity(output_dir)
+        elapsed = time.perf_counter() - start
+        units, units_label = _csv_rows(output_dir), "target rows"
+    elif step == "semantic_mapping":
+        import analyze_semantic_mapping
+
+        (ws / "analysis").mkdir(exist_ok=True)
+        analyze_semantic_mapping.run()
+        elapsed = time.perf_counter() - start
+        # Catalog-driven, so this one should stay flat as patient counts grow.
+        with analyze_semantic_mapping.REPORT_CSV.open("rb") as f:
+            units, units_label = max(0, sum(1 for _ in f) - 1), "mapping rows"
+    else:
+        raise ValueError(f"Unknown step: {step}")
+    return {
+        "seconds": round(elapsed, 3),
+        "units": units,
+        "units_label": units_label,
+        "throughput": round(units / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _generator_key(rows: int, seed: int) -> str:
+    h = hashlib.sha256(f"{rows}:{seed}".encode("utf-8"))
+    for rel in _GENERATOR_INPUTS:
+        h.update((ROOT / rel).read_bytes())
+    return h.hexdigest()
+
+
+def _make_workspace(workdir: Path, rows: int, seed: int) -> Path:
+    ws = workdir / f"patients_{rows}_seed{seed}"
+    for rel in _WORKSPACE_COPY:
+        src, dst = ROOT / rel, ws / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.is_dir():
+            shutil.rmtree(dst)
+        if src.is_dir():
+            shutil.copytree(src, dst, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(src, dst)
+    return ws
+
+
+def _child(ws: Path, step: str, rows: int, seed: int, workers: int) -> Dict[str, object]:
+    script = ws / "pipeline" / "benchmarks" / Path(__file__).name
+    cmd = [sys.executable, str(script), "--step", step, "--rows", str(rows), "--seed", str(seed), "--workers", str(workers)]
+    out = subprocess.run(cmd, cwd=str(ws), capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{step} at {rows} patients failed:\n{out.stderr}")
+    # The step's own prints come first; the result is the last line.
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _load_json(path: Path, default):
+    if not path.exists():
+        return default
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _regressions(
+    results: List[Dict[str, object]], baseline: Dict[str, object], max_pct: float
+) -> List[Tuple[int, str, float, float, float]]:
+    base = {(r["rows"], r["step"]): r for r in baseline.get("results", [])}
+    out = []
+    for r in results:
+        prev = base.get((r["rows"], r["step"]))
+        if r["step"] not in GATED_STEPS or prev is None or not prev["throughput"]:
+            continue
+        drop = (prev["throughput"] - r["throughput"]) / prev["throughput"] * 100
+        if drop > max_pct:
+            out.append((r["rows"], r["step"], prev["throughput"], r["throughput"], round(drop, 1)))
+    return out
+
+
+def _parse_args():
+    p = argparse.ArgumentParser(
+        description="Time the migration pipeline at several patient counts and gate throughput against a saved baseline."
+    )
+    p.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated patient counts.")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--workers", type=int, default=1, help="Worker processes for build_contract_targets.")
+    p.add_argument(
+        "--workdir",
+        default="",
+        help="Folder for per-size workspaces; generated data there is reused by later runs (default: a temporary folder, removed afterwards). Generating 1M patients takes hours, so keep one.",
+    )
+    p.add_argument("--history", default=str(DEFAULT_HISTORY), help="JSON file every run is appended to.")
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="JSON file holding the run regressions are measured against.")
+    p.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    p.add_argument(
+        "--max-regression-pct",
+        type=float,
+        default=DEFAULT_MAX_REGRESSION_PCT,
+        help="Fail when a step's throughput drops by more than this against the baseline at the same size.",
+    )
+    p.add_argument("--step", choices=STEPS, help=argparse.SUPPRESS)
+    p.add_argument("--rows", type=int, default=0, help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def main():
+    args = _parse_args()
+    if args.step:
+        print(json.dumps(_run_step(args.step, args.rows, args.seed, max(1, args.workers))))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="pipeline_scale_"))
+    results: List[Dict[str, object]] = []
+    try:
+        for rows in sizes:
+            ws = _make_workspace(workdir, rows, args.seed)
+            marker = ws / "mock_data" / ".generated"
+            key = _generator_key(rows, args.seed)
+            for step in STEPS:
+                if step == "generate" and marker.exists() and marker.read_text(encoding="utf-8") == key:
+                    print(f"{rows:>9} {step:<36} reusing data in {ws}", flush=True)
+                    continue
+                r = _child(ws, step, rows, args.seed, max(1, args.workers))
+                if step == "generate":
+                    marker.write_text(key, encoding="utf-8")
+                results.append({"rows": rows, "step": step, **r})
+                rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}MB"
+                print(
+                    f"{rows:>9} {step:<36} {r['seconds']:9.2f}s {r['throughput']:>12,.0f} {r['units_label']}/s  rss {rss}",
+                    flush=True,
+                )
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    run = {
+        "run_at_utc": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": max(1, args.workers),
+        "seed": args.seed,
+        "results": results,
+    }
+    history_path = Path(args.history)
+    history = _load_json(history_path, [])
+    history.append(run)
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    history_path.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    print("History:", history_path)
+
+    baseline_path = Path(args.baseline)
+    baseline = _load_json(baseline_path, None)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(run, indent=2), encoding="utf-8")
+        print("Baseline saved:", baseline_path)
+    if baseline is None:
+        print("No baseline; regression check skipped.")
+        return
+    regressions = _regressions(results, baseline, args.max_regression_pct)
+    for rows, step, before, after, drop in regressions:
+        print(f"REGRESSION {step} at {rows} patients: {before:,.0f} -> {after:,.0f}/s ({drop}% slower)")
+    if regressions:
+        raise SystemExit(f"{len(regressions)} step(s) regressed by more than {args.max_regression_pct}%.")
+    print(f"No step regressed by more than {args.max_regression_pct}% against {baseline_path}.")
+
+
+if __name__ == "__main__":
+    main()
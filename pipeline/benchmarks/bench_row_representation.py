@@ -0,0 +1,138 @@
+import argparse
+import csv
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise.rows import HeaderIndex, SourceRowView, TargetRowView
+from enterprise.transform_plugins import DOMAIN_PLUGINS, compile_domain_plugins
+
+
+_SOURCE_FIELDS = ["InternalPatientNumber", "Forenames", "Surname", "Sex", "NHSNumber", "Postcode", "DateOfBirth"]
+
+
+def _target_headers(catalog: Path, table: str) -> List[str]:
+    headers: List[str] = []
+    with catalog.open(newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            if r["table_name"] == table and r["field_name"] not in headers:
+                headers.append(r["field_name"])
+    return headers
+
+
+class _GcClock:
+    """Counts collections and the time spent in them while active."""
+
+    def __init__(self):
+        self.collections = 0
+        self.seconds = 0.0
+        self._start = 0.0
+
+    def __call__(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.collections += 1
+            self.seconds += time.perf_counter() - self._start
+
+
+def _measure(label: str, fn: Callable[[], None]) -> Tuple[float, _GcClock]:
+    gc.collect()
+    clock = _GcClock()
+    gc.callbacks.append(clock)
+    start = time.perf_counter()
+    try:
+        fn()
+    finally:
+        gc.callbacks.remove(clock)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f}s  gc runs {clock.collections:>6}  gc time {clock.seconds:7.3f}s")
+    return elapsed, clock
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark dict rows against positional rows with slotted plugin views.")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--table", default="LOAD_PMI", help="Target table whose domain plugins are applied.")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument(
+        "--target-catalog",
+        default=str(Path(__file__).resolve().parents[2] / "schemas" / "target_schema_catalog.csv"),
+    )
+    args = p.parse_args()
+
+    headers = _target_headers(Path(args.target_catalog), args.table)
+    if not headers:
+        raise SystemExit(f"{args.table} not found in {args.target_catalog}")
+    rng = random.Random(args.seed)
+    source: List[Sequence[str]] = [
+        [f"P{n:07d}", "ann", "smith", rng.choice("12MF"), "943 476 5919", "ab1 2cd", "01/02/1980"]
+        for n in range(args.rows)
+    ]
+    # Every target column takes a source value; a stand-in for the compiled cell plan.
+    plan = [(lambda pos: lambda src, row_num: src[pos])(i % len(_SOURCE_FIELDS)) for i in range(len(headers))]
+    index = HeaderIndex(_SOURCE_FIELDS)
+    sink: List[List[str]] = []
+    print(f"table={args.table} columns={len(headers)} rows={args.rows}")
+
+    bound = [
+        (col, rule)
+        for plugin in DOMAIN_PLUGINS
+        if plugin.applies_to(args.table)
+        for col, rule in plugin.rules.items()
+        if col in headers
+    ]
+
+    def dict_rows():
+        # The previous loop: a dict per source row, a dict per target row, a list to write.
+        for i, src in enumerate(source, start=1):
+            source_row = dict(zip(_SOURCE_FIELDS, src))
+            row = dict(zip(headers, [cell(src, i) for cell in plan]))
+            for col, rule in bound:
+                row[col] = rule(row[col], row, source_row, i)
+            sink.append([row.get(h, "") for h in headers])
+            if len(sink) >= 1024:
+                sink.clear()
+
+    plugins = compile_domain_plugins(args.table, headers)
+
+    def positional_rows():
+        source_view = SourceRowView(index)
+        target_view = TargetRowView(HeaderIndex(headers))
+        for i, src in enumerate(source, start=1):
+            values = [cell(src, i) for cell in plan]
+            if plugins is not None:
+                source_view.values = src
+                target_view.values = values
+                plugins(target_view, source_view, i)
+            sink.append(values)
+            if len(sink) >= 1024:
+                sink.clear()
+
+    base, base_gc = _measure("dict rows", dict_rows)
+    new, new_gc = _measure("positional rows + slotted views", positional_rows)
+    print(f"speedup: {base / new:5.2f}x  gc runs {base_gc.collections} -> {new_gc.collections}")
+
+    mismatches = 0
+    source_view = SourceRowView(index)
+    target_view = TargetRowView(HeaderIndex(headers))
+    for i, src in enumerate(source[:10000], start=1):
+        row = dict(zip(headers, [cell(src, i) for cell in plan]))
+        for col, rule in bound:
+            row[col] = rule(row[col], row, dict(zip(_SOURCE_FIELDS, src)), i)
+        values = [cell(src, i) for cell in plan]
+        if plugins is not None:
+            source_view.values = src
+            target_view.values = values
+            plugins(target_view, source_view, i)
+        mismatches += [row[h] for h in headers] != values
+    print(f"mismatches (first {min(len(source), 10000)} rows): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
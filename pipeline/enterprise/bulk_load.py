@@ -0,0 +1,278 @@
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .io import read_csv
+from .output_formats import TableOutput
+
+
+# Rows per SQLite executemany call into a table's private staging file.
+SQLITE_BATCH_ROWS = 10000
+# CSV bytes buffered before each PostgreSQL COPY FROM STDIN round trip.
+COPY_BUFFER_BYTES = 8 * 1024 * 1024
+
+ColumnTypes = Dict[str, Dict[str, Tuple[str, str]]]
+
+
+def load_column_types(target_catalog_path: Path) -> ColumnTypes:
+    """Catalog (data_type, length) per target table and field."""
+    out: ColumnTypes = {}
+    for r in read_csv(target_catalog_path):
+        t = r.get("table_name", "")
+        f = r.get("field_name", "")
+        if t and f:
+            out.setdefault(t, {}).setdefault(f, ((r.get("data_type") or "").strip().upper(), (r.get("length") or "").strip()))
+    return out
+
+
+def _sqlite_type(data_type: str, length: str) -> str:
+    # SQLite has no length or date enforcement; affinity keeps numbers numeric.
+    return "NUMERIC" if data_type == "NUMBER" else "TEXT"
+
+
+def _postgres_type(data_type: str, length: str) -> str:
+    if data_type == "NUMBER":
+        return "numeric"
+    if data_type == "DATE":
+        return "date"
+    # CHAR is staged as varchar so loaded values are not blank-padded.
+    if data_type in {"VARCHAR2", "CHAR"} and length.isdigit() and int(length) > 0:
+        return f"varchar({int(length)})"
+    return "text"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _psycopg2():
+    try:
+        import psycopg2  # type: ignore
+    except Exception as ex:
+        raise NotImplementedError("PostgreSQL load dependency missing. Install psycopg2 to enable postgresql load targets.") from ex
+    return psycopg2
+
+
+class LoadTarget:
+    """Staging database that target tables are bulk-loaded into as they are written.
+
+    Only the URL, schema and catalog types are held, so the target can be handed to
+    worker processes; each table opens its own connection and loads in one transaction.
+    """
+
+    def __init__(self, url: str, column_types: ColumnTypes, schema: str = "public", typed: bool = True):
+        self.url = url
+        self.column_types = column_types
+        self.schema = schema or "public"
+        # The catalog is parsed from the target guide PDF; untyped staging takes every value as text.
+        self.typed = typed
+        if url.startswith("sqlite:///"):
+            self.kind = "sqlite"
+            self.path = Path(url[len("sqlite:///"):])
+        elif url.startswith(("postgresql://", "postgres://")):
+            self.kind = "postgresql"
+            self.path = None
+        else:
+            raise ValueError(f"Unsupported load target: {url} (use sqlite:///path or postgresql://...)")
+
+    @property
+    def display_name(self) -> str:
+        # Never echo PostgreSQL credentials into reports.
+        return f"sqlite:///{self.path}" if self.kind == "sqlite" else f"postgresql://.../{self.schema}"
+
+    def check(self) -> None:
+        """Fail before any table is built if the driver is missing or the database is unreachable."""
+        self._connect().close()
+
+    def _connect(self):
+        if self.kind == "sqlite":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Parallel workers queue on SQLite's single writer lock rather than failing; each
+            # table holds it only to copy its staged rows in. The connection may be handed to
+            # a background writer thread, one user at a time.
+            return sqlite3.connect(str(self.path), timeout=600, isolation_level=None, check_same_thread=False)
+        return _psycopg2().connect(self.url)
+
+    def _table_name(self, target_table: str) -> str:
+        if self.kind == "sqlite":
+            return _quote(target_table)
+        return f"{_quote(self.schema)}.{_quote(target_table)}"
+
+    def _create_sql(self, target_table: str, headers: List[str]) -> str:
+        types = self.column_types.get(target_table, {}) if self.typed else {}
+        to_type = _sqlite_type if self.kind == "sqlite" else _postgres_type
+        cols = ", ".join(f"{_quote(h)} {to_type(*types.get(h, ('', '')))}" for h in headers)
+        return f"CREATE TABLE {self._table_name(target_table)} ({cols})"
+
+    def open_table(self, target_table: str, headers: List[str]) -> "TableLoad":
+        if self.kind == "sqlite":
+            return SqliteTableLoad(self, target_table, headers)
+        return PostgresTableLoad(self, target_table, headers)
+
+    def count_rows(self, target_table: str) -> Optional[int]:
+        """Rows currently in the staging table, or None if it does not exist."""
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute(f"SELECT COUNT(*) FROM {self._table_name(target_table)}")
+            except Exception:
+                return None
+            return int(cur.fetchone()[0])
+        finally:
+            conn.close()
+
+
+class TableLoad(TableOutput):
+    """Row-oriented output into one staging table, (re)created from the catalog types.
+
+    Database errors do not abort the table build: the load is rolled back and the error
+    is kept in `error`. After commit, `rows_loaded` holds the table's verified row count.
+    """
+
+    def __init__(self, target: LoadTarget, target_table: str, headers: List[str]):
+        super().__init__(Path(target_table), headers)
+        self.target = target
+        self.target_table = target_table
+        self.rows_loaded: Optional[int] = None
+        self.error = ""
+        self._conn = None
+        self._cur = None
+        self._guard(self._begin)
+
+    def _guard(self, fn, *args) -> None:
+        if self.error:
+            return
+        try:
+            fn(*args)
+        except Exception as ex:
+            self.error = f"{type(ex).__name__}: {ex}".strip()
+            self._rollback()
+
+    def _begin(self) -> None:
+        self._conn = self.target._connect()
+        self._cur = self._conn.cursor()
+
+    def _rollback(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.rollback()
+        except Exception:
+            pass
+        self._conn.close()
+        self._conn = None
+
+    def write_rows(self, rows: List[List[str]]) -> None:
+        self._guard(self._load, rows)
+
+    def _load(self, rows: List[List[str]]) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self._guard(self._finish)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def abort(self) -> None:
+        # A failed build must not replace the loaded table with its partial rows.
+        self._rollback()
+
+
+class SqliteTableLoad(TableLoad):
+    """Rows are staged in a private SQLite file attached to the connection.
+
+    The database's writer lock is taken only in `_finish`, to replace the table with the
+    staged rows in one transaction, so parallel table builds do not wait on each other.
+    """
+
+    def _begin(self) -> None:
+        self._stage_path: Optional[Path] = None
+        super()._begin()
+        fd, name = tempfile.mkstemp(prefix=f".{self.target_table}.", suffix=".stage", dir=str(self.target.path.parent))
+        os.close(fd)
+        self._stage_path = Path(name)
+        self._cur.execute("ATTACH DATABASE ? AS stage", (name,))
+        self._cur.execute("PRAGMA stage.journal_mode=OFF")
+        self._cur.execute("PRAGMA stage.synchronous=OFF")
+        create = self.target._create_sql(self.target_table, self.headers)
+        self._cur.execute(create.replace("CREATE TABLE ", "CREATE TABLE stage.", 1))
+        self._cur.execute("BEGIN")
+        marks = ", ".join("?" for _ in self.headers)
+        self._insert = f"INSERT INTO stage.{self.target._table_name(self.target_table)} VALUES ({marks})"
+        self._pending: List[Sequence[str]] = []
+
+    def _load(self, rows: List[List[str]]) -> None:
+        # Empty strings become NULL so typed columns hold no blank text.
+        self._pending.extend([v if v != "" else None for v in r] for r in rows)
+        if len(self._pending) >= SQLITE_BATCH_ROWS:
+            self._cur.executemany(self._insert, self._pending)
+            self._pending = []
+
+    def _finish(self) -> None:
+        if self._pending:
+            self._cur.executemany(self._insert, self._pending)
+            self._pending = []
+        self._cur.execute("COMMIT")
+        table = self.target._table_name(self.target_table)
+        self._cur.execute("BEGIN IMMEDIATE")
+        self._cur.execute(f"DROP TABLE IF EXISTS main.{table}")
+        self._cur.execute(self.target._create_sql(self.target_table, self.headers))
+        self._cur.execute(f"INSERT INTO main.{table} SELECT * FROM stage.{table}")
+        self._cur.execute(f"SELECT COUNT(*) FROM main.{table}")
+        self.rows_loaded = int(self._cur.fetchone()[0])
+        self._cur.execute("COMMIT")
+
+    def _rollback(self) -> None:
+        super()._rollback()
+        self._drop_stage()
+
+    def close(self) -> None:
+        super().close()
+        self._drop_stage()
+
+    def _drop_stage(self) -> None:
+        if self._stage_path is not None:
+            self._stage_path.unlink(missing_ok=True)
+            self._stage_path = None
+
+
+class PostgresTableLoad(TableLoad):
+    def _begin(self) -> None:
+        super()._begin()
+        # Target dates are written DD/MM/YYYY.
+        self._cur.execute("SET LOCAL datestyle = 'ISO, DMY'")
+        self._cur.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(self.target.schema)}")
+        self._cur.execute(f"DROP TABLE IF EXISTS {self.target._table_name(self.target_table)}")
+        self._cur.execute(self.target._create_sql(self.target_table, self.headers))
+        cols = ", ".join(_quote(h) for h in self.headers)
+        # Unquoted empty CSV fields load as NULL.
+        self._copy = f"COPY {self.target._table_name(self.target_table)} ({cols}) FROM STDIN WITH (FORMAT csv)"
+        self._buffer = io.StringIO()
+        self._w = csv.writer(self._buffer, lineterminator="\n")
+
+    def _load(self, rows: List[List[str]]) -> None:
+        self._w.writerows(rows)
+        if self._buffer.tell() >= COPY_BUFFER_BYTES:
+            self._send()
+
+    def _send(self) -> None:
+        self._buffer.seek(0)
+        self._cur.copy_expert(self._copy, self._buffer)
+        self._buffer = io.StringIO()
+        self._w = csv.writer(self._buffer, lineterminator="\n")
+
+    def _finish(self) -> None:
+        if self._buffer.tell():
+            self._send()
+        self._cur.execute(f"SELECT COUNT(*) FROM {self.target._table_name(self.target_table)}")
+        self.rows_loaded = int(self._cur.fetchone()[0])
+        self._conn.commit()
@@ -1,10 +1,13 @@
-from collections import Counter
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
-from .io import read_csv
+from .io import count_csv_rows, iter_csv_records, read_csv
+from .key_index import DEFAULT_KEY_INDEX
 from .models import DataIssue
-from .validators import is_valid_date_ddmmyyyy, is_valid_nhs_number
+from .referential import check_referential_integrity
+from .rows import HeaderIndex
+from .validators import date_ddmmyyyy_mask, nhs_number_mask
 
 
 PHANTOM_FIELDS = {
@@ -30,63 +33,243 @@ def _issue(sev: str, cat: str, table: str, field: str, rec: str, msg: str) -> Da
     return DataIssue(severity=sev, category=cat, table_name=table, field_name=field, record_id=rec, message=msg)
 
 
+# Called with the 1-based row number and positional row of every row in a file.
+RowVisitor = Callable[[int, Sequence[str]], None]
+
+
+class SourceCheck:
+    """A source quality check run as a visitor during the single scan of the source folder.
+
+    `begin` is called as each file is opened and returns the function to call with every
+    (1-based row number, positional row) of that file, or None to skip the file.
+    `end_table` gets each file's data row count. `finish` is called once every file has
+    been scanned and returns the check's issues.
+    """
+
+    def begin(self, table: str, index: HeaderIndex) -> Optional[RowVisitor]:
+        return None
+
+    def end_table(self, table: str, rows: int) -> None:
+        pass
+
+    def finish(self) -> List[DataIssue]:
+        return []
+
+
+def _field(row: Sequence[str], pos: Optional[int]) -> str:
+    return row[pos].strip() if pos is not None else ""
+
+
+class RowCountCheck(SourceCheck):
+    def __init__(self, min_rows: int):
+        self.min_rows = min_rows
+        self.issues: List[DataIssue] = []
+
+    def end_table(self, table: str, rows: int) -> None:
+        if rows < self.min_rows:
+            self.issues.append(
+                _issue("ERROR", "SOURCE_ROW_COUNT", table, "", "", f"Row count {rows} is below required minimum {self.min_rows}.")
+            )
+
+    def finish(self) -> List[DataIssue]:
+        return self.issues
+
+
+class DuplicateKeyCheck(SourceCheck):
+    """Report key values that appear on more than one row of a table."""
+
+    def __init__(self, table: str, field: str, category: str, label: str):
+        self.table, self.field, self.category, self.label = table, field, category, label
+        self.counts: Dict[str, int] = {}
+
+    def begin(self, table: str, index: HeaderIndex) -> Optional[RowVisitor]:
+        if table != self.table:
+            return None
+        pos = index.positions.get(self.field)
+        counts = self.counts
+
+        def visit(row_num: int, row: Sequence[str]) -> None:
+            key = _field(row, pos)
+            counts[key] = counts.get(key, 0) + 1
+
+        return visit
+
+    def finish(self) -> List[DataIssue]:
+        return [
+            _issue("WARN", self.category, self.table, self.field, key, f"Duplicate {self.label} appears {n} times.")
+            for key, n in self.counts.items()
+            if key and n > 1
+        ]
+
+
+# (field, column validator, category, label); the validator maps a list of values to a list
+# of booleans, and a non-empty value it marks False is an ERROR.
+FieldRule = Tuple[str, Callable[[Sequence[str]], List[bool]], str, str]
+
+# Values collected per rule before they are validated as one column.
+FIELD_FORMAT_BATCH_ROWS = 65536
+
+
+class FieldFormatCheck(SourceCheck):
+    """Validate field formats of one table; issues come out in row order, rules in order per row."""
+
+    def __init__(self, table: str, rules: Sequence[FieldRule], batch_rows: int = FIELD_FORMAT_BATCH_ROWS):
+        self.table = table
+        self.rules = list(rules)
+        self.batch_rows = max(1, batch_rows)
+        self.issues: List[DataIssue] = []
+        # Per rule: the row numbers and non-empty values waiting to be validated.
+        self._pending: List[Tuple[List[int], List[str]]] = []
+
+    def begin(self, table: str, index: HeaderIndex) -> Optional[RowVisitor]:
+        if table != self.table:
+            return None
+        self._pending = [([], []) for _ in self.rules]
+        bound = [(index.positions.get(f), nums, values) for (f, _, _, _), (nums, values) in zip(self.rules, self._pending)]
+        batch_rows = self.batch_rows
+        flush = self._flush
+
+        def visit(row_num: int, row: Sequence[str]) -> None:
+            for pos, nums, values in bound:
+                v = _field(row, pos)
+                if v:
+                    nums.append(row_num)
+                    values.append(v)
+            if row_num % batch_rows == 0:
+                flush()
+
+        return visit
+
+    def _flush(self) -> None:
+        failed: List[Tuple[int, int, DataIssue]] = []
+        for rule_idx, ((f, ok, cat, label), (nums, values)) in enumerate(zip(self.rules, self._pending)):
+            for row_num, v, good in zip(nums, values, ok(values)):
+                if not good:
+                    failed.append((row_num, rule_idx, _issue("ERROR", cat, self.table, f, str(row_num), f"Invalid {label} '{v}'")))
+            nums.clear()
+            values.clear()
+        failed.sort(key=lambda x: (x[0], x[1]))
+        self.issues.extend(issue for _, _, issue in failed)
+
+    def end_table(self, table: str, rows: int) -> None:
+        if table == self.table:
+            self._flush()
+
+    def finish(self) -> List[DataIssue]:
+        return self.issues
+
+
+class ForeignKeyCheck(SourceCheck):
+    """Report child rows whose key is missing from the parent table's key column.
+
+    Parent keys are collected during the parent's pass; child keys are held (with their
+    row numbers) until the end, since the parent may be scanned after the child. Nothing
+    is reported unless both tables were scanned.
+    """
+
+    def __init__(self, child: str, child_field: str, parent: str, parent_field: str, label: str):
+        self.child, self.child_field = child, child_field
+        self.parent, self.parent_field = parent, parent_field
+        self.label = label
+        self.parent_keys: Optional[Set[str]] = None
+        self.child_keys: Optional[List[Tuple[int, str]]] = None
+
+    def begin(self, table: str, index: HeaderIndex) -> Optional[RowVisitor]:
+        if table == self.parent:
+            keys: Set[str] = set()
+            self.parent_keys = keys
+            pos = index.positions.get(self.parent_field)
+            return lambda row_num, row: keys.add(_field(row, pos))
+        if table == self.child:
+            found: List[Tuple[int, str]] = []
+            self.child_keys = found
+            pos = index.positions.get(self.child_field)
+
+            def visit(row_num: int, row: Sequence[str]) -> None:
+                key = _field(row, pos)
+                if key:
+                    found.append((row_num, key))
+
+            return visit
+        return None
+
+    def finish(self) -> List[DataIssue]:
+        if self.parent_keys is None or self.child_keys is None:
+            return []
+        parent_keys = self.parent_keys
+        return [
+            _issue(
+                "ERROR",
+                "SOURCE_REF_INTEGRITY",
+                self.child,
+                self.child_field,
+                str(row_num),
+                f"{self.label} '{key}' not found in {self.parent}.",
+            )
+            for row_num, key in self.child_keys
+            if key not in parent_keys
+        ]
+
+
+# Factories for the checks every source scan runs after the row count; each call returns a
+# check with fresh state. Register new checks here rather than adding passes over the files.
+SOURCE_CHECKS: List[Callable[[], SourceCheck]] = []
+
+
+def register_source_check(factory: Callable[[], SourceCheck]) -> Callable[[], SourceCheck]:
+    SOURCE_CHECKS.append(factory)
+    return factory
+
+
+register_source_check(partial(DuplicateKeyCheck, "PATDATA", "InternalPatientNumber", "SOURCE_DUPLICATE_MRN", "MRN"))
+register_source_check(
+    partial(
+        FieldFormatCheck,
+        "PATDATA",
+        [
+            ("NhsNumber", nhs_number_mask, "SOURCE_INVALID_NHS", "NHS number"),
+            ("PtDoB", date_ddmmyyyy_mask, "SOURCE_INVALID_DATE", "DOB"),
+        ],
+    )
+)
+register_source_check(partial(ForeignKeyCheck, "ADMITDISCH", "InternalPatientNumber", "PATDATA", "InternalPatientNumber", "MRN"))
+
+
+def scan_sources(source_dir: Path, checks: Sequence[SourceCheck]) -> List[DataIssue]:
+    """Stream every source CSV once, feeding each row to every check that visits its table."""
+    for p in sorted(source_dir.glob("*.csv")):
+        records = iter_csv_records(p)
+        index = HeaderIndex(next(records, None) or [])
+        visitors = [v for v in (c.begin(p.stem, index) for c in checks) if v is not None]
+        rows = 0
+        if visitors:
+            for rows, row in enumerate(records, start=1):
+                for visit in visitors:
+                    visit(rows, row)
+        else:
+            # No check reads this file's rows, so only count them.
+            records.close()
+            rows = count_csv_rows(p)
+        for c in checks:
+            c.end_table(p.stem, rows)
+    issues: List[DataIssue] = []
+    for c in checks:
+        issues.extend(c.finish())
+    return issues
+
+
 def check_source_quality(source_dir: Path, min_rows: int) -> List[DataIssue]:
     issues: List[DataIssue] = []
 
-    patdata_path = source_dir / "PATDATA.csv"
-    admit_path = source_dir / "ADMITDISCH.csv"
     required = ["PATDATA.csv", "ADMITDISCH.csv", "HWSAPP.csv", "AEA.csv"]
     for name in required:
         p = source_dir / name
         if not p.exists():
             issues.append(_issue("ERROR", "SOURCE_MISSING_TABLE", name.replace(".csv", ""), "", "", "Required source table is missing."))
 
-    for p in sorted(source_dir.glob("*.csv")):
-        rows = read_csv(p)
-        if len(rows) < min_rows:
-            issues.append(
-                _issue(
-                    "ERROR",
-                    "SOURCE_ROW_COUNT",
-                    p.stem,
-                    "",
-                    "",
-                    f"Row count {len(rows)} is below required minimum {min_rows}.",
-                )
-            )
-
-    if patdata_path.exists():
-        rows = read_csv(patdata_path)
-        mrn_counts = Counter((r.get("InternalPatientNumber") or "").strip() for r in rows)
-        for mrn, cnt in mrn_counts.items():
-            if mrn and cnt > 1:
-                issues.append(_issue("WARN", "SOURCE_DUPLICATE_MRN", "PATDATA", "InternalPatientNumber", mrn, f"Duplicate MRN appears {cnt} times."))
-
-        for idx, r in enumerate(rows, start=1):
-            nhs = (r.get("NhsNumber") or "").strip()
-            if nhs and not is_valid_nhs_number(nhs):
-                issues.append(_issue("ERROR", "SOURCE_INVALID_NHS", "PATDATA", "NhsNumber", str(idx), f"Invalid NHS number '{nhs}'"))
-            dob = (r.get("PtDoB") or "").strip()
-            if dob and not is_valid_date_ddmmyyyy(dob):
-                issues.append(_issue("ERROR", "SOURCE_INVALID_DATE", "PATDATA", "PtDoB", str(idx), f"Invalid DOB '{dob}'"))
-
-    if patdata_path.exists() and admit_path.exists():
-        p_rows = read_csv(patdata_path)
-        a_rows = read_csv(admit_path)
-        p_mrn = {(r.get("InternalPatientNumber") or "").strip() for r in p_rows}
-        for idx, r in enumerate(a_rows, start=1):
-            mrn = (r.get("InternalPatientNumber") or "").strip()
-            if mrn and mrn not in p_mrn:
-                issues.append(
-                    _issue(
-                        "ERROR",
-                        "SOURCE_REF_INTEGRITY",
-                        "ADMITDISCH",
-                        "InternalPatientNumber",
-                        str(idx),
-                        f"MRN '{mrn}' not found in PATDATA.",
-                    )
-                )
+    # One streaming pass per file, whatever the number of checks.
+    checks = [RowCountCheck(min_rows)] + [factory() for factory in SOURCE_CHECKS]
+    issues.extend(scan_sources(source_dir, checks))
     return issues
 
 
@@ -111,51 +294,9 @@ def check_mapping_contract(contract_csv: Path) -> List[DataIssue]:
     return issues
 
 
-def check_target_referential_integrity(target_dir: Path) -> List[DataIssue]:
-    issues: List[DataIssue] = []
-
-    def load(name: str) -> List[Dict[str, str]]:
-        p = target_dir / f"{name}.csv"
-        return read_csv(p) if p.exists() else []
-
-    def colset(rows: List[Dict[str, str]], col: str) -> Set[str]:
-        return {(r.get(col) or "").strip() for r in rows if (r.get(col) or "").strip()}
-
-    pmi = load("LOAD_PMI")
-    pmi_ids = load("LOAD_PMIIDS")
-    rtt_pathways = load("LOAD_RTT_PATHWAYS")
-    rtt_periods = load("LOAD_RTT_PERIODS")
-    rtt_events = load("LOAD_RTT_EVENTS")
-    opd_wl = load("LOAD_OPDWAITLIST")
-    opd_appt = load("LOAD_OPD_APPOINTMENTS")
-    iwl = load("LOAD_IWL")
-    adt_adm = load("LOAD_ADT_ADMISSIONS")
-    adt_eps = load("LOAD_ADT_EPISODES")
-    adt_ward = load("LOAD_ADT_WARDSTAYS")
-
-    checks = [
-        ("LOAD_PMIIDS", "loadpmi_record_number", "LOAD_PMI", "record_number", colset(pmi_ids, "loadpmi_record_number"), colset(pmi, "record_number")),
-        ("LOAD_RTT_PERIODS", "loadrttpwy_record_number", "LOAD_RTT_PATHWAYS", "record_number", colset(rtt_periods, "loadrttpwy_record_number"), colset(rtt_pathways, "record_number")),
-        ("LOAD_RTT_EVENTS", "loadrttprd_record_number", "LOAD_RTT_PERIODS", "record_number", colset(rtt_events, "loadrttprd_record_number"), colset(rtt_periods, "record_number")),
-        ("LOAD_OPDWAITLIST", "loadrttprd_record_number", "LOAD_RTT_PERIODS", "record_number", colset(opd_wl, "loadrttprd_record_number"), colset(rtt_periods, "record_number")),
-        ("LOAD_OPD_APPOINTMENTS", "loadowl_record_number", "LOAD_OPDWAITLIST", "record_number", colset(opd_appt, "loadowl_record_number"), colset(opd_wl, "record_number")),
-        ("LOAD_ADT_ADMISSIONS", "loadiwl_record_number", "LOAD_IWL", "record_number", colset(adt_adm, "loadiwl_record_number"), colset(iwl, "record_number")),
-        ("LOAD_ADT_EPISODES", "adt_adm_record_number", "LOAD_ADT_ADMISSIONS", "record_number", colset(adt_eps, "adt_adm_record_number"), colset(adt_adm, "record_number")),
-        ("LOAD_ADT_WARDSTAYS", "adt_eps_record_number", "LOAD_ADT_EPISODES", "record_number", colset(adt_ward, "adt_eps_record_number"), colset(adt_eps, "record_number")),
-    ]
-
-    for c_table, c_field, p_table, p_field, c_set, p_set in checks:
-        missing = sorted(c_set - p_set)
-        for m in missing[:200]:
-            issues.append(
-                _issue(
-                    "ERROR",
-                    "TARGET_REF_INTEGRITY",
-                    c_table,
-                    c_field,
-                    m,
-                    f"Key '{m}' not found in parent {p_table}.{p_field}.",
-                )
-            )
-    return issues
+def check_target_referential_integrity(
+    target_dir: Path, key_index: str = DEFAULT_KEY_INDEX, index_options: Optional[Dict[str, object]] = None
+) -> List[DataIssue]:
+    # FK edges come from the tables' column names; see referential.fk_parent.
+    return check_referential_integrity(target_dir, key_index=key_index, index_options=index_options)
 
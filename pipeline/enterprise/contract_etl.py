@@ -1,26 +1,44 @@
-import csv
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import asdict, dataclass, field, fields
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-from .crosswalks import apply_crosswalk, infer_crosswalk_name, load_crosswalks
-from .io import read_csv
-from .transform_plugins import apply_domain_plugins
-
-
-FK_FIELDS = {
-    "loadpmi_record_number",
-    "loadrttpwy_record_number",
-    "loadref_record_number",
-    "loadrttprd_record_number",
-    "loadowl_record_number",
-    "loadiwl_record_number",
-    "adt_adm_record_number",
-    "adt_eps_record_number",
-    "mh_dm_record_number",
-    "mh_cm_record_number",
-}
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .bulk_load import LoadTarget, TableLoad
+from .column_stats import TableProfiler
+from .crosswalks import CompiledCrosswalk, compile_crosswalks, infer_crosswalk_name, load_crosswalks
+from .dates import load_date_columns, normalize_date
+from .io import count_csv_rows, iter_csv_records, read_csv
+from .joins import (
+    JoinedLayout,
+    JoinIndexCache,
+    JoinSpec,
+    expands_matches,
+    join_rows,
+    resolve_key_positions,
+)
+from .manifest import MANIFEST_NAME, ContractManifest, FileHasher, code_version, hash_inputs
+from .output_formats import (
+    DEFAULT_OUTPUT_FORMAT,
+    TableOutput,
+    check_output_format,
+    find_table_file,
+    open_table_output,
+    output_path,
+    read_table_rows,
+)
+from .prefetch import BackgroundWriter, PrefetchIterator
+from .rows import HeaderIndex, SourceRowView, TargetRowView
+from .sampling import SampleSpec, SampledRows
+from .shards import ShardSpec, find_shard_dirs
+from .sinks import DEFAULT_REJECT_SAMPLE_CAP, IssueSink, RejectSink, TableRejects
+from .source_cache import DEFAULT_BUDGET_MB, SourceTableCache
+from .telemetry import StageTimer, TableClock, start_memory_trace, stop_memory_trace
+from .transform_plugins import compile_domain_plugins
+
 
 SOURCE_ID_CANDIDATES = [
     "InternalPatientNumber",
@@ -39,25 +57,17 @@ class TableRunStats:
     columns_total: int
     columns_populated: int
     mapped_fields: int
-
-
-def _normalize_date(value: str) -> str:
-    v = (value or "").strip()
-    if not v:
-        return ""
-    if len(v) == 12 and v.isdigit():
-        # CCYYMMDDHHMM -> DD/MM/YYYY
-        return f"{v[6:8]}/{v[4:6]}/{v[0:4]}"
-    if len(v) == 8 and v.isdigit():
-        # CCYYMMDD -> DD/MM/YYYY
-        return f"{v[6:8]}/{v[4:6]}/{v[0:4]}"
-    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
-        try:
-            d = datetime.strptime(v, fmt)
-            return d.strftime("%d/%m/%Y")
-        except ValueError:
-            continue
-    return v
+    reused: bool = False
+    rows_loaded: Optional[int] = None
+    elapsed_s: float = 0.0
+    peak_traced_kb: Optional[int] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    column_stats: List[Dict[str, object]] = field(default_factory=list)
+    # Set in sample runs: base source rows built, out of the rows the source holds, and for
+    # patient samples the number of patients those rows belong to.
+    source_rows_sampled: Optional[int] = None
+    source_rows_total: Optional[int] = None
+    source_patients_sampled: Optional[int] = None
 
 
 def _target_headers(target_catalog_path: Path) -> Dict[str, List[str]]:
@@ -95,100 +105,813 @@ def _choose_base_source(rows: List[Dict[str, str]], source_dir: Path) -> str:
     return ""
 
 
-def _find_source_id(source_row: Dict[str, str]) -> str:
-    for key in SOURCE_ID_CANDIDATES:
-        if key in source_row and str(source_row.get(key, "")).strip():
-            return str(source_row[key]).strip()
-    return ""
+CellFn = Callable[[Sequence[str], int], str]
 
+SOURCE_BACKED_CLASSES = {"DIRECT_SOURCE", "LOOKUP_TRANSLATION", "DERIVED"}
 
-def _get_case_insensitive(source_row: Dict[str, str], field: str) -> str:
-    if field in source_row:
-        return source_row.get(field, "")
-    lower_map = {k.lower(): k for k in source_row.keys()}
-    actual = lower_map.get(field.lower())
-    if actual:
-        return source_row.get(actual, "")
+
+def _empty_cell(source_row: Sequence[str], row_num: int) -> str:
     return ""
 
 
-def _field_value(
+def _row_number_cell(source_row: Sequence[str], row_num: int) -> str:
+    return str(row_num)
+
+
+def _compile_source_id(index: HeaderIndex) -> CellFn:
+    positions = [index.positions[k] for k in SOURCE_ID_CANDIDATES if k in index.positions]
+
+    def source_id(source_row: Sequence[str], row_num: int) -> str:
+        for pos in positions:
+            v = source_row[pos].strip()
+            if v:
+                return v
+        return ""
+
+    return source_id
+
+
+def _compile_value(
     target_field: str,
     mapping_class: str,
+    source_table: str,
     source_field: str,
-    source_row: Dict[str, str],
-    row_num: int,
-) -> str:
+    layout: JoinedLayout,
+    is_date: bool,
+) -> CellFn:
     tf = target_field.lower()
     sc = mapping_class.strip()
     sf = (source_field or "").strip()
 
-    if sc in {"DIRECT_SOURCE", "LOOKUP_TRANSLATION", "DERIVED"} and sf:
-        return _normalize_date(_get_case_insensitive(source_row, sf))
+    if sc in SOURCE_BACKED_CLASSES and sf:
+        pos = layout.resolve(source_table, sf)
+        if pos is None:
+            return _empty_cell
+        if is_date:
+            return lambda source_row, row_num: normalize_date(source_row[pos])
+        return lambda source_row, row_num: source_row[pos].strip()
 
     if sc == "SURROGATE_ETL":
-        if tf == "record_number":
-            return str(row_num)
         if tf == "system_code":
-            return "SRC_PAS_V83"
+            return lambda source_row, row_num: "SRC_PAS_V83"
         if tf == "external_system_id":
-            return _find_source_id(source_row)
-        if tf in FK_FIELDS:
-            return str(row_num)
-        return str(row_num)
+            return _compile_source_id(layout.base)
+        # record_number and the FK columns (referential.FK_FIELDS) share the row-number surrogate.
+        return _row_number_cell
 
     if sc == "REFERENCE_MASTER_FEED":
         if "code" in tf:
-            return f"REF{row_num:04d}"
+            return lambda source_row, row_num: f"REF{row_num:04d}"
         if "name" in tf or "description" in tf:
-            return f"Reference Value {row_num}"
-        return ""
-
-    if sc == "OUT_OF_SCOPE":
-        return ""
+            return lambda source_row, row_num: f"Reference Value {row_num}"
+        return _empty_cell
 
-    return ""
+    return _empty_cell
 
 
-def _fallback_value(target_table: str, target_field: str, source_row: Dict[str, str], row_num: int) -> str:
+def _compile_fallback(target_field: str, index: HeaderIndex) -> CellFn:
     tf = target_field.lower()
     if "date" in tf:
-        return "01/01/2024"
+        return lambda source_row, row_num: "01/01/2024"
     if "time" in tf:
-        return "09:00"
+        return lambda source_row, row_num: "09:00"
     if tf.endswith("_flag") or tf.startswith("is_") or tf.startswith("allow_") or "permission" in tf:
-        return "N"
+        return lambda source_row, row_num: "N"
     if "status" in tf:
-        return "ACTIVE"
+        return lambda source_row, row_num: "ACTIVE"
     if "code" in tf or tf.endswith("_id") or "number" in tf or tf.endswith("_no"):
-        return f"AUTO{row_num:04d}"
+        return lambda source_row, row_num: f"AUTO{row_num:04d}"
     if "name" in tf:
-        for k in ("Forenames", "Surname", "name_1", "pat_name_1"):
-            if k in source_row and str(source_row.get(k, "")).strip():
-                return str(source_row[k]).strip().upper()
-        return f"AUTO_NAME_{row_num:03d}"
+        name_positions = [
+            index.positions[k] for k in ("Forenames", "Surname", "name_1", "pat_name_1") if k in index.positions
+        ]
+
+        def name_fallback(source_row: Sequence[str], row_num: int) -> str:
+            for pos in name_positions:
+                v = source_row[pos].strip()
+                if v:
+                    return v.upper()
+            return f"AUTO_NAME_{row_num:03d}"
+
+        return name_fallback
     if "comment" in tf or "note" in tf or "text" in tf or "description" in tf:
-        return "Auto-derived value"
+        return lambda source_row, row_num: "Auto-derived value"
     if "type" in tf:
-        return "GEN"
+        return lambda source_row, row_num: "GEN"
     if "post_code" in tf or "postcode" in tf:
-        return "ZZ1 1ZZ"
+        return lambda source_row, row_num: "ZZ1 1ZZ"
     if "email" in tf:
-        return f"user{row_num:03d}@example.nhs.uk"
+        return lambda source_row, row_num: f"user{row_num:03d}@example.nhs.uk"
     if "phone" in tf or "telephone" in tf:
-        return "00000000000"
+        return lambda source_row, row_num: "00000000000"
     if "gender" in tf or tf == "sex":
-        return "U"
-    return ""
+        return lambda source_row, row_num: "U"
+    return _empty_cell
+
+
+def _with_crosswalk(
+    value_fn: CellFn,
+    target_field: str,
+    crosswalk_name: str,
+    crosswalk: CompiledCrosswalk,
+    rejects: TableRejects,
+) -> CellFn:
+    results = crosswalk.results
+    resolve = crosswalk.resolve
+
+    def translate(source_row: Sequence[str], row_num: int) -> str:
+        raw = value_fn(source_row, row_num)
+        try:
+            translated = results[raw]
+        except KeyError:
+            translated = resolve(raw)
+        if translated is not None:
+            return translated
+        rejects.add(target_field, crosswalk_name, raw, row_num)
+        return ""
+
+    return translate
+
+
+def _with_fallback(value_fn: CellFn, fallback_fn: CellFn) -> CellFn:
+    def impute(source_row: Sequence[str], row_num: int) -> str:
+        v = value_fn(source_row, row_num)
+        if v.strip():
+            return v
+        return fallback_fn(source_row, row_num)
+
+    return impute
+
+
+def _compile_field_plan(
+    target_table: str,
+    headers: List[str],
+    field_rules: Dict[str, Dict[str, str]],
+    layout: JoinedLayout,
+    date_fields: Set[str],
+    crosswalks: Dict[str, CompiledCrosswalk],
+    impute_mode: str,
+    rejects: TableRejects,
+    timer: Optional[StageTimer] = None,
+) -> List[CellFn]:
+    """Turn a table's contract rules into one precomputed callable per target column.
+
+    Rule lookup, mapping-class dispatch, source header resolution, the date-normalisation
+    hint, crosswalk inference and the impute-mode check all happen here once, so the row
+    loop only calls the plan.
+    """
+    impute = impute_mode.lower() != "strict"
+    plan: List[CellFn] = []
+    for h in headers:
+        rule = field_rules.get(h)
+        if not rule:
+            plan.append(_empty_cell)
+            continue
+        mapping_class = (rule.get("mapping_class") or "").strip()
+        cell = _compile_value(
+            h,
+            mapping_class,
+            (rule.get("primary_source_table") or "").strip(),
+            rule.get("primary_source_field", ""),
+            layout,
+            h in date_fields,
+        )
+        if mapping_class == "LOOKUP_TRANSLATION":
+            cw_name = infer_crosswalk_name(target_table, h)
+            crosswalk = crosswalks.get(cw_name.lower()) if cw_name else None
+            # No crosswalk loaded for the inferred type keeps the value as-is.
+            if cw_name and crosswalk:
+                cell = _with_crosswalk(cell, h, cw_name, crosswalk, rejects)
+                if timer is not None:
+                    cell = timer.timed(cell, "crosswalk")
+        if impute:
+            cell = _with_fallback(cell, _compile_fallback(h, layout.base))
+        plan.append(cell)
+    return plan
+
+
+def _row_number_columns(headers: List[str], field_rules: Dict[str, Dict[str, str]]) -> List[str]:
+    """Columns the plan fills with the row-number surrogate (record_number, FK and recno fields)."""
+    no_source = JoinedLayout(HeaderIndex([]))
+    return [
+        h
+        for h in headers
+        if h in field_rules
+        and _compile_value(h, (field_rules[h].get("mapping_class") or "").strip(), "", "", no_source, False)
+        is _row_number_cell
+    ]
+
+
+def _select_field_rules(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    field_rules: Dict[str, Dict[str, str]] = {}
+    for r in rows:
+        f = r["target_field"]
+        # Prefer higher-confidence rows if duplicate target fields exist in contract.
+        if f not in field_rules:
+            field_rules[f] = r
+        elif (r.get("confidence") or "").upper() == "HIGH":
+            field_rules[f] = r
+    return field_rules
+
+
+def _mapped_source_fields(field_rules: Dict[str, Dict[str, str]]) -> Dict[str, List[str]]:
+    """Source fields that source-backed mapped fields read, by source table."""
+    fields: Dict[str, List[str]] = {}
+    for rule in field_rules.values():
+        src = (rule.get("primary_source_table") or "").strip()
+        field = (rule.get("primary_source_field") or "").strip()
+        if src and field and (rule.get("mapping_class") or "").strip() in SOURCE_BACKED_CLASSES:
+            fields.setdefault(src, []).append(field)
+    return fields
+
+
+def _join_sources(field_rules: Dict[str, Dict[str, str]], base_source: str, source_dir: Path) -> List[str]:
+    """Secondary sources that mapped fields read from, other than the base source."""
+    names = set(_mapped_source_fields(field_rules)) - {base_source}
+    return sorted(n for n in names if (source_dir / f"{n}.csv").exists())
+
+
+def _plan_joins(
+    target_table: str,
+    index: HeaderIndex,
+    join_sources: List[str],
+    source_dir: Path,
+    source_cache: Optional[SourceTableCache],
+    join_cache: JoinIndexCache,
+    mapped_fields: Optional[Dict[str, List[str]]] = None,
+) -> Tuple[JoinedLayout, List[Dict[str, str]]]:
+    """Index each secondary source on the key groups it shares with the base.
+
+    A mapped field whose column is also in the base header keeps reading the base row
+    (see JoinedLayout), so a secondary is joined only for the `mapped_fields` the base
+    lacks; without `mapped_fields`, every secondary is joined.
+
+    At most one join expands 1:N on an expanding target: among the secondaries that join
+    on every base key group, the one with the most such fields, then the first by name.
+    The rest contribute their first match, so independent 1:N sources never multiply into
+    a cross product.
+    """
+    base_keys = resolve_key_positions(index)
+    base_groups = tuple(sorted(base_keys))
+    expandable = expands_matches(target_table)
+
+    def open_records(path: Path) -> Iterator[Sequence[str]]:
+        if source_cache is not None:
+            return source_cache.open(path, consume=False)
+        return iter_csv_records(path)
+
+    joins: List[JoinSpec] = []
+    issues: List[Dict[str, str]] = []
+    offset = len(index.fields)
+    needed: Dict[str, int] = {}
+    for name in join_sources:
+        path = source_dir / f"{name}.csv"
+        if mapped_fields is not None:
+            needed[name] = sum(1 for f in mapped_fields.get(name, []) if index.resolve(f) is None)
+            if not needed[name]:
+                join_cache.release(path)
+                continue
+        groups: Tuple[int, ...] = ()
+        if base_groups:
+            sec_index, groups, lookup = join_cache.get(path, base_groups, open_records)
+        join_cache.release(path)
+        if not groups:
+            issues.append(
+                {
+                    "severity": "INFO",
+                    "category": "SOURCE_JOIN_UNRESOLVED",
+                    "table_name": target_table,
+                    "field_name": "",
+                    "record_id": "",
+                    "message": f"No shared join key between base source and {name}; its mapped fields stay empty.",
+                }
+            )
+            continue
+        joins.append(
+            JoinSpec(
+                source_table=name,
+                index=sec_index,
+                offset=offset,
+                base_key_positions=[base_keys[g] for g in groups],
+                lookup=lookup,
+            )
+        )
+        offset += len(sec_index.fields)
+    drivers = [j for j in joins if expandable and len(j.base_key_positions) == len(base_groups)]
+    if drivers:
+        max(drivers, key=lambda j: needed.get(j.source_table, 0)).expand = True
+    return JoinedLayout(index, joins), issues
+
+
+def _open_source_rows(
+    source_dir: Path,
+    base_source: str,
+    source_cache: Optional[SourceTableCache] = None,
+) -> Iterator[Sequence[str]]:
+    """Return a lazy header-then-rows stream for the base source so each table runs in constant memory."""
+    if not base_source:
+        return iter(())
+    path = source_dir / f"{base_source}.csv"
+    if source_cache is not None:
+        return source_cache.open(path)
+    return iter_csv_records(path)
+
+
+class _StreamingTableWriter:
+    """Write target rows as they are produced and profile every column in the same pass.
+
+    Each batch goes to the table file and to any extra outputs (e.g. a staging-table load).
+    With `background`, batches are written and profiled on a writer thread behind a
+    bounded queue; `profiler` and `columns_populated` are complete once closed.
+    """
+
+    BATCH_ROWS = 1024
+
+    def __init__(self, output: TableOutput, extra: Sequence[TableOutput] = (), background: bool = False):
+        self.headers = output.headers
+        self.rows_written = 0
+        self.profiler = TableProfiler(self.headers)
+        self._batch: List[List[str]] = []
+        self._outs = [output, *extra]
+        self._writer = BackgroundWriter(self._write_batch) if background else None
+
+    def write_values(self, values: List[str]) -> None:
+        """Write a row already in header order."""
+        self._batch.append(values)
+        self.rows_written += 1
+        if len(self._batch) >= self.BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if self._writer is not None:
+            self._writer.submit(batch)
+        else:
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[List[str]]) -> None:
+        columns = None
+        for out in self._outs:
+            if out.columnar:
+                # Transpose once; columnar outputs and the profiler share the column batch.
+                if columns is None:
+                    columns = list(zip(*batch))
+                out.write_columns(columns)
+            else:
+                out.write_rows(batch)
+        if columns is not None:
+            self.profiler.add_columns(columns, len(batch))
+        else:
+            self.profiler.add_batch(batch)
+
+    @property
+    def columns_populated(self) -> int:
+        return self.profiler.columns_populated
+
+    def close(self, failed: bool = False) -> None:
+        """Finish every output, or abort them all (e.g. roll back loads) when the build `failed`."""
+        try:
+            if not failed:
+                self._flush()
+            if self._writer is not None:
+                self._writer.close()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._close_outs(failed)
+
+    def _close_outs(self, failed: bool) -> None:
+        error: Optional[BaseException] = None
+        for out in self._outs:
+            try:
+                if failed:
+                    out.abort()
+                else:
+                    out.close()
+            except BaseException as ex:
+                error = error or ex
+        if error is not None:
+            raise error
+
+    def __enter__(self) -> "_StreamingTableWriter":
+        return self
 
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(failed=exc_type is not None)
 
-def _write_csv(path: Path, headers: List[str], rows: List[Dict[str, str]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        for row in rows:
-            w.writerow({h: row.get(h, "") for h in headers})
+
+def _build_table(
+    target_table: str,
+    field_rules: Dict[str, Dict[str, str]],
+    headers: List[str],
+    date_fields: Set[str],
+    base_source: str,
+    join_sources: List[str],
+    source_dir: Path,
+    output_dir: Path,
+    crosswalks: Dict[str, CompiledCrosswalk],
+    impute_mode: str,
+    reject_sample_cap: int = DEFAULT_REJECT_SAMPLE_CAP,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    load_target: Optional[LoadTarget] = None,
+    profile_stages: bool = False,
+    shard: Optional[ShardSpec] = None,
+    overlap_io: bool = False,
+    sample: Optional[SampleSpec] = None,
+    source_cache: Optional[SourceTableCache] = None,
+    join_cache: Optional[JoinIndexCache] = None,
+    base_rows: Optional[Iterator[Sequence[str]]] = None,
+) -> Tuple[TableRunStats, List[Dict[str, str]], TableRejects]:
+    """Build one target table. Depends only on its contract rows, its sources and crosswalks.
+
+    `profile_stages` times source read, transform, crosswalk, plugin and write stages per
+    row; it costs a few perf_counter calls per row, so it is off by default. With `shard`,
+    only base rows whose patient key hashes into it are built; joined sources are looked
+    up in full, and synthetic rows for source-less tables come from shard 1 alone. With
+    `sample`, only the sampled base rows are built and the stats record how many there
+    were out of the whole source.
+
+    `base_rows` is the already opened base source stream (e.g. prefetched by _run_tasks);
+    with `overlap_io`, output batches are written on a background writer thread.
+    """
+    clock = TableClock()
+    timer = StageTimer() if profile_stages else None
+    run_issues: List[Dict[str, str]] = []
+    rejects = TableRejects(target_table, reject_sample_cap)
+
+    source_iter = base_rows if base_rows is not None else _open_source_rows(source_dir, base_source, source_cache)
+    source_header = next(source_iter, [])
+    first = next(source_iter, None)
+    source_rows: Iterable[Sequence[str]]
+    layout = JoinedLayout(HeaderIndex([]))
+    sampled: Optional[SampledRows] = None
+    if first is None and shard is not None and not shard.is_first:
+        source_rows = ()
+    elif first is None:
+        # Keep deterministic output even for reference-only/no-source tables.
+        source_rows = (() for _ in range(20))
+        run_issues.append(
+            {
+                "severity": "WARN",
+                "category": "SOURCE_BASE_UNRESOLVED",
+                "table_name": target_table,
+                "field_name": "",
+                "record_id": "",
+                "message": f"No available base source table found. Using synthetic rows for {target_table}.",
+            }
+        )
+    else:
+        source_rows = chain([first], source_iter)
+        layout = JoinedLayout(HeaderIndex(source_header))
+        if shard is not None:
+            source_rows = shard.filter_rows(source_rows, _compile_source_id(layout.base))
+        if sample is not None:
+            # Salted by source, so tables built from the same source sample the same rows.
+            # A head sample of the whole file takes the source's row count from a raw scan.
+            count_rows = partial(count_csv_rows, source_dir / f"{base_source}.csv") if shard is None else None
+            sampled = sample.rows(source_rows, _compile_source_id(layout.base), base_source, count_rows)
+            source_rows = sampled
+        if join_sources:
+            layout, join_issues = _plan_joins(
+                target_table,
+                layout.base,
+                join_sources,
+                source_dir,
+                source_cache,
+                join_cache if join_cache is not None else JoinIndexCache(),
+                _mapped_source_fields(field_rules),
+            )
+            run_issues.extend(join_issues)
+            source_rows = join_rows(source_rows, layout)
+
+    plan = _compile_field_plan(
+        target_table, headers, field_rules, layout, date_fields, crosswalks, impute_mode, rejects, timer
+    )
+    loads: List[TableLoad] = [load_target.open_table(target_table, headers)] if load_target is not None else []
+    writer = _StreamingTableWriter(
+        open_table_output(output_dir, target_table, headers, output_format), loads, background=overlap_io
+    )
+    plugins = compile_domain_plugins(target_table, headers)
+    with writer:
+        if timer is not None:
+            _write_profiled(source_rows, plan, headers, plugins, SourceRowView(layout.base), writer, timer)
+        elif plugins is None:
+            # No domain rules bind to this table: plan output goes straight to the writer.
+            for i, src in enumerate(source_rows, start=1):
+                writer.write_values([cell(src, i) for cell in plan])
+        else:
+            # Rows stay positional lists; plugins see them through two reusable views.
+            source_view = SourceRowView(layout.base)
+            target_view = TargetRowView(HeaderIndex(headers))
+            for i, src in enumerate(source_rows, start=1):
+                values = [cell(src, i) for cell in plan]
+                source_view.values = src
+                target_view.values = values
+                plugins(target_view, source_view, i)
+                writer.write_values(values)
+
+    mapped = sum(1 for h in headers if h in field_rules)
+    stats = TableRunStats(
+        target_table=target_table,
+        source_table=base_source or "SYNTHETIC",
+        rows_written=writer.rows_written,
+        columns_total=len(headers),
+        columns_populated=writer.columns_populated,
+        mapped_fields=mapped,
+        elapsed_s=clock.elapsed_s(),
+        peak_traced_kb=clock.peak_traced_kb(),
+        stage_seconds=timer.result() if timer is not None else {},
+        column_stats=writer.profiler.summary(),
+        source_rows_sampled=sampled.sampled if sampled is not None else None,
+        source_rows_total=sampled.population if sampled is not None else None,
+        source_patients_sampled=sampled.patients if sampled is not None else None,
+    )
+    for load in loads:
+        run_issues.extend(_load_issues(target_table, load, writer.rows_written))
+        stats.rows_loaded = load.rows_loaded
+    return stats, run_issues, rejects
+
+
+def _write_profiled(
+    source_rows: Iterable[Sequence[str]],
+    plan: List[CellFn],
+    headers: List[str],
+    plugins,
+    source_view: SourceRowView,
+    writer: _StreamingTableWriter,
+    timer: StageTimer,
+) -> None:
+    """The _build_table row loop with every stage charged to the timer."""
+    clock = time.perf_counter
+    seconds = timer.seconds
+    target_view = TargetRowView(HeaderIndex(headers))
+    for i, src in enumerate(timer.timed_iter(source_rows, "source_read"), start=1):
+        t0 = clock()
+        values = [cell(src, i) for cell in plan]
+        t1 = clock()
+        seconds["transform"] += t1 - t0
+        if plugins is not None:
+            source_view.values = src
+            target_view.values = values
+            plugins(target_view, source_view, i)
+            t2 = clock()
+            seconds["plugins"] += t2 - t1
+        else:
+            t2 = t1
+        writer.write_values(values)
+        seconds["write"] += clock() - t2
+
+
+def _load_issues(target_table: str, load: TableLoad, rows_written: int) -> List[Dict[str, str]]:
+    if load.error:
+        return [
+            {
+                "severity": "ERROR",
+                "category": "TARGET_LOAD_FAILED",
+                "table_name": target_table,
+                "field_name": "",
+                "record_id": "",
+                "message": f"Staging load rolled back: {load.error}",
+            }
+        ]
+    if load.rows_loaded != rows_written:
+        return [
+            {
+                "severity": "ERROR",
+                "category": "TARGET_LOAD_COUNT_MISMATCH",
+                "table_name": target_table,
+                "field_name": "",
+                "record_id": "",
+                "message": f"Staging table holds {load.rows_loaded} rows; {rows_written} were written.",
+            }
+        ]
+    return []
+
+
+def _table_input_hash(
+    target_table: str,
+    rows: List[Dict[str, str]],
+    field_rules: Dict[str, Dict[str, str]],
+    headers: List[str],
+    date_fields: Set[str],
+    base_source: str,
+    join_sources: List[str],
+    source_dir: Path,
+    crosswalks: Dict[str, Dict[str, str]],
+    crosswalk_normalisation: Sequence[str],
+    impute_mode: str,
+    reject_sample_cap: int,
+    output_format: str,
+    hasher: FileHasher,
+    shard: Optional[ShardSpec] = None,
+    sample: Optional[SampleSpec] = None,
+) -> str:
+    touched: Dict[str, Dict[str, str]] = {}
+    for h, rule in field_rules.items():
+        if (rule.get("mapping_class") or "").strip() != "LOOKUP_TRANSLATION":
+            continue
+        cw_name = infer_crosswalk_name(target_table, h)
+        if cw_name and cw_name.lower() in crosswalks:
+            touched[cw_name.lower()] = crosswalks[cw_name.lower()]
+    sources = [base_source] + join_sources if base_source else []
+    # Full, unsharded runs hash as before, so existing manifests stay valid.
+    sharding = {"shard": str(shard)} if shard is not None else {}
+    sampling = {"sample": str(sample)} if sample is not None else {}
+    return hash_inputs(
+        {
+            **sharding,
+            **sampling,
+            "contract_rows": rows,
+            "headers": headers,
+            "date_fields": sorted(date_fields),
+            "sources": {name: hasher.hash(source_dir / f"{name}.csv") for name in sources},
+            "crosswalks": touched,
+            "crosswalk_normalisation": sorted(crosswalk_normalisation) if touched else None,
+            "code_version": code_version(),
+            "impute_mode": impute_mode.lower(),
+            # The cap only shapes the reject output of tables that translate values.
+            "reject_sample_cap": reject_sample_cap if touched else None,
+            "output_format": output_format,
+        }
+    )
+
+
+def _reuse_stats(
+    previous: Optional[Dict[str, object]], path: Path, load_target: Optional[LoadTarget]
+) -> Optional[TableRunStats]:
+    """Recorded stats of an unchanged table, if its file and any staging table are still in place."""
+    if previous is None or not path.exists():
+        return None
+    stats = TableRunStats(**previous["stats"], reused=True)
+    if load_target is not None:
+        stats.rows_loaded = load_target.count_rows(stats.target_table)
+        if stats.rows_loaded != stats.rows_written:
+            return None
+    return stats
+
+
+@dataclass(frozen=True)
+class _TableTask:
+    """Arguments of one _build_table call, as handed to a worker process."""
+
+    target_table: str
+    field_rules: Dict[str, Dict[str, str]]
+    headers: List[str]
+    date_fields: Set[str]
+    base_source: str
+    join_sources: List[str]
+    source_dir: Path
+    output_dir: Path
+    crosswalks: Dict[str, CompiledCrosswalk]
+    impute_mode: str
+    reject_sample_cap: int
+    output_format: str
+    load_target: Optional[LoadTarget]
+    profile_stages: bool
+    shard: Optional[ShardSpec]
+    overlap_io: bool
+    sample: Optional[SampleSpec]
+
+
+def _build_task(
+    task: _TableTask, **caches: object
+) -> Tuple[TableRunStats, List[Dict[str, str]], TableRejects]:
+    """Run _build_table for `task`; `caches` are its source_cache, join_cache and base_rows."""
+    return _build_table(**{f.name: getattr(task, f.name) for f in fields(task)}, **caches)
+
+
+def _consumer_counts(tasks: Sequence[_TableTask]) -> Tuple[Dict[Path, int], Dict[Path, int]]:
+    """How many of `tasks` read each base source and each joined source."""
+    source_consumers: Dict[Path, int] = {}
+    join_consumers: Dict[Path, int] = {}
+    for task in tasks:
+        if task.base_source:
+            path = task.source_dir / f"{task.base_source}.csv"
+            source_consumers[path] = source_consumers.get(path, 0) + 1
+        for name in task.join_sources:
+            path = task.source_dir / f"{name}.csv"
+            join_consumers[path] = join_consumers.get(path, 0) + 1
+    return source_consumers, join_consumers
+
+
+def _task_chunks(tasks: Sequence[_TableTask], workers: int) -> List[List[int]]:
+    """Split task positions into worker chunks, keeping tables with the same base source together.
+
+    A base source read by more tables than an even share (ceil(tasks / workers)) is split
+    across chunks of that size, so one popular source does not serialise the run.
+    """
+    limit = max(1, -(-len(tasks) // max(1, workers)))
+    groups: Dict[str, List[int]] = {}
+    chunks: List[List[int]] = []
+    for i, task in enumerate(tasks):
+        base_source = task.base_source
+        if not base_source:
+            chunks.append([i])
+            continue
+        group = groups.get(base_source)
+        if group is None or len(group) >= limit:
+            group = groups[base_source] = []
+            chunks.append(group)
+        group.append(i)
+    return chunks
+
+
+_worker_budget_bytes = 0
+_worker_trace_memory = False
+_worker_overlap_io = False
+
+
+def _init_worker(budget_bytes: int, trace_memory: bool, overlap_io: bool) -> None:
+    global _worker_budget_bytes, _worker_trace_memory, _worker_overlap_io
+    _worker_budget_bytes = budget_bytes
+    _worker_trace_memory = trace_memory
+    _worker_overlap_io = overlap_io
+
+
+def _prefetch_base_rows(task: _TableTask, source_cache: SourceTableCache) -> PrefetchIterator:
+    """Open a task's base source and parse it on a reader thread, filling the source cache there too."""
+    return PrefetchIterator(partial(_open_source_rows, task.source_dir, task.base_source, source_cache))
+
+
+def _build_chunk_in_worker(chunk: List[_TableTask]) -> List[Tuple[TableRunStats, List[Dict[str, str]], TableRejects]]:
+    # Caches live for one chunk and count only its tables, so every entry is released in the worker.
+    source_consumers, join_consumers = _consumer_counts(chunk)
+    source_cache = SourceTableCache(_worker_budget_bytes, source_consumers)
+    join_cache = JoinIndexCache(join_consumers)
+    results = []
+    started_trace = start_memory_trace() if _worker_trace_memory else False
+    try:
+        for task in chunk:
+            rows = _prefetch_base_rows(task, source_cache) if _worker_overlap_io else None
+            try:
+                results.append(_build_task(task, source_cache=source_cache, join_cache=join_cache, base_rows=rows))
+            finally:
+                if rows is not None:
+                    rows.close()
+    finally:
+        stop_memory_trace(started_trace)
+    return results
+
+
+def _run_tasks(
+    tasks: List[_TableTask],
+    workers: int,
+    budget_bytes: int,
+    trace_memory: bool = False,
+    overlap_io: bool = False,
+) -> Iterator[Tuple[TableRunStats, List[Dict[str, str]], TableRejects]]:
+    """Yield table results in task order as they complete, so callers can stream them out.
+
+    Worker processes are handed chunks of tables (see _task_chunks), each with its own
+    source and join caches. With `overlap_io` and no worker pool, the next table's base
+    source is parsed (into the source cache when shared) on a reader thread while the
+    current table is transformed.
+    """
+    if workers > 1 and len(tasks) > 1:
+        chunks = _task_chunks(tasks, workers)
+        done: Dict[int, Tuple[TableRunStats, List[Dict[str, str]], TableRejects]] = {}
+        pos = 0
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            initializer=_init_worker,
+            initargs=(budget_bytes, trace_memory, overlap_io),
+        ) as pool:
+            # map() yields chunks in submission order; results are released in task order.
+            chunk_tasks = [[tasks[i] for i in chunk] for chunk in chunks]
+            for chunk, results in zip(chunks, pool.map(_build_chunk_in_worker, chunk_tasks)):
+                done.update(zip(chunk, results))
+                while pos in done:
+                    yield done.pop(pos)
+                    pos += 1
+        return
+    source_consumers, join_consumers = _consumer_counts(tasks)
+    source_cache = SourceTableCache(budget_bytes, source_consumers)
+    join_cache = JoinIndexCache(join_consumers)
+    started_trace = start_memory_trace() if trace_memory else False
+    try:
+        if not overlap_io:
+            for t in tasks:
+                yield _build_task(t, source_cache=source_cache, join_cache=join_cache)
+            return
+        ahead = _prefetch_base_rows(tasks[0], source_cache) if tasks else None
+        try:
+            for i, t in enumerate(tasks):
+                rows, ahead = ahead, None
+                if i + 1 < len(tasks):
+                    ahead = _prefetch_base_rows(tasks[i + 1], source_cache)
+                try:
+                    result = _build_task(t, source_cache=source_cache, join_cache=join_cache, base_rows=rows)
+                finally:
+                    rows.close()
+                yield result
+        finally:
+            if ahead is not None:
+                ahead.close()
+    finally:
+        stop_memory_trace(started_trace)
 
 
 def build_contract_targets(
@@ -199,110 +922,287 @@ def build_contract_targets(
     target_catalog_csv: Path,
     crosswalk_dir: Path,
     impute_mode: str = "strict",
-) -> Tuple[List[TableRunStats], List[Dict[str, str]], List[Dict[str, str]]]:
+    workers: int = 1,
+    source_cache_mb: int = DEFAULT_BUDGET_MB,
+    incremental: bool = False,
+    issue_sink: Optional[IssueSink] = None,
+    reject_sink: Optional[RejectSink] = None,
+    reject_sample_cap: int = DEFAULT_REJECT_SAMPLE_CAP,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    load_target: Optional[LoadTarget] = None,
+    crosswalk_normalisation: Sequence[str] = (),
+    profile_stages: bool = False,
+    trace_memory: bool = False,
+    shard: Optional[ShardSpec] = None,
+    overlap_io: bool = False,
+    sample: Optional[SampleSpec] = None,
+) -> Tuple[List[TableRunStats], IssueSink, RejectSink]:
+    """Build every contract target table into output_dir.
+
+    Issues and crosswalk rejects are streamed into the sinks table by table, in sorted
+    table order. Each table keeps exact reject counts per (field, crosswalk, value) but
+    at most `reject_sample_cap` detail rows per group and REJECT_TABLE_CAP in all; the
+    manifest records the counts and the detail rows are kept under REJECT_DETAILS_DIR in
+    output_dir for reuse. Sinks created here without a path hold their rows in memory.
+    Tables are written as `output_format` (csv, parquet or arrow; the columnar formats
+    need pyarrow). With `load_target`, every built table is also bulk-loaded into its
+    staging table and the loaded row count is verified. Crosswalks are compiled once per
+    run; `crosswalk_normalisation` ("case", "space", "zeros") adds folded-key fallbacks
+    behind the exact match. Every table records its build time; `profile_stages` adds
+    per-stage timings and `trace_memory` the peak tracemalloc memory per table (both
+    slow the build down). With `shard`, only the base rows whose patient key hashes into
+    that shard are built; merge_contract_shards combines the shard folders afterwards.
+    `overlap_io` runs each table as a read / transform / write pipeline: base sources
+    are parsed ahead on a reader thread (the next table's while the current one
+    transforms) and output is written on a writer thread, both behind bounded queues.
+    With `sample`, each base source is cut down to a sample before it is transformed;
+    the stats record the sampled and total source rows so the caller can extrapolate.
+
+    With `incremental`, tables whose inputs hash the same as in the previous run's
+    manifest (contract rows, sources, crosswalks and their key normalisation, ETL code,
+    impute mode, reject cap, output format) are not rebuilt and their recorded stats,
+    issues and rejects are reused, provided any staging table still holds the recorded
+    row count.
+    """
+    check_output_format(output_format)
+    if load_target is not None:
+        load_target.check()
     contract_rows = read_csv(contract_csv)
     grouped = _group_contract_rows(contract_rows)
     target_headers = _target_headers(target_catalog_csv)
+    target_date_fields = load_date_columns(target_catalog_csv)
     crosswalks = load_crosswalks(crosswalk_dir)
+    compiled_crosswalks = compile_crosswalks(crosswalks, crosswalk_normalisation)
+    issue_sink = issue_sink if issue_sink is not None else IssueSink()
+    reject_sink = reject_sink if reject_sink is not None else RejectSink()
     stats: List[TableRunStats] = []
-    run_issues: List[Dict[str, str]] = []
-    rejects: List[Dict[str, str]] = []
 
+    # One slot per target table in sorted order; header-less tables carry their issue directly
+    # and tables still to be built are filled from the task results as they arrive.
+    slots: List[Optional[Tuple[Optional[TableRunStats], List[Dict[str, str]], Optional[TableRejects]]]] = []
+    tasks = []
+    manifest = ContractManifest(output_dir / MANIFEST_NAME)
+    hasher = FileHasher()
+    input_hashes: Dict[str, str] = {}
+    run_issues: List[Dict[str, str]] = []
+    row_number_columns: Dict[str, List[str]] = {}
     for target_table, rows in sorted(grouped.items()):
         headers = target_headers.get(target_table, [])
         if not headers:
-            run_issues.append(
-                {
-                    "severity": "WARN",
-                    "category": "TARGET_HEADER_MISSING",
-                    "table_name": target_table,
-                    "field_name": "",
-                    "record_id": "",
-                    "message": "Target table headers not found in target schema catalog.",
-                }
-            )
+            issue = {
+                "severity": "WARN",
+                "category": "TARGET_HEADER_MISSING",
+                "table_name": target_table,
+                "field_name": "",
+                "record_id": "",
+                "message": "Target table headers not found in target schema catalog.",
+            }
+            slots.append((None, [issue], None))
+            run_issues.append(issue)
             continue
-
+        date_fields = target_date_fields.get(target_table, set())
+        field_rules = _select_field_rules(rows)
+        row_number_columns[target_table] = _row_number_columns(headers, field_rules)
         base_source = _choose_base_source(rows, source_dir)
-        source_rows = read_csv(source_dir / f"{base_source}.csv") if base_source else []
-        if not source_rows:
-            # Keep deterministic output even for reference-only/no-source tables.
-            source_rows = [{} for _ in range(20)]
-            run_issues.append(
-                {
-                    "severity": "WARN",
-                    "category": "SOURCE_BASE_UNRESOLVED",
-                    "table_name": target_table,
-                    "field_name": "",
-                    "record_id": "",
-                    "message": f"No available base source table found. Using synthetic rows for {target_table}.",
-                }
-            )
-
-        field_rules: Dict[str, Dict[str, str]] = {}
-        for r in rows:
-            f = r["target_field"]
-            # Prefer higher-confidence rows if duplicate target fields exist in contract.
-            if f not in field_rules:
-                field_rules[f] = r
-            elif (r.get("confidence") or "").upper() == "HIGH":
-                field_rules[f] = r
-
-        out_rows: List[Dict[str, str]] = []
-        for i, src in enumerate(source_rows, start=1):
-            row = {h: "" for h in headers}
-            for h in headers:
-                rule = field_rules.get(h)
-                if not rule:
-                    continue
-                row[h] = _field_value(
-                    target_field=h,
-                    mapping_class=rule.get("mapping_class", ""),
-                    source_field=rule.get("primary_source_field", ""),
-                    source_row=src,
-                    row_num=i,
-                )
-                mapping_class = (rule.get("mapping_class") or "").strip()
-                if mapping_class == "LOOKUP_TRANSLATION":
-                    cw_name = infer_crosswalk_name(target_table, h)
-                    if cw_name:
-                        translated = apply_crosswalk(row[h], cw_name, crosswalks)
-                        if translated is None:
-                            # no crosswalk loaded for inferred type; keep value as-is
-                            pass
-                        elif translated == "__REJECT__" and row[h].strip():
-                            rejects.append(
-                                {
-                                    "severity": "WARN",
-                                    "category": "CROSSWALK_REJECT",
-                                    "table_name": target_table,
-                                    "field_name": h,
-                                    "record_id": str(i),
-                                    "source_value": row[h],
-                                    "crosswalk_name": cw_name,
-                                    "message": f"Value '{row[h]}' not found in crosswalk '{cw_name}'.",
-                                }
-                            )
-                            row[h] = ""
-                        else:
-                            row[h] = translated
-                if impute_mode.lower() != "strict" and not str(row[h]).strip():
-                    row[h] = _fallback_value(target_table, h, src, i)
-            apply_domain_plugins(target_table, row, src, i)
-            out_rows.append(row)
-
-        _write_csv(output_dir / f"{target_table}.csv", headers, out_rows)
-        populated = sum(1 for h in headers if any(str(r.get(h, "")).strip() for r in out_rows))
-        mapped = sum(1 for h in headers if h in field_rules)
-        stats.append(
-            TableRunStats(
+        join_sources = _join_sources(field_rules, base_source, source_dir) if base_source else []
+        input_hash = _table_input_hash(
+            target_table,
+            rows,
+            field_rules,
+            headers,
+            date_fields,
+            base_source,
+            join_sources,
+            source_dir,
+            crosswalks,
+            crosswalk_normalisation,
+            impute_mode,
+            reject_sample_cap,
+            output_format,
+            hasher,
+            shard,
+            sample,
+        )
+        input_hashes[target_table] = input_hash
+        previous = manifest.lookup(target_table, input_hash) if incremental else None
+        reused = _reuse_stats(previous, output_path(output_dir, target_table, output_format), load_target)
+        if reused is not None:
+            recorded = TableRejects.from_dict(target_table, previous["rejects"], reject_sample_cap, output_dir)
+            slots.append((reused, list(previous["issues"]), recorded))
+            continue
+        slots.append(None)
+        tasks.append(
+            _TableTask(
                 target_table=target_table,
-                source_table=base_source or "SYNTHETIC",
-                rows_written=len(out_rows),
-                columns_total=len(headers),
-                columns_populated=populated,
-                mapped_fields=mapped,
+                field_rules=field_rules,
+                headers=headers,
+                date_fields=date_fields,
+                base_source=base_source,
+                join_sources=join_sources,
+                source_dir=source_dir,
+                output_dir=output_dir,
+                crosswalks=compiled_crosswalks,
+                impute_mode=impute_mode,
+                reject_sample_cap=reject_sample_cap,
+                output_format=output_format,
+                load_target=load_target,
+                profile_stages=profile_stages,
+                shard=shard,
+                overlap_io=overlap_io,
+                sample=sample,
             )
         )
 
-    return stats, run_issues, rejects
+    budget_bytes = max(0, source_cache_mb) * 1024 * 1024
+    if sample is not None:
+        # Each table only keeps its sample; caching whole shared sources costs more than rereading them.
+        budget_bytes = 0
+    run = _run_tasks(tasks, workers, budget_bytes, trace_memory, overlap_io)
+    with closing(run) as results:
+        for slot in slots:
+            table_stats, table_issues, table_rejects = slot if slot is not None else next(results)
+            if table_stats is not None:
+                stats.append(table_stats)
+                recorded = asdict(table_stats)
+                # Timings describe this run only; a reused table reports none.
+                for key in ("reused", "elapsed_s", "peak_traced_kb", "stage_seconds"):
+                    recorded.pop(key)
+                manifest.record(
+                    table_stats.target_table,
+                    input_hashes[table_stats.target_table],
+                    recorded,
+                    table_issues,
+                    table_rejects.to_dict(),
+                )
+            issue_sink.write(table_issues)
+            if table_rejects is not None:
+                reject_sink.write(table_rejects)
+                if slot is None:
+                    table_rejects.save_details(output_dir)
+    manifest.run = {
+        "shard": str(shard) if shard is not None else None,
+        "sample": str(sample) if sample is not None else None,
+        "impute_mode": impute_mode,
+        "crosswalk_normalisation": sorted(crosswalk_normalisation),
+        "reject_sample_cap": reject_sample_cap,
+        "issues": run_issues,
+        # Shard merges shift these columns past the rows of earlier shards.
+        "row_number_columns": row_number_columns,
+    }
+    manifest.save()
+
+    return stats, issue_sink, reject_sink
+
+
+def merge_contract_shards(
+    output_dir: Path,
+    issue_sink: Optional[IssueSink] = None,
+    reject_sink: Optional[RejectSink] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    load_target: Optional[LoadTarget] = None,
+) -> Tuple[List[TableRunStats], IssueSink, RejectSink]:
+    """Combine the shard_<i>_of_<N> folders under output_dir into one set of target tables.
+
+    Each table's shard files are concatenated in shard order into output_dir, with the
+    row-number surrogates (record_number, FK and recno fields, as recorded by the shards)
+    shifted past the rows of earlier shards so they stay unique. Column stats are
+    re-profiled from the merged rows. Issues (deduplicated) and reject counts come from
+    each shard's manifest, and reject detail rows from its REJECT_DETAILS_DIR, re-capped
+    at the shards' sample cap. Other row-number placeholders (e.g. imputed AUTO codes)
+    keep their shard-local numbering. Returns the same (stats, issues, rejects) as
+    build_contract_targets.
+    """
+    check_output_format(output_format)
+    if load_target is not None:
+        load_target.check()
+    shards = find_shard_dirs(output_dir)
+    manifests = []
+    for spec, folder in shards:
+        manifest = ContractManifest(folder / MANIFEST_NAME)
+        if not manifest.previous_tables:
+            raise ValueError(f"Shard {spec} in {folder} has no manifest; rerun it with --shard {spec}.")
+        manifests.append(manifest)
+    first_run = manifests[0].previous_run
+    for (spec, _), manifest in zip(shards, manifests):
+        run = manifest.previous_run
+        for key in ("impute_mode", "crosswalk_normalisation", "reject_sample_cap"):
+            if run.get(key) != first_run.get(key):
+                raise ValueError(f"Shard {spec} was built with {key}={run.get(key)!r}, shard 1 with {first_run.get(key)!r}.")
+    table_names = set(manifests[0].previous_tables)
+    for (spec, _), manifest in zip(shards, manifests):
+        if set(manifest.previous_tables) != table_names:
+            raise ValueError(f"Shard {spec} built a different set of target tables than shard 1.")
+
+    reject_sample_cap = int(first_run.get("reject_sample_cap", DEFAULT_REJECT_SAMPLE_CAP))
+    issue_sink = issue_sink if issue_sink is not None else IssueSink()
+    reject_sink = reject_sink if reject_sink is not None else RejectSink()
+    # Issues not tied to a built table are identical in every shard.
+    run_issues = {i["table_name"]: i for i in first_run.get("issues", [])}
+    row_number_columns = first_run.get("row_number_columns", {})
+    stats: List[TableRunStats] = []
+    for target_table in sorted(table_names | set(run_issues)):
+        if target_table not in table_names:
+            issue_sink.write([run_issues[target_table]])
+            continue
+        clock = TableClock()
+        entries = [manifest.previous_tables[target_table] for manifest in manifests]
+        recorded = entries[0]["stats"]
+        headers: List[str] = []
+        writer: Optional[_StreamingTableWriter] = None
+        loads: List[TableLoad] = []
+        issues: List[Dict[str, str]] = []
+        rejects = TableRejects(target_table, reject_sample_cap)
+        try:
+            for (spec, folder), entry in zip(shards, entries):
+                path = find_table_file(folder, target_table)
+                if path is None:
+                    raise ValueError(f"Shard {spec} is missing its {target_table} output in {folder}.")
+                shard_headers, rows = read_table_rows(path)
+                if writer is None:
+                    headers = shard_headers
+                    if load_target is not None:
+                        loads = [load_target.open_table(target_table, headers)]
+                    output = open_table_output(output_dir, target_table, headers, output_format)
+                    writer = _StreamingTableWriter(output, loads)
+                elif shard_headers != headers:
+                    raise ValueError(f"Shard {spec} wrote {target_table} with different columns than shard 1.")
+                offset = writer.rows_written
+                offset_columns = set(row_number_columns.get(target_table, ()))
+                positions = [i for i, h in enumerate(headers) if h in offset_columns]
+                for row in rows:
+                    if offset:
+                        for pos in positions:
+                            v = row[pos]
+                            if v.isdigit():
+                                row[pos] = str(int(v) + offset)
+                    writer.write_values(row)
+                shard_rejects = TableRejects.from_dict(target_table, entry["rejects"], reject_sample_cap, folder)
+                rejects.absorb(shard_rejects, offset)
+                for issue in entry["issues"]:
+                    if issue not in issues:
+                        issues.append(issue)
+        except BaseException:
+            # Leave any staging table as it was rather than loading a partial merge.
+            if writer is not None:
+                writer.close(failed=True)
+            raise
+        writer.close()
+        table_stats = TableRunStats(
+            target_table=target_table,
+            source_table=recorded["source_table"],
+            rows_written=writer.rows_written,
+            columns_total=len(headers),
+            columns_populated=writer.columns_populated,
+            mapped_fields=recorded["mapped_fields"],
+            elapsed_s=clock.elapsed_s(),
+            column_stats=writer.profiler.summary(),
+        )
+        for load in loads:
+            issues.extend(_load_issues(target_table, load, writer.rows_written))
+            table_stats.rows_loaded = load.rows_loaded
+        stats.append(table_stats)
+        issue_sink.write(issues)
+        reject_sink.write(rejects)
+    # The merged tables were not built from hashed inputs, so no manifest may claim them.
+    (output_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    return stats, issue_sink, reject_sink
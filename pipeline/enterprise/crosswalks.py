@@ -1,6 +1,13 @@
 import csv
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, FrozenSet, Iterable, Optional
+
+
+# Optional key folding for crosswalk lookups; exact (stripped) matches always win.
+KEY_NORMALISATIONS = ("case", "space", "zeros")
+
+# Distinct raw values remembered per compiled crosswalk.
+TRANSLATION_CACHE_LIMIT = 65536
 
 
 def load_crosswalks(crosswalk_dir: Path) -> Dict[str, Dict[str, str]]:
@@ -53,3 +60,66 @@ def apply_crosswalk(
     if v in table:
         return table[v]
     return "__REJECT__"
+
+
+def _normalise_key(v: str, options: FrozenSet[str]) -> str:
+    if "space" in options:
+        v = " ".join(v.split())
+    if "case" in options:
+        v = v.upper()
+    if "zeros" in options and v.isdigit():
+        v = v.lstrip("0") or "0"
+    return v
+
+
+class CompiledCrosswalk:
+    """One crosswalk prepared for per-cell translation.
+
+    Normalised keys are built once. Each distinct raw value is resolved once into
+    `results` (the shared target string, "" for a blank value, None when unmapped), so
+    repeat values cost a single dict lookup: `results[raw]`, falling back to `resolve`.
+    """
+
+    __slots__ = ("name", "options", "results", "_exact", "_folded")
+
+    def __init__(self, name: str, mapping: Dict[str, str], options: Iterable[str] = ()):
+        self.name = name
+        self.options = frozenset(options)
+        unknown = self.options - set(KEY_NORMALISATIONS)
+        if unknown:
+            raise ValueError(f"Unknown crosswalk key normalisation: {', '.join(sorted(unknown))}")
+        self._exact = mapping
+        self._folded: Dict[str, str] = {}
+        if self.options:
+            for src, tgt in mapping.items():
+                self._folded.setdefault(_normalise_key(src, self.options), tgt)
+        self.results: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def translate(self, raw: str) -> Optional[str]:
+        """Translated value, "" for a blank value, or None when the value has no mapping."""
+        try:
+            return self.results[raw]
+        except KeyError:
+            return self.resolve(raw)
+
+    def resolve(self, raw: str) -> Optional[str]:
+        v = raw.strip()
+        if not v:
+            hit: Optional[str] = ""
+        else:
+            hit = self._exact.get(v)
+            if hit is None and self.options:
+                hit = self._folded.get(_normalise_key(v, self.options))
+        if len(self.results) < TRANSLATION_CACHE_LIMIT:
+            self.results[raw] = hit
+        return hit
+
+
+def compile_crosswalks(
+    crosswalks: Dict[str, Dict[str, str]], options: Iterable[str] = ()
+) -> Dict[str, CompiledCrosswalk]:
+    opts = frozenset(options)
+    return {name: CompiledCrosswalk(name, mapping, opts) for name, mapping in crosswalks.items()}
@@ -0,0 +1,76 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from .io import iter_csv
+
+
+DATE_DATA_TYPES = {"DATE"}
+DEFAULT_CACHE_SIZE = 65536
+
+# CCYYMMDD / CCYYMMDDHHMM integers as used in FCEEXT/ADMITDISCH *Int columns.
+_CCYYMMDD = re.compile(r"(\d{4})(\d{2})(\d{2})(?:\d{4})?")
+# Supersets of what strptime accepts for "%d/%m/%Y" and "%Y-%m-%d"; anything else cannot parse.
+_DMY_CANDIDATE = re.compile(r"[ \d]?\d/\d{1,2}/\d{4}")
+_ISO_CANDIDATE = re.compile(r"\d{4}-\d{1,2}-[ \d]?\d")
+
+
+def _parse_formatted(v: str) -> str:
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(v, fmt).strftime("%d/%m/%Y")
+        except ValueError:
+            continue
+    return v
+
+
+class DateNormalizer:
+    """Normalise source date values to DD/MM/YYYY.
+
+    Integer dates take a regex fast path, values that cannot match either textual format
+    are returned without calling strptime, and the remaining candidates go through a
+    bounded LRU memo so repeated dates (admission days, DOBs) are parsed once.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._parse = lru_cache(maxsize=cache_size)(_parse_formatted)
+
+    def normalize(self, value: Optional[str]) -> str:
+        v = (value or "").strip()
+        if not v:
+            return ""
+        m = _CCYYMMDD.fullmatch(v)
+        if m:
+            return f"{m.group(3)}/{m.group(2)}/{m.group(1)}"
+        if _DMY_CANDIDATE.fullmatch(v) or _ISO_CANDIDATE.fullmatch(v):
+            return self._parse(v)
+        return v
+
+    def cache_info(self):
+        return self._parse.cache_info()
+
+
+_default = DateNormalizer()
+
+
+def normalize_date(value: Optional[str]) -> str:
+    return _default.normalize(value)
+
+
+def is_date_column(field_name: str, data_type: str) -> bool:
+    # The catalog is parsed from the target guide PDF, so some date fields carry a
+    # non-DATE type (e.g. LOAD_PMI.date_registered); the field name covers those.
+    return data_type.strip().upper() in DATE_DATA_TYPES or "date" in field_name.lower()
+
+
+def load_date_columns(target_catalog_path: Path) -> Dict[str, Set[str]]:
+    """Per-table set of target fields that should have date normalisation applied."""
+    out: Dict[str, Set[str]] = {}
+    for r in iter_csv(target_catalog_path):
+        t = r.get("table_name") or ""
+        f = r.get("field_name") or ""
+        if t and f and is_date_column(f, r.get("data_type") or ""):
+            out.setdefault(t, set()).add(f)
+    return out
@@ -1,6 +1,9 @@
 import csv
+import mmap
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 
 def read_csv(path: Path) -> List[Dict[str, str]]:
@@ -8,6 +11,98 @@ def read_csv(path: Path) -> List[Dict[str, str]]:
         return list(csv.DictReader(f))
 
 
+def iter_csv(path: Path) -> Iterator[Dict[str, str]]:
+    """Yield rows one at a time so large extracts are never fully materialised."""
+    with path.open("r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_csv_records(path: Path) -> Iterator[List[str]]:
+    """Yield the header row, then each data row as a positional list padded to the header width.
+
+    Blank lines are skipped, matching DictReader, so row numbering is unchanged.
+    """
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        width = len(header)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row.extend([""] * (width - len(row)))
+            yield row
+
+
+# Bytes scanned per step; chunks are copied out of the mapping, so this bounds memory.
+ROW_COUNT_CHUNK_BYTES = 8 * 1024 * 1024
+# The second newline of an empty line ("\n\n" or "\n\r\n"); the gate checks for either in one pass.
+_BLANK_LINE = re.compile(rb"(?<=\n)\n|(?<=\n\r)\n")
+_HAS_BLANK_LINE = re.compile(rb"\n\r?\n")
+
+
+def count_csv_rows(path: Path) -> int:
+    """Number of data rows in a CSV (\\n or \\r\\n line ends), header excluded, without parsing fields.
+
+    Counts the same rows as iter_csv_records / DictReader: newlines inside quoted fields
+    do not end a record and blank lines are skipped. The file is memory-mapped and
+    scanned a chunk at a time with bytes.split / count, so the cost is close to reading
+    it; results are cached by (path, mtime, size).
+    """
+    st = path.stat()
+    return _count_csv_rows(str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+def _blank_lines(part: bytes, tail: bytes) -> int:
+    """Empty lines ending in an outside-quotes run; `tail` ends the same run in the previous chunk."""
+    n = 0
+    if _HAS_BLANK_LINE.search(part):
+        n = sum(1 for _ in _BLANK_LINE.finditer(part))
+    if tail:
+        # Only the matches whose preceding newline is in the tail.
+        edge = len(tail)
+        for m in _BLANK_LINE.finditer(tail + part[:2]):
+            if m.start() == edge or (m.start() == edge + 1 and part[:1] == b"\r"):
+                n += 1
+    return n
+
+
+@lru_cache(maxsize=1024)
+def _count_csv_rows(path: str, mtime_ns: int, size: int) -> int:
+    if size == 0:
+        return 0
+    records = 0
+    blank = 0
+    inside = False
+    tail = b""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, size, ROW_COUNT_CHUNK_BYTES):
+            chunk = mm[start : start + ROW_COUNT_CHUNK_BYTES]
+            parts = chunk.split(b'"')
+            # Quote-delimited parts alternate outside / inside a quoted field; an escaped
+            # quote ("") adds an empty part and leaves the alternation intact. Rejoining the
+            # outside parts with a quote keeps them from forming false empty lines.
+            first = 1 if inside else 0
+            outside = b'"'.join(parts[first::2])
+            records += outside.count(b"\n")
+            blank += _blank_lines(outside, tail if first == 0 else b"")
+            if len(parts) % 2 == 0:
+                inside = not inside
+            if inside:
+                tail = b""
+            else:
+                # A chunk without quotes extends the previous run (chunks shorter than the tail).
+                tail = (tail + parts[-1] if len(parts) == 1 else parts[-1])[-2:]
+        ends_with_newline = mm[size - 1 : size] == b"\n"
+    if not ends_with_newline:
+        records += 1
+    # The header is the first record.
+    return max(0, records - blank - 1)
+
+
 def write_issues_csv(path: Path, rows: List[Dict[str, str]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     fields = ["severity", "category", "table_name", "field_name", "record_id", "message"]
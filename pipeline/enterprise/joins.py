@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .rows import HeaderIndex
+
+
+# Join key groups, each with its accepted source spellings. A secondary source joins on
+# every group that both it and the base source carry (patient, then episode).
+JOIN_KEY_FIELDS: List[Tuple[str, ...]] = [
+    ("InternalPatientNumber", "Intpatno"),
+    ("EpisodeNumber",),
+]
+
+# Composite targets that take one output row per matching secondary row (1:N) from one
+# driving secondary that joins on every key group the base carries. Other secondaries,
+# coarser joins (patient-level rows against an episode-level base) and all other targets
+# take the first match.
+EXPANDING_TABLE_SUFFIXES = ("_ARCHIVE", "_CODING")
+
+JoinLookup = Dict[Tuple[str, ...], List[Tuple[str, ...]]]
+OpenRecords = Callable[[Path], Iterator[Sequence[str]]]
+
+
+def expands_matches(target_table: str) -> bool:
+    return target_table.upper().endswith(EXPANDING_TABLE_SUFFIXES)
+
+
+def resolve_key_positions(index: HeaderIndex) -> Dict[int, int]:
+    """Map each JOIN_KEY_FIELDS group number to its column position in this header."""
+    out: Dict[int, int] = {}
+    for group, names in enumerate(JOIN_KEY_FIELDS):
+        for name in names:
+            pos = index.resolve(name)
+            if pos is not None:
+                out[group] = pos
+                break
+    return out
+
+
+@dataclass
+class JoinSpec:
+    source_table: str
+    index: HeaderIndex
+    offset: int
+    base_key_positions: List[int]
+    lookup: JoinLookup
+    expand: bool = False
+
+    @property
+    def empty(self) -> Tuple[str, ...]:
+        return ("",) * len(self.index.fields)
+
+
+class JoinIndexCache:
+    """Run-scoped hash indexes on secondary sources, built once per (source, key groups).
+
+    Indexes for a source are released once every target table expected to join it has
+    taken its index.
+    """
+
+    def __init__(self, consumers: Optional[Dict[Path, int]] = None):
+        self._consumers: Dict[Path, int] = dict(consumers or {})
+        self._indexes: Dict[Tuple[Path, Tuple[int, ...]], Tuple[HeaderIndex, Tuple[int, ...], JoinLookup]] = {}
+
+    def get(
+        self, path: Path, base_groups: Tuple[int, ...], open_records: OpenRecords
+    ) -> Tuple[HeaderIndex, Tuple[int, ...], JoinLookup]:
+        """Return the secondary header, the key groups shared with the base, and the index."""
+        key = (path, base_groups)
+        built = self._indexes.get(key)
+        if built is None:
+            built = _build_lookup(open_records(path), base_groups)
+            self._indexes[key] = built
+        return built
+
+    def release(self, path: Path) -> None:
+        remaining = self._consumers.get(path, 0) - 1
+        self._consumers[path] = remaining
+        if remaining <= 0:
+            for k in [k for k in self._indexes if k[0] == path]:
+                del self._indexes[k]
+
+
+def _build_lookup(
+    records: Iterator[Sequence[str]], base_groups: Tuple[int, ...]
+) -> Tuple[HeaderIndex, Tuple[int, ...], JoinLookup]:
+    header = next(records, [])
+    index = HeaderIndex(header)
+    key_positions = resolve_key_positions(index)
+    groups = tuple(g for g in base_groups if g in key_positions)
+    lookup: JoinLookup = {}
+    if not groups:
+        close = getattr(records, "close", None)
+        if close is not None:
+            close()
+        return index, groups, lookup
+    positions = [key_positions[g] for g in groups]
+    width = len(header)
+    for row in records:
+        key = tuple(row[p].strip() for p in positions)
+        if not all(key):
+            continue
+        lookup.setdefault(key, []).append(tuple(row[:width]))
+    return index, groups, lookup
+
+
+class JoinedLayout:
+    """Column layout of a composite row: the base source followed by each joined source.
+
+    Contract fields whose primary_source_table is a joined source resolve inside that
+    source's segment, unless the base header has the column too: values the base source
+    already supplied are kept. Everything else resolves against the base header.
+    """
+
+    def __init__(self, base: HeaderIndex, joins: Optional[List[JoinSpec]] = None):
+        self.base = base
+        self.joins = joins or []
+        self._by_source = {j.source_table: j for j in self.joins}
+
+    def resolve(self, source_table: str, field: str) -> Optional[int]:
+        base_pos = self.base.resolve(field)
+        join = self._by_source.get(source_table)
+        if join is None or base_pos is not None:
+            return base_pos
+        pos = join.index.resolve(field)
+        return None if pos is None else join.offset + pos
+
+
+def join_rows(base_rows: Iterable[Sequence[str]], layout: JoinedLayout) -> Iterator[Sequence[str]]:
+    """Probe each base row into the secondary hash indexes and yield composite rows.
+
+    Unmatched probes are left-joined as empty values. The expanding join, if any, yields
+    one output row per match; every other join contributes its first match to each.
+    """
+    if not layout.joins:
+        yield from base_rows
+        return
+    width = len(layout.base.fields)
+    empties = [j.empty for j in layout.joins]
+    driver = next((i for i, j in enumerate(layout.joins) if j.expand), None)
+    for row in base_rows:
+        if len(row) > width:
+            row = row[:width]
+        parts = []
+        for j, empty in zip(layout.joins, empties):
+            key = tuple(row[p].strip() for p in j.base_key_positions)
+            matches = j.lookup.get(key) if all(key) else None
+            parts.append(matches or (empty,))
+        if driver is None:
+            yield [*row, *chain.from_iterable(p[0] for p in parts)]
+            continue
+        before = list(chain.from_iterable(p[0] for p in parts[:driver]))
+        after = list(chain.from_iterable(p[0] for p in parts[driver + 1 :]))
+        for match in parts[driver]:
+            yield [*row, *before, *match, *after]
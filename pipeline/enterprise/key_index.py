@@ -0,0 +1,142 @@
+import math
+import os
+import random
+import sqlite3
+import tempfile
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Type
+
+
+DEFAULT_KEY_INDEX = "memory"
+# About 2% false positives with 7 bits set per key in the blocked filter.
+DEFAULT_BLOOM_BITS_PER_KEY = 10
+DEFAULT_SQLITE_CACHE_MB = 16
+
+
+class KeyIndex:
+    """The key set of one parent table: filled with `add`, then queried with `missing`.
+
+    Backends are built with the parent's expected key count first; `sized` ones are given
+    the table's row count, the others 0.
+    """
+
+    sized = False
+
+    def add(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def missing(self, keys: Set[str]) -> Set[str]:
+        """The subset of `keys` that is not in the index."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryKeyIndex(KeyIndex):
+    def __init__(self, expected_keys: int = 0):
+        self.keys: Set[str] = set()
+
+    def add(self, keys: Iterable[str]) -> None:
+        self.keys.update(keys)
+
+    def missing(self, keys: Set[str]) -> Set[str]:
+        return keys - self.keys
+
+
+@lru_cache(maxsize=None)
+def _bloom_masks(hashes: int) -> List[int]:
+    # 4096 64-bit masks with `hashes` bits set each, chosen by 12 bits of a key's hash.
+    rng = random.Random(hashes)
+    return [sum(1 << b for b in rng.sample(range(64), hashes)) for _ in range(4096)]
+
+
+class BloomFilter:
+    """Blocked Bloom filter over str keys, sized for `capacity` keys at `bits_per_key`.
+
+    Each key sets and tests `hashes` bits inside one 64-bit word, so a probe is one hash,
+    one word and one mask, with no per-hash loop. Words and masks come from the built-in
+    str hash, which is salted per process, so a filter is only meaningful inside the
+    process that built it.
+    """
+
+    def __init__(self, capacity: int, bits_per_key: int = DEFAULT_BLOOM_BITS_PER_KEY):
+        self.words = array("Q", bytes(8 * max(1, (max(1, capacity) * max(1, bits_per_key) + 63) // 64)))
+        self.hashes = max(1, min(16, round(max(1, bits_per_key) * math.log(2))))
+        self._masks = _bloom_masks(self.hashes)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        words, masks, n = self.words, self._masks, len(self.words)
+        for key in keys:
+            h = hash(key)
+            words[h % n] |= masks[(h >> 52) & 0xFFF]
+
+    def maybe(self, keys: Iterable[str]) -> List[str]:
+        """The keys that may be in the filter; every other key is certainly absent."""
+        words, masks, n = self.words, self._masks, len(self.words)
+        return [k for k in keys if (words[(h := hash(k)) % n] & (m := masks[(h >> 52) & 0xFFF])) == m]
+
+
+class SqliteKeyIndex(KeyIndex):
+    """Keys in a temporary on-disk SQLite table behind an in-memory Bloom filter.
+
+    Keys the filter rules out are missing without touching the disk; the rest are confirmed
+    against the table, so results are exact. Memory is about `bits_per_key` bits per key
+    plus the SQLite page cache.
+    """
+
+    sized = True
+
+    def __init__(
+        self,
+        expected_keys: int,
+        work_dir: Optional[Path] = None,
+        bits_per_key: int = DEFAULT_BLOOM_BITS_PER_KEY,
+        cache_mb: int = DEFAULT_SQLITE_CACHE_MB,
+    ):
+        if work_dir is not None:
+            work_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix="ri_keys_", suffix=".sqlite", dir=str(work_dir) if work_dir else None)
+        os.close(fd)
+        self.path = Path(name)
+        self.bloom = BloomFilter(expected_keys, bits_per_key)
+        self._conn = sqlite3.connect(name, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(f"PRAGMA cache_size=-{max(1, cache_mb) * 1024}")
+        self._conn.execute("CREATE TABLE keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._conn.execute("CREATE TEMP TABLE probe (key TEXT)")
+
+    def add(self, keys: Iterable[str]) -> None:
+        # Sorted inserts keep the b-tree appends local.
+        batch = sorted(set(keys))
+        self.bloom.add_many(batch)
+        self._conn.execute("BEGIN")
+        self._conn.executemany("INSERT OR IGNORE INTO keys VALUES (?)", ((k,) for k in batch))
+        self._conn.execute("COMMIT")
+
+    def missing(self, keys: Set[str]) -> Set[str]:
+        maybe = self.bloom.maybe(keys)
+        out = keys.difference(maybe)
+        if maybe:
+            # Confirm the filter's candidates in one join; only the absent ones come back.
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO probe VALUES (?)", ((k,) for k in sorted(maybe)))
+            rows = self._conn.execute("SELECT key FROM probe WHERE NOT EXISTS (SELECT 1 FROM keys WHERE keys.key = probe.key)")
+            out.update(r[0] for r in rows)
+            self._conn.execute("DELETE FROM probe")
+            self._conn.execute("COMMIT")
+        return out
+
+    def close(self) -> None:
+        self._conn.close()
+        self.path.unlink(missing_ok=True)
+
+
+# Key index backends by name, built as cls(expected_keys, **options).
+KEY_INDEXES: Dict[str, Type[KeyIndex]] = {
+    "memory": MemoryKeyIndex,
+    "sqlite": SqliteKeyIndex,
+}
@@ -0,0 +1,100 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+MANIFEST_NAME = "contract_manifest.json"
+MANIFEST_VERSION = 3
+
+_CHUNK = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the enterprise ETL package source, so any transform or plugin change rebuilds."""
+    h = hashlib.sha256()
+    for p in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        h.update(p.name.encode("utf-8"))
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+class FileHasher:
+    """Run-scoped content hashes, so a source shared by several tables is read once."""
+
+    def __init__(self):
+        self._hashes: Dict[Path, str] = {}
+
+    def hash(self, path: Path) -> str:
+        if path not in self._hashes:
+            h = hashlib.sha256()
+            with path.open("rb") as f:
+                for chunk in iter(lambda: f.read(_CHUNK), b""):
+                    h.update(chunk)
+            self._hashes[path] = h.hexdigest()
+        return self._hashes[path]
+
+
+def hash_inputs(inputs: Dict[str, object]) -> str:
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContractManifest:
+    """Per-table input hashes and the run results they produced, stored beside the outputs.
+
+    `run` holds run-level settings and issues not tied to a built table; merging shard
+    outputs reads them back from each shard's manifest.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._previous: Dict[str, Dict[str, object]] = {}
+        self._current: Dict[str, Dict[str, object]] = {}
+        self.previous_run: Dict[str, object] = {}
+        self.run: Dict[str, object] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self._previous = data.get("tables", {})
+                self.previous_run = data.get("run", {})
+
+    @property
+    def previous_tables(self) -> Dict[str, Dict[str, object]]:
+        return self._previous
+
+    def lookup(self, target_table: str, input_hash: str) -> Optional[Dict[str, object]]:
+        entry = self._previous.get(target_table)
+        if not entry or entry.get("input_hash") != input_hash:
+            return None
+        return entry
+
+    def record(
+        self,
+        target_table: str,
+        input_hash: str,
+        stats: Dict[str, object],
+        issues: List[Dict[str, str]],
+        rejects: Dict[str, object],
+    ) -> None:
+        self._current[target_table] = {
+            "input_hash": input_hash,
+            "stats": stats,
+            "issues": issues,
+            "rejects": rejects,
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "code_version": code_version(),
+            "run": self.run,
+            "tables": dict(sorted(self._current.items())),
+        }
+        self.path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
@@ -0,0 +1,289 @@
+import csv
+from contextlib import nullcontext
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .io import count_csv_rows
+
+
+DEFAULT_OUTPUT_FORMAT = "csv"
+
+# Rows buffered per Parquet row group / Arrow record batch.
+COLUMNAR_BATCH_ROWS = 65536
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # type: ignore
+    except Exception as ex:
+        raise NotImplementedError(
+            "Columnar output dependency missing. Install pyarrow to enable parquet/arrow formats."
+        ) from ex
+    return pyarrow
+
+
+class TableOutput:
+    """One target table file. Row-oriented formats take row batches, columnar ones column batches."""
+
+    extension = ""
+    columnar = False
+
+    def __init__(self, path: Path, headers: List[str]):
+        self.path = path
+        self.headers = headers
+
+    def write_rows(self, rows: List[List[str]]) -> None:
+        raise NotImplementedError
+
+    def write_columns(self, columns: List[Sequence[str]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        """Give up on a failed table build; files are simply closed as they stand."""
+        self.close()
+
+
+class CsvTableOutput(TableOutput):
+    extension = ".csv"
+
+    def __init__(self, path: Path, headers: List[str]):
+        super().__init__(path, headers)
+        self._f = path.open("w", encoding="utf-8", newline="")
+        self._w = csv.writer(self._f)
+        self._w.writerow(headers)
+
+    def write_rows(self, rows: List[List[str]]) -> None:
+        self._w.writerows(rows)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class _ArrowTableOutput(TableOutput):
+    """Buffers string columns and hands them to pyarrow in large batches."""
+
+    columnar = True
+
+    def __init__(self, path: Path, headers: List[str]):
+        super().__init__(path, headers)
+        self._pa = _pyarrow()
+        self.schema = self._pa.schema([(h, self._pa.string()) for h in headers])
+        self._buffers: List[List[str]] = [[] for _ in headers]
+        self._buffered = 0
+        self._written = False
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def write_columns(self, columns: List[Sequence[str]]) -> None:
+        if not columns:
+            return
+        for buf, col in zip(self._buffers, columns):
+            buf.extend(col)
+        self._buffered += len(columns[0])
+        if self._buffered >= COLUMNAR_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        arrays = [self._pa.array(buf, type=self._pa.string()) for buf in self._buffers]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+        self._buffers = [[] for _ in self.headers]
+        self._buffered = 0
+        self._written = True
+
+    def close(self) -> None:
+        if self._buffered or not self._written:
+            self._flush()
+        self._writer.close()
+
+
+class ParquetTableOutput(_ArrowTableOutput):
+    extension = ".parquet"
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq  # type: ignore
+
+        # Target columns are low-cardinality codes and flags, so dictionary pages pay off.
+        return pq.ParquetWriter(str(self.path), self.schema, compression="zstd", use_dictionary=True)
+
+
+class ArrowTableOutput(_ArrowTableOutput):
+    extension = ".arrow"
+
+    def _open_writer(self):
+        return self._pa.ipc.new_file(str(self.path), self.schema)
+
+
+OUTPUT_FORMATS: Dict[str, type] = {
+    "csv": CsvTableOutput,
+    "parquet": ParquetTableOutput,
+    "arrow": ArrowTableOutput,
+}
+
+
+def check_output_format(output_format: str) -> None:
+    """Fail before any table is built if the format is unknown or its dependency is missing."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if OUTPUT_FORMATS[output_format].columnar:
+        _pyarrow()
+
+
+def output_path(output_dir: Path, target_table: str, output_format: str = DEFAULT_OUTPUT_FORMAT) -> Path:
+    return output_dir / f"{target_table}{OUTPUT_FORMATS[output_format].extension}"
+
+
+def open_table_output(
+    output_dir: Path, target_table: str, headers: List[str], output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> TableOutput:
+    check_output_format(output_format)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_FORMATS[output_format](output_path(output_dir, target_table, output_format), headers)
+
+
+def find_table_file(folder: Path, table: str) -> Optional[Path]:
+    """The table's file in whichever supported format was written most recently."""
+    found = [p for p in (output_path(folder, table, fmt) for fmt in OUTPUT_FORMATS) if p.exists()]
+    return max(found, key=lambda p: p.stat().st_mtime) if found else None
+
+
+def find_table_files(folder: Path) -> Dict[str, Path]:
+    """Every table in the folder mapped to its file, as `find_table_file` would pick it."""
+    tables = {p.stem for fmt in OUTPUT_FORMATS.values() for p in folder.glob(f"*{fmt.extension}")}
+    return {t: p for t, p in ((t, find_table_file(folder, t)) for t in sorted(tables)) if p is not None}
+
+
+def read_table_headers(path: Path) -> List[str]:
+    if path.suffix == ".csv":
+        with path.open("r", encoding="utf-8", newline="") as f:
+            return next(csv.reader(f), [])
+    pa = _pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        return list(pq.read_schema(str(path)).names)
+    with pa.memory_map(str(path)) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def count_table_rows(path: Path) -> int:
+    """Data rows of a target table file, from a raw scan (CSV) or file metadata (columnar)."""
+    if path.suffix == ".csv":
+        return count_csv_rows(path)
+    pa = _pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        return pq.ParquetFile(str(path)).metadata.num_rows
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def _csv_prefix_rows(lines: Iterator[str], width: int) -> Iterator[List[str]]:
+    """csv.reader rows of `lines`, of which only the first `width` fields are exact.
+
+    Lines without quotes are split directly, stopping after `width` fields. Quoted records
+    (which csv.writer writes for fields with commas, quotes or newlines) are read up to the
+    line that balances their quotes and parsed by csv.reader.
+    """
+    for line in lines:
+        if '"' not in line:
+            yield line.rstrip("\r\n").split(",", width)
+            continue
+        record = [line]
+        quotes = line.count('"')
+        while quotes % 2:
+            nxt = next(lines, None)
+            if nxt is None:
+                break
+            record.append(nxt)
+            quotes += nxt.count('"')
+        yield from csv.reader(record)
+
+
+def iter_table_column_batches(
+    path: Path, columns: List[str], batch_rows: int = COLUMNAR_BATCH_ROWS
+) -> Iterator[List[List[str]]]:
+    """Stream the named columns of a target table file as batches of column value lists.
+
+    Memory is bounded by one batch; columnar files read only the named columns. Absent
+    columns come back as empty strings.
+    """
+    if path.suffix == ".csv":
+        with path.open("r", encoding="utf-8", newline="") as f:
+            index = {h: i for i, h in enumerate(next(csv.reader([f.readline()]), []))}
+            positions = [index.get(c) for c in columns]
+            width = max((pos for pos in positions if pos is not None), default=-1) + 1
+            reader = _csv_prefix_rows(iter(f), width)
+            while True:
+                rows = list(islice(reader, batch_rows))
+                if not rows:
+                    return
+                if min(map(len, rows)) < width:
+                    # Short rows read as empty trailing cells.
+                    rows = [r + [""] * (width - len(r)) if len(r) < width else r for r in rows]
+                yield [list(map(itemgetter(pos), rows)) if pos is not None else [""] * len(rows) for pos in positions]
+    pa = _pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        pf = pq.ParquetFile(str(path))
+        present = [c for c in columns if c in set(pf.schema_arrow.names)]
+        for batch in pf.iter_batches(batch_size=batch_rows, columns=present) if present else ():
+            yield _batch_columns(batch, columns)
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield _batch_columns(reader.get_batch(i), columns)
+
+
+def _batch_columns(batch, columns: List[str]) -> List[List[str]]:
+    names = batch.schema.names
+    return [
+        [v or "" for v in batch.column(names.index(c)).to_pylist()] if c in names else [""] * batch.num_rows
+        for c in columns
+    ]
+
+
+def read_table_rows(path: Path) -> Tuple[List[str], Iterator[List[str]]]:
+    """Headers and a row iterator for a target table file; columnar files are read batch by batch."""
+    if path.suffix == ".csv":
+        f = path.open("r", encoding="utf-8", newline="")
+        reader = csv.reader(f)
+        headers = next(reader, [])
+
+        def csv_rows() -> Iterator[List[str]]:
+            with f:
+                yield from reader
+
+        return headers, csv_rows()
+    pa = _pyarrow()
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        pf = pq.ParquetFile(str(path))
+        headers = list(pf.schema_arrow.names)
+        batches = pf.iter_batches(batch_size=COLUMNAR_BATCH_ROWS)
+        source = None
+    else:
+        # Closed with the row iterator, like the CSV file above.
+        source = pa.memory_map(str(path))
+        reader = pa.ipc.open_file(source)
+        headers = list(reader.schema.names)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+    def columnar_rows() -> Iterator[List[str]]:
+        with source if source is not None else nullcontext():
+            for batch in batches:
+                columns = [[v or "" for v in col.to_pylist()] for col in batch.columns]
+                yield from (list(r) for r in zip(*columns))
+
+    return headers, columnar_rows()
@@ -0,0 +1,133 @@
+import queue
+import threading
+from typing import Callable, Generic, Iterator, List, Optional, TypeVar, Union
+
+
+# Rows handed over per queue item, and items queued before the producer blocks.
+PREFETCH_CHUNK_ROWS = 1024
+PREFETCH_MAX_CHUNKS = 8
+WRITE_QUEUE_BATCHES = 8
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class PrefetchIterator(Generic[T]):
+    """Drain an iterator on a background thread into a bounded queue of row chunks.
+
+    Reading and CSV parsing of the next rows overlap with whatever the consumer does with
+    the current ones; the bounded queue blocks the reader once it is `max_chunks` ahead.
+    `source` may also be a zero-argument callable, which is called on the reader thread so
+    that opening the source (e.g. parsing it into a cache) overlaps as well. Exceptions
+    raised by the source are re-raised in the consumer.
+    """
+
+    def __init__(
+        self,
+        source: Union[Iterator[T], Callable[[], Iterator[T]]],
+        chunk_rows: int = PREFETCH_CHUNK_ROWS,
+        max_chunks: int = PREFETCH_MAX_CHUNKS,
+    ):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_chunks))
+        self._stop = threading.Event()
+        self._chunk_rows = max(1, chunk_rows)
+        self._thread = threading.Thread(target=self._fill, args=(source,), daemon=True)
+        self._thread.start()
+        self._chunk: List[T] = []
+        self._pos = 0
+        self._done = False
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self, source: Union[Iterator[T], Callable[[], Iterator[T]]]) -> None:
+        try:
+            if callable(source):
+                source = source()
+            chunk: List[T] = []
+            for item in source:
+                chunk.append(item)
+                if len(chunk) >= self._chunk_rows:
+                    if not self._put(chunk):
+                        return
+                    chunk = []
+            if chunk and not self._put(chunk):
+                return
+            self._put(_DONE)
+        except BaseException as ex:
+            self._put(ex)
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    def __iter__(self) -> "PrefetchIterator[T]":
+        return self
+
+    def __next__(self) -> T:
+        while self._pos >= len(self._chunk):
+            if self._done:
+                raise StopIteration
+            item = self._queue.get()
+            if item is _DONE:
+                self._done = True
+                raise StopIteration
+            if isinstance(item, BaseException):
+                self._done = True
+                raise item
+            self._chunk, self._pos = item, 0
+        v = self._chunk[self._pos]
+        self._pos += 1
+        return v
+
+    def close(self) -> None:
+        """Stop the reader early (e.g. the consumer failed) and let its thread exit."""
+        self._done = True
+        self._stop.set()
+        self._thread.join()
+
+
+class BackgroundWriter:
+    """Apply `handle` to submitted batches on one background thread, in submission order.
+
+    `submit` blocks once `max_batches` are waiting, so a slow sink throttles the producer.
+    The first error stops further writes and is re-raised by the next `submit` or `close`.
+    """
+
+    def __init__(self, handle: Callable[[object], None], max_batches: int = WRITE_QUEUE_BATCHES):
+        self._handle = handle
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_batches))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._handle(item)
+            except BaseException as ex:
+                self._error = ex
+
+    def submit(self, item: object) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Wait for every submitted batch to be handled."""
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,226 @@
+import heapq
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from .key_index import DEFAULT_KEY_INDEX, KEY_INDEXES, KeyIndex
+from .models import DataIssue
+from .output_formats import count_table_rows, find_table_files, iter_table_column_batches, read_table_headers
+
+
+# Every target table's own key; FK columns hold a parent's record_number.
+PARENT_KEY = "record_number"
+
+# FK columns written by the contract ETL (a surrogate of the parent's row number).
+FK_FIELDS = {
+    "loadpmi_record_number",
+    "loadrttpwy_record_number",
+    "loadref_record_number",
+    "loadrttprd_record_number",
+    "loadowl_record_number",
+    "loadiwl_record_number",
+    "adt_adm_record_number",
+    "adt_eps_record_number",
+    "mh_dm_record_number",
+    "mh_cm_record_number",
+}
+
+# Parent tables of the abbreviated tokens in FK column names. A token with no entry here
+# resolves to LOAD_<TOKEN> when that table exists, so new FK columns need no code change.
+FK_PARENT_HINTS = {
+    "pmi": "LOAD_PMI",
+    "ref": "LOAD_REFERRALS",
+    "rttpwy": "LOAD_RTT_PATHWAYS",
+    "rttprd": "LOAD_RTT_PERIODS",
+    "rttevent": "LOAD_RTT_EVENTS",
+    "owl": "LOAD_OPDWAITLIST",
+    "iwl": "LOAD_IWL",
+    "adt_adm": "LOAD_ADT_ADMISSIONS",
+    "adt_eps": "LOAD_ADT_EPISODES",
+    "mh_dm": "LOAD_MH_DETENTION_MASTER",
+    "mh_cm": "LOAD_MH_CPA_MASTER",
+}
+
+# Missing keys reported per foreign key (the smallest, in sorted order).
+MAX_MISSING_KEYS = 200
+
+_LOAD_FK_COLUMN = re.compile(r"^load_?([a-z0-9_]+)_record_number$")
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    child: str
+    column: str
+    parent: str
+    parent_column: str = PARENT_KEY
+
+
+def fk_parent(column: str, tables: Collection[str]) -> Optional[str]:
+    """The parent table an FK column refers to, or None when the column is not an FK."""
+    col = column.lower()
+    m = _LOAD_FK_COLUMN.match(col)
+    if m is not None:
+        token = m.group(1)
+    elif col in FK_FIELDS:
+        token = col[: -len("_record_number")]
+    else:
+        return None
+    if token in FK_PARENT_HINTS:
+        return FK_PARENT_HINTS[token]
+    guess = f"LOAD_{token.upper()}"
+    return guess if guess in tables else None
+
+
+def infer_foreign_keys(headers: Mapping[str, Sequence[str]]) -> List[ForeignKey]:
+    """FK edges of the tables in `headers` (table -> columns), by child table then column order.
+
+    A hinted parent is kept even when its table is absent, so every child key is reported
+    missing rather than the check being silently dropped.
+    """
+    fks: List[ForeignKey] = []
+    for table in sorted(headers):
+        for col in headers[table]:
+            parent = fk_parent(col, headers)
+            if parent is not None and parent != table:
+                fks.append(ForeignKey(table, col, parent))
+    return fks
+
+
+def table_order(fks: Sequence[ForeignKey]) -> List[str]:
+    """Tables of the FK graph, parents before children (by name among ready tables).
+
+    Tables on a cycle follow in name order; their edges back to a later parent are
+    checked once every table has been scanned.
+    """
+    children: Dict[str, Set[str]] = {}
+    pending: Dict[str, Set[str]] = {}
+    for fk in fks:
+        pending.setdefault(fk.parent, set())
+        pending.setdefault(fk.child, set()).add(fk.parent)
+        children.setdefault(fk.parent, set()).add(fk.child)
+    ready = [t for t, parents in pending.items() if not parents]
+    heapq.heapify(ready)
+    order: List[str] = []
+    while ready:
+        table = heapq.heappop(ready)
+        order.append(table)
+        for child in children.get(table, ()):
+            parents = pending[child]
+            parents.discard(table)
+            if not parents:
+                heapq.heappush(ready, child)
+    done = set(order)
+    order.extend(sorted(t for t in pending if t not in done))
+    return order
+
+
+class _MissingKeys:
+    """The `cap` smallest distinct keys added, holding at most 2 * cap at a time."""
+
+    def __init__(self, cap: int):
+        self.cap = max(1, cap)
+        self.keys: Set[str] = set()
+        self.bound: Optional[str] = None
+
+    def update(self, keys: Iterable[str]) -> None:
+        bound = self.bound
+        self.keys.update(keys if bound is None else (k for k in keys if k < bound))
+        if len(self.keys) > 2 * self.cap:
+            kept = sorted(self.keys)[: self.cap]
+            self.keys = set(kept)
+            self.bound = kept[-1]
+
+    def smallest(self) -> List[str]:
+        return sorted(self.keys)[: self.cap]
+
+
+def _batch_keys(values: Sequence[str]) -> Set[str]:
+    keys = set(map(str.strip, values))
+    keys.discard("")
+    return keys
+
+
+def _scan(path: Optional[Path], own_keys: Optional[KeyIndex], checks: Sequence[tuple]) -> None:
+    """Stream a table once: index its record_number keys and check its FK columns."""
+    if path is None:
+        return
+    columns = ([PARENT_KEY] if own_keys is not None else []) + [fk.column for fk, _, _ in checks]
+    if not columns:
+        return
+    for batch in iter_table_column_batches(path, columns):
+        values = iter(batch)
+        if own_keys is not None:
+            own_keys.add(_batch_keys(next(values)))
+        for (_, parent_keys, missing), col in zip(checks, values):
+            keys = _batch_keys(col)
+            if keys:
+                keys = parent_keys.missing(keys)
+            if keys:
+                missing.update(keys)
+
+
+def check_referential_integrity(
+    target_dir: Path,
+    max_missing: int = MAX_MISSING_KEYS,
+    key_index: str = DEFAULT_KEY_INDEX,
+    index_options: Optional[Dict[str, object]] = None,
+) -> List[DataIssue]:
+    """Check every inferred FK column of the target tables against its parent's record_number.
+
+    Tables are streamed once each, parents first, reading only key columns. A parent's key
+    set is kept only until its last child has been checked, in the `key_index` backend
+    (see key_index.KEY_INDEXES) built with `index_options`.
+    """
+    if key_index not in KEY_INDEXES:
+        raise ValueError(f"Unsupported key index: {key_index} (expected one of {', '.join(sorted(KEY_INDEXES))})")
+    index_cls = KEY_INDEXES[key_index]
+    files = find_table_files(target_dir)
+
+    def new_index(table: str) -> KeyIndex:
+        path = files.get(table)
+        expected = count_table_rows(path) if index_cls.sized and path is not None else 0
+        return index_cls(expected, **(index_options or {}))
+
+    fks = infer_foreign_keys({t: read_table_headers(p) for t, p in files.items()})
+    order = table_order(fks)
+    position = {t: i for i, t in enumerate(order)}
+    deferred = {fk for fk in fks if position[fk.parent] > position[fk.child]}
+    # Index in `order` after which each parent's keys can be dropped.
+    last_use: Dict[str, int] = {}
+    for fk in fks:
+        last_use[fk.parent] = max(last_use.get(fk.parent, -1), len(order) if fk in deferred else position[fk.child])
+    missing = {fk: _MissingKeys(max_missing) for fk in fks}
+    checks_by_child: Dict[str, List[ForeignKey]] = {}
+    for fk in fks:
+        if fk not in deferred:
+            checks_by_child.setdefault(fk.child, []).append(fk)
+
+    keys: Dict[str, KeyIndex] = {}
+    try:
+        for i, table in enumerate(order):
+            own_keys = new_index(table) if table in last_use else None
+            if own_keys is not None:
+                keys[table] = own_keys
+            checks = [(fk, keys[fk.parent], missing[fk]) for fk in checks_by_child.get(table, [])]
+            _scan(files.get(table), own_keys, checks)
+            for parent in [p for p in keys if last_use[p] == i]:
+                keys.pop(parent).close()
+        for fk in sorted(deferred, key=fks.index):
+            _scan(files.get(fk.child), None, [(fk, keys[fk.parent], missing[fk])])
+    finally:
+        for index in keys.values():
+            index.close()
+
+    return [
+        DataIssue(
+            severity="ERROR",
+            category="TARGET_REF_INTEGRITY",
+            table_name=fk.child,
+            field_name=fk.column,
+            record_id=key,
+            message=f"Key '{key}' not found in parent {fk.parent}.{fk.parent_column}.",
+        )
+        for fk in fks
+        for key in missing[fk].smallest()
+    ]
@@ -0,0 +1,70 @@
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+class HeaderIndex:
+    """Header -> column position map for one source file, built once per file.
+
+    Resolution mirrors DictReader semantics: exact header names win, the last duplicate
+    header wins, and contract fields fall back to a case-insensitive match
+    (e.g. contract `Intpatno` vs source `IntPatNo`).
+    """
+
+    __slots__ = ("fields", "positions", "_lower")
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self.positions: Dict[str, int] = {f: pos for pos, f in enumerate(self.fields)}
+        self._lower: Dict[str, int] = {f.lower(): self.positions[f] for f in self.fields}
+
+    def resolve(self, field: str) -> Optional[int]:
+        if field in self.positions:
+            return self.positions[field]
+        return self._lower.get(field.lower())
+
+
+class SourceRowView:
+    """Read-only mapping view over a positional source row.
+
+    Lets dict-style consumers such as domain plugins read fields by name without a dict
+    being built per row; the ETL loop rebinds `values` for each row.
+    """
+
+    __slots__ = ("index", "values")
+
+    def __init__(self, index: HeaderIndex, values: Sequence[str] = ()):
+        self.index = index
+        self.values = values
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        pos = self.index.positions.get(key)
+        if pos is None:
+            return default
+        return self.values[pos]
+
+    def __getitem__(self, key: str) -> str:
+        return self.values[self.index.positions[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index.positions)
+
+    def __len__(self) -> int:
+        return len(self.index.positions)
+
+    def keys(self) -> List[str]:
+        return list(self.index.positions)
+
+
+class TargetRowView(SourceRowView):
+    """Mapping view over a target row held as a list in header order.
+
+    Domain plugin rules read other columns by name through it while the ETL loop keeps
+    writing plain lists; `values` is rebound to each row's list, so no dict is built per row.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self.values[self.index.positions[key]] = value
@@ -0,0 +1,179 @@
+import hashlib
+import heapq
+import math
+import random
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+SAMPLE_STRATEGIES = ("head", "random", "patients")
+DEFAULT_SAMPLE_STRATEGY = "patients"
+DEFAULT_SAMPLE_SEED = 42
+# Two-sided 95% normal quantile for the reported intervals.
+_Z95 = 1.959964
+
+
+@dataclass(frozen=True)
+class SampleSpec:
+    """Build at most `size` rows of every base source, chosen by `strategy`.
+
+    head takes the first rows; random is a seeded reservoir sample; patients is a cluster
+    sample that keeps whole patients, taking those whose seeded patient-key hash is
+    smallest, so every table samples the same patients and joins and child tables stay
+    consistent.
+    """
+
+    size: int
+    strategy: str = DEFAULT_SAMPLE_STRATEGY
+    seed: int = DEFAULT_SAMPLE_SEED
+
+    def __post_init__(self):
+        if self.size < 1:
+            raise ValueError(f"Sample size must be at least 1, got {self.size}")
+        if self.strategy not in SAMPLE_STRATEGIES:
+            raise ValueError(f"Unknown sample strategy: {self.strategy!r} (expected one of {', '.join(SAMPLE_STRATEGIES)})")
+
+    def __str__(self) -> str:
+        return f"{self.strategy}:{self.size}" + ("" if self.strategy == "head" else f":seed{self.seed}")
+
+    @property
+    def dir_name(self) -> str:
+        return f"sample_{self.strategy}_{self.size}"
+
+    @property
+    def representative(self) -> bool:
+        # The first rows of an extract are usually its oldest; their ratios can be far off.
+        return self.strategy != "head"
+
+    def rows(
+        self,
+        rows: Iterable[Sequence[str]],
+        key_fn: Callable[[Sequence[str], int], str],
+        salt: str,
+        count_rows: Optional[Callable[[], int]] = None,
+    ) -> "SampledRows":
+        return SampledRows(self, rows, key_fn, salt, count_rows)
+
+
+class SampledRows:
+    """The sampled rows of one base source, in source order.
+
+    `population` (the source's row count) is known once iteration ends; `sampled` is the
+    number of rows yielded and, for a patients sample, `patients` the number of patients
+    they belong to. random and patients read the whole source. head stops after its rows
+    when `count_rows` can count the source without parsing it.
+    """
+
+    def __init__(
+        self,
+        spec: SampleSpec,
+        rows: Iterable[Sequence[str]],
+        key_fn: Callable[[Sequence[str], int], str],
+        salt: str,
+        count_rows: Optional[Callable[[], int]] = None,
+    ):
+        self.spec = spec
+        self.population = 0
+        self.sampled = 0
+        self.patients: Optional[int] = None
+        self._rows = rows
+        self._key_fn = key_fn
+        self._salt = salt
+        self._count_rows = count_rows
+
+    def __iter__(self) -> Iterator[Sequence[str]]:
+        if self.spec.strategy == "head":
+            chosen: Iterable[Sequence[str]] = self._head()
+        elif self.spec.strategy == "random":
+            chosen = self._random()
+        else:
+            chosen = self._patients()
+        for src in chosen:
+            self.sampled += 1
+            yield src
+
+    def _head(self) -> Iterator[Sequence[str]]:
+        it = iter(self._rows)
+        for src in it:
+            self.population += 1
+            yield src
+            if self.population >= self.spec.size:
+                break
+        else:
+            return
+        if self._count_rows is not None:
+            self.population = self._count_rows()
+            return
+        # Keep counting so the population is known; no rows are transformed past the sample.
+        for _ in it:
+            self.population += 1
+
+    def _random(self) -> List[Sequence[str]]:
+        rng = random.Random(f"{self.spec.seed}:{self._salt}")
+        size = self.spec.size
+        reservoir: List[Tuple[int, Sequence[str]]] = []
+        for seq, src in enumerate(self._rows):
+            self.population += 1
+            if seq < size:
+                reservoir.append((seq, src))
+            else:
+                j = rng.randrange(seq + 1)
+                if j < size:
+                    reservoir[j] = (seq, src)
+        reservoir.sort(key=lambda x: x[0])
+        return [src for _, src in reservoir]
+
+    def _patients(self) -> List[Sequence[str]]:
+        key_fn = self._key_fn
+        seed = str(self.spec.seed).encode("utf-8")
+        size = self.spec.size
+        # Max-heap (negated) of the `size` rows with the smallest (patient hash, position).
+        heap: List[Tuple[int, int, Sequence[str]]] = []
+        # Smallest patient hash among the rows left out.
+        cut: Optional[int] = None
+        for seq, src in enumerate(self._rows):
+            self.population += 1
+            # Rows without a patient key are patients of their own.
+            key = key_fn(src, 0) or f"#{seq}"
+            h = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8, key=seed).digest(), "big")
+            if len(heap) < size:
+                heapq.heappush(heap, (-h, -seq, src))
+                continue
+            top_h, top_seq, _ = heap[0]
+            if (h, seq) < (-top_h, -top_seq):
+                heapq.heapreplace(heap, (-h, -seq, src))
+                dropped = -top_h
+            else:
+                dropped = h
+            cut = dropped if cut is None else min(cut, dropped)
+        # A patient with rows on both sides of the cut is dropped, so kept patients are whole.
+        kept = [(h, -s, src) for h, s, src in heap if cut is None or -h < cut]
+        self.patients = len({h for h, _, _ in kept})
+        kept.sort(key=lambda x: x[1])
+        return [src for _, _, src in kept]
+
+
+def proportion_interval(
+    successes: int, n: int, population: Optional[int] = None, design_effect: float = 1.0
+) -> Tuple[float, float, float]:
+    """Ratio and approximate 95% Wilson score interval for `successes` out of `n` sampled rows.
+
+    The rows of a cluster sample are not independent, so the sample size is divided by
+    `design_effect`; passing the mean rows per cluster counts each cluster once, which
+    errs wide when rows of a cluster differ. With a finite `population`, the sample size
+    is inflated by the finite population correction, so the interval shrinks to the
+    observed ratio as the sample nears the whole population.
+    """
+    if n <= 0:
+        return 0.0, 0.0, 1.0
+    p = successes / n
+    if population is not None and population <= n:
+        return p, p, p
+    n_eff = n / max(1.0, design_effect)
+    if population is not None and population > 1:
+        n_eff *= (population - 1) / (population - n)
+    z2 = _Z95 * _Z95
+    denom = 1 + z2 / n_eff
+    centre = (p + z2 / (2 * n_eff)) / denom
+    half = _Z95 * math.sqrt(p * (1 - p) / n_eff + z2 / (4 * n_eff * n_eff)) / denom
+    return p, max(0.0, centre - half), min(1.0, centre + half)
@@ -0,0 +1,70 @@
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
+
+
+_SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+_SHARD_DIR_RE = re.compile(r"^shard_(\d+)_of_(\d+)$")
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Shard `index` (1-based) of `count`; a base-source row belongs to the shard its patient key hashes to."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, text: str) -> "ShardSpec":
+        m = _SHARD_RE.match(text or "")
+        if not m:
+            raise ValueError(f"Invalid shard: {text!r} (expected i/N, e.g. 2/8)")
+        index, count = int(m.group(1)), int(m.group(2))
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard: {text!r} (need 1 <= i <= N)")
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    @property
+    def dir_name(self) -> str:
+        return f"shard_{self.index}_of_{self.count}"
+
+    @property
+    def is_first(self) -> bool:
+        return self.index == 1
+
+    def owns(self, key: str) -> bool:
+        # crc32 rather than hash(): every node must agree on the split. Rows without a
+        # patient key (crc32 of "" is 0) all land in shard 1.
+        return zlib.crc32(key.encode("utf-8")) % self.count == self.index - 1
+
+    def filter_rows(
+        self, rows: Iterable[Sequence[str]], key_fn: Callable[[Sequence[str], int], str]
+    ) -> Iterator[Sequence[str]]:
+        owns = self.owns
+        for src in rows:
+            if owns(key_fn(src, 0)):
+                yield src
+
+
+def find_shard_dirs(output_dir: Path) -> List[Tuple[ShardSpec, Path]]:
+    """The shard output folders under output_dir, checked to be one complete i/N set."""
+    found = []
+    for p in sorted(output_dir.glob("shard_*_of_*")):
+        m = _SHARD_DIR_RE.match(p.name)
+        if m and p.is_dir():
+            found.append((ShardSpec(int(m.group(1)), int(m.group(2))), p))
+    if not found:
+        raise ValueError(f"No shard_<i>_of_<N> folders under {output_dir}")
+    counts = {spec.count for spec, _ in found}
+    if len(counts) != 1:
+        raise ValueError(f"Shard folders under {output_dir} mix shard counts: {sorted(counts)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {spec.index for spec, _ in found})
+    if missing:
+        raise ValueError(f"Missing shards under {output_dir}: " + ", ".join(f"{i}/{count}" for i in missing))
+    return sorted(found, key=lambda x: x[0].index)
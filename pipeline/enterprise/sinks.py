@@ -0,0 +1,215 @@
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+ISSUE_FIELDS = ["severity", "category", "table_name", "field_name", "record_id", "message"]
+REJECT_FIELDS = [
+    "severity",
+    "category",
+    "table_name",
+    "field_name",
+    "record_id",
+    "source_value",
+    "crosswalk_name",
+    "message",
+]
+REJECT_SUMMARY_FIELDS = ["table_name", "field_name", "crosswalk_name", "source_value", "reject_count", "sampled_rows"]
+
+# Detail rows kept per (table, field, crosswalk, value); counts are always exact.
+DEFAULT_REJECT_SAMPLE_CAP = 100
+# Detail rows kept per table across all its groups, so many distinct bad values stay bounded.
+REJECT_TABLE_CAP = 10000
+# Folder beside the table outputs holding each table's detail rows, for reuse and shard merges.
+REJECT_DETAILS_DIR = "_reject_details"
+
+RejectKey = Tuple[str, str, str]
+
+
+class TableRejects:
+    """Crosswalk rejects for one target table: exact counts per group, capped detail rows.
+
+    Detail rows are capped at `sample_cap` per group and `table_cap` for the whole table.
+    """
+
+    __slots__ = ("target_table", "sample_cap", "table_cap", "counts", "details")
+
+    def __init__(
+        self, target_table: str, sample_cap: int = DEFAULT_REJECT_SAMPLE_CAP, table_cap: int = REJECT_TABLE_CAP
+    ):
+        self.target_table = target_table
+        self.sample_cap = max(0, sample_cap)
+        self.table_cap = max(0, table_cap)
+        self.counts: Dict[RejectKey, int] = {}
+        self.details: List[Dict[str, str]] = []
+
+    def add(self, field_name: str, crosswalk_name: str, source_value: str, record_id: int) -> None:
+        key = (field_name, crosswalk_name, source_value)
+        n = self.counts.get(key, 0) + 1
+        self.counts[key] = n
+        if n > self.sample_cap or len(self.details) >= self.table_cap:
+            return
+        self.details.append(
+            {
+                "severity": "WARN",
+                "category": "CROSSWALK_REJECT",
+                "table_name": self.target_table,
+                "field_name": field_name,
+                "record_id": str(record_id),
+                "source_value": source_value,
+                "crosswalk_name": crosswalk_name,
+                "message": f"Value '{source_value}' not found in crosswalk '{crosswalk_name}'.",
+            }
+        )
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def absorb(self, other: "TableRejects", record_offset: int = 0) -> None:
+        """Fold in another part of the same table (e.g. a shard), shifting its record ids.
+
+        Counts add up exactly; detail rows are kept in arrival order up to both caps.
+        """
+        sampled: Dict[RejectKey, int] = {}
+        for r in self.details:
+            key = (r["field_name"], r["crosswalk_name"], r["source_value"])
+            sampled[key] = sampled.get(key, 0) + 1
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        for r in other.details:
+            if len(self.details) >= self.table_cap:
+                break
+            key = (r["field_name"], r["crosswalk_name"], r["source_value"])
+            if sampled.get(key, 0) >= self.sample_cap:
+                continue
+            sampled[key] = sampled.get(key, 0) + 1
+            self.details.append({**r, "record_id": str(int(r["record_id"]) + record_offset)})
+
+    def to_dict(self) -> Dict[str, object]:
+        """Counts only; detail rows are kept on disk by `save_details`."""
+        return {"counts": [[f, cw, v, n] for (f, cw, v), n in self.counts.items()]}
+
+    @classmethod
+    def from_dict(
+        cls, target_table: str, data: Dict[str, object], sample_cap: int, folder: Optional[Path] = None
+    ) -> "TableRejects":
+        """Rebuild from `to_dict`, with detail rows read back from `folder` when given."""
+        out = cls(target_table, sample_cap)
+        out.counts = {(f, cw, v): int(n) for f, cw, v, n in data.get("counts", [])}
+        if folder is not None:
+            path = _details_path(folder, target_table)
+            if path.exists():
+                with path.open("r", encoding="utf-8", newline="") as f:
+                    out.details = list(csv.DictReader(f))
+        return out
+
+    def save_details(self, folder: Path) -> None:
+        """Write the detail rows beside the table outputs in `folder` (none: remove any old ones)."""
+        path = _details_path(folder, self.target_table)
+        if not self.details:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=REJECT_FIELDS)
+            w.writeheader()
+            w.writerows(self.details)
+
+
+def _details_path(folder: Path, target_table: str) -> Path:
+    return folder / REJECT_DETAILS_DIR / f"{target_table}.csv"
+
+
+class _CsvSink:
+    """Append-only CSV writer; without a path, rows are kept in memory instead."""
+
+    fields: List[str] = []
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.rows: List[Dict[str, str]] = []
+        self.rows_written = 0
+        self._f = None
+        self._w = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = path.open("w", encoding="utf-8", newline="")
+            self._w = csv.DictWriter(self._f, fieldnames=self.fields)
+            self._w.writeheader()
+
+    def _write_rows(self, rows: List[Dict[str, str]]) -> None:
+        if self._w is not None:
+            self._w.writerows(rows)
+        else:
+            self.rows.extend(rows)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class IssueSink(_CsvSink):
+    """Streams run issues to the issues CSV as each table finishes, counting by severity."""
+
+    fields = ISSUE_FIELDS
+
+    def __init__(self, path: Optional[Path] = None):
+        super().__init__(path)
+        self.severity_counts: Dict[str, int] = {"ERROR": 0, "WARN": 0, "INFO": 0}
+
+    def write(self, issues: List[Dict[str, str]]) -> None:
+        for i in issues:
+            self.severity_counts[i["severity"]] = self.severity_counts.get(i["severity"], 0) + 1
+        self._write_rows(issues)
+
+
+class RejectSink(_CsvSink):
+    """Streams sampled reject rows to the rejects CSV and keeps exact run-wide group counts."""
+
+    fields = REJECT_FIELDS
+
+    def __init__(self, path: Optional[Path] = None):
+        super().__init__(path)
+        self.counts: Dict[Tuple[str, str, str, str], int] = {}
+        self.sampled: Dict[Tuple[str, str, str, str], int] = {}
+
+    def write(self, table_rejects: TableRejects) -> None:
+        table = table_rejects.target_table
+        for (f, cw, v), n in table_rejects.counts.items():
+            key = (table, f, cw, v)
+            self.counts[key] = self.counts.get(key, 0) + n
+        for r in table_rejects.details:
+            key = (table, r["field_name"], r["crosswalk_name"], r["source_value"])
+            self.sampled[key] = self.sampled.get(key, 0) + 1
+        self._write_rows(table_rejects.details)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def write_summary(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=REJECT_SUMMARY_FIELDS)
+            w.writeheader()
+            for key in sorted(self.counts, key=lambda k: (-self.counts[k], k)):
+                table, field_name, cw, value = key
+                w.writerow(
+                    {
+                        "table_name": table,
+                        "field_name": field_name,
+                        "crosswalk_name": cw,
+                        "source_value": value,
+                        "reject_count": self.counts[key],
+                        "sampled_rows": self.sampled.get(key, 0),
+                    }
+                )
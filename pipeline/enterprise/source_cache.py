@@ -0,0 +1,158 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .io import iter_csv_records
+
+
+DEFAULT_BUDGET_MB = 512
+
+_PTR_SIZE = 8
+_TUPLE_OVERHEAD = sys.getsizeof(())
+
+
+class _ColumnTable:
+    """A parsed source file held column-wise, with repeated values sharing one string object."""
+
+    __slots__ = ("header", "columns", "row_count", "size_bytes")
+
+    def __init__(self, header: List[str], columns: List[Tuple[str, ...]], row_count: int, size_bytes: int):
+        self.header = header
+        self.columns = columns
+        self.row_count = row_count
+        self.size_bytes = size_bytes
+
+    def records(self) -> Iterator[Sequence[str]]:
+        yield self.header
+        if self.columns:
+            yield from zip(*self.columns)
+        else:
+            # Header-less width: keep one empty record per parsed row.
+            yield from (() for _ in range(self.row_count))
+
+
+def _load_columns(path: Path, budget_bytes: int) -> Optional[_ColumnTable]:
+    """Parse a source file into columns, or return None once it exceeds the budget."""
+    records = iter_csv_records(path)
+    header = next(records, [])
+    width = len(header)
+    buffers: List[List[str]] = [[] for _ in range(width)]
+    pool: Dict[str, str] = {}
+    size = _TUPLE_OVERHEAD * width
+    rows = 0
+    for row in records:
+        rows += 1
+        size += _PTR_SIZE * width
+        for pos in range(width):
+            v = row[pos]
+            shared = pool.get(v)
+            if shared is None:
+                pool[v] = shared = v
+                size += sys.getsizeof(v)
+            buffers[pos].append(shared)
+        # The intern dict lives until the parse ends, so it counts against the budget too.
+        if size + sys.getsizeof(pool) > budget_bytes:
+            records.close()
+            return None
+    return _ColumnTable(header, [tuple(b) for b in buffers], rows, size + sys.getsizeof(pool))
+
+
+class SourceTableCache:
+    """Run-scoped cache of parsed source tables shared across target tables.
+
+    Sources are cached only when more than one target table reads them. Entries are
+    evicted least-recently-used once the memory budget is exceeded, and dropped as soon as
+    their last expected consumer has opened them. Sources that do not fit the budget are
+    streamed from disk as before.
+
+    `open` may be called from several threads (e.g. prefetch readers). A source is parsed
+    outside the lock by the first thread that needs it; other consumers of the same source
+    wait for that parse instead of repeating it.
+    """
+
+    def __init__(self, budget_bytes: int, consumers: Optional[Dict[Path, int]] = None):
+        self.budget_bytes = budget_bytes
+        self._consumers: Dict[Path, int] = dict(consumers or {})
+        self._entries: "OrderedDict[Path, _ColumnTable]" = OrderedDict()
+        self._uncacheable: set = set()
+        self._loading: Dict[Path, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(e.size_bytes for e in list(self._entries.values()))
+
+    def open(self, path: Path, consume: bool = True) -> Iterator[Sequence[str]]:
+        """Return the header followed by positional rows, from memory when cached.
+
+        `consume=False` reads through the cache without counting as one of the expected
+        consumers and without loading the file into it (used for join-index builds).
+        """
+        if not consume:
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.records()
+                self.misses += 1
+            return iter_csv_records(path)
+
+        with self._lock:
+            remaining = self._consumers.get(path, 0) - 1
+            self._consumers[path] = remaining
+            loading = self._loading.get(path)
+            if loading is None:
+                entry = self._take(path, remaining)
+                if entry is not None:
+                    return entry.records()
+                self.misses += 1
+                if remaining <= 0 or self.budget_bytes <= 0 or path in self._uncacheable:
+                    return iter_csv_records(path)
+                self._loading[path] = threading.Event()
+
+        if loading is None:
+            return self._fill(path)
+        loading.wait()
+        with self._lock:
+            entry = self._take(path, remaining)
+            if entry is None:
+                self.misses += 1
+        return iter_csv_records(path) if entry is None else entry.records()
+
+    def _fill(self, path: Path) -> Iterator[Sequence[str]]:
+        # Parse outside the lock; consumers that opened the source meanwhile take it from here.
+        entry = None
+        try:
+            entry = _load_columns(path, self.budget_bytes)
+            with self._lock:
+                if entry is None:
+                    self._uncacheable.add(path)
+                else:
+                    self._entries[path] = entry
+                    self._evict()
+        finally:
+            with self._lock:
+                self._loading.pop(path).set()
+        return iter_csv_records(path) if entry is None else entry.records()
+
+    def _take(self, path: Path, remaining: int) -> Optional[_ColumnTable]:
+        # Called with the lock held: hand out a cached entry, dropping it after its last consumer.
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        self.hits += 1
+        if remaining <= 0:
+            del self._entries[path]
+        else:
+            self._entries.move_to_end(path)
+        return entry
+
+    def _evict(self) -> None:
+        total = self.size_bytes
+        while total > self.budget_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            total -= old.size_bytes
@@ -0,0 +1,82 @@
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+
+# Per-table stages timed by --profile-stages. "transform" excludes the nested crosswalk time.
+STAGES = ("source_read", "transform", "crosswalk", "plugins", "write")
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Accumulates perf_counter time per stage for one table build."""
+
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+
+    def timed_iter(self, items: Iterable[T], stage: str) -> Iterator[T]:
+        """Yield from items, charging the time spent producing each one to the stage."""
+        clock = time.perf_counter
+        it = iter(items)
+        while True:
+            start = clock()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.seconds[stage] += clock() - start
+                return
+            self.seconds[stage] += clock() - start
+            yield item
+
+    def timed(self, fn: Callable[..., T], stage: str) -> Callable[..., T]:
+        clock = time.perf_counter
+        seconds = self.seconds
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return fn(*args)
+            finally:
+                seconds[stage] += clock() - start
+
+        return wrapper
+
+    def result(self) -> Dict[str, float]:
+        out = dict(self.seconds)
+        out["transform"] = max(0.0, out["transform"] - out["crosswalk"])
+        return {k: round(v, 4) for k, v in out.items()}
+
+
+def start_memory_trace() -> bool:
+    """Start tracemalloc unless it is already tracing; True when this call started it."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start()
+    return True
+
+
+def stop_memory_trace(started: bool) -> None:
+    """Stop tracemalloc if the matching start_memory_trace call started it."""
+    if started:
+        tracemalloc.stop()
+
+
+class TableClock:
+    """Wall time and, when tracemalloc is tracing, peak traced memory for one table build."""
+
+    def __init__(self):
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def elapsed_s(self) -> float:
+        return round(time.perf_counter() - self._start, 4)
+
+    def peak_traced_kb(self) -> Optional[int]:
+        if not self._tracing:
+            return None
+        return tracemalloc.get_traced_memory()[1] // 1024
@@ -1,5 +1,44 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .rows import HeaderIndex, TargetRowView
+
+
+# A rule computes one target column from its current value, the target row, the source row
+# and the 1-based row number.
+RuleFn = Callable[[str, Mapping[str, str], Mapping[str, str], int], str]
+# Applies a table's bound rules in place to a TargetRowView over the table's headers.
+RowPlugin = Callable[[TargetRowView, Mapping[str, str], int], None]
+
+
+@dataclass(frozen=True)
+class DomainPlugin:
+    name: str
+    # Target table names or fnmatch patterns (e.g. "LOAD_PMI*"), matched upper-case.
+    tables: Tuple[str, ...]
+    # Target column -> rule; a rule is bound only when its column is in the table.
+    rules: Dict[str, RuleFn]
+
+    def applies_to(self, target_table: str) -> bool:
+        tt = target_table.upper()
+        return any(fnmatchcase(tt, pattern) for pattern in self.tables)
+
+
+DOMAIN_PLUGINS: List[DomainPlugin] = []
+
+
+@lru_cache(maxsize=None)
+def _compiled_for(target_table: str, headers: Tuple[str, ...]) -> Optional[RowPlugin]:
+    return compile_domain_plugins(target_table, headers)
+
+
+def register_domain_plugin(plugin: DomainPlugin) -> DomainPlugin:
+    DOMAIN_PLUGINS.append(plugin)
+    _compiled_for.cache_clear()
+    return plugin
 
 
 def _upper(v: str) -> str:
@@ -20,6 +59,12 @@ def _fmt_date(d: datetime) -> str:
     return d.strftime("%d/%m/%Y")
 
 
+@lru_cache(maxsize=65536)
+def _days_after(v: str, days: int) -> str:
+    d = _parse_date(v)
+    return _fmt_date(d + timedelta(days=days)) if d else ""
+
+
 def _default_title(sex: str) -> str:
     s = (sex or "").strip().upper()
     if s in {"1", "M"}:
@@ -29,102 +74,141 @@ def _default_title(sex: str) -> str:
     return "MX"
 
 
-def apply_domain_plugins(target_table: str, row: Dict[str, str], source_row: Dict[str, str], row_num: int) -> None:
-    tt = target_table.upper()
-    _apply_pmi_plugins(tt, row, source_row, row_num)
-    _apply_adt_plugins(tt, row, source_row, row_num)
-    _apply_opd_plugins(tt, row, source_row, row_num)
-
-
-def _apply_pmi_plugins(target_table: str, row: Dict[str, str], source_row: Dict[str, str], row_num: int) -> None:
-    if not target_table.startswith("LOAD_PMI"):
-        return
-
-    if "main_crn_type" in row and not row["main_crn_type"]:
-        row["main_crn_type"] = "PAS"
-
-    if "main_crn" in row and not row["main_crn"]:
-        row["main_crn"] = (source_row.get("InternalPatientNumber") or source_row.get("Intpatno") or "").strip()
-
-    if "nhs_number" in row:
-        row["nhs_number"] = "".join(ch for ch in row["nhs_number"] if ch.isdigit())
-
-    if "title" in row and not row["title"]:
-        row["title"] = _default_title(row.get("sex", ""))
-
-    if "date_registered" in row and not row["date_registered"]:
-        row["date_registered"] = "01/01/2000"
-
-    if "pat_name_1" in row:
-        row["pat_name_1"] = _upper(row["pat_name_1"])
-    if "pat_name_family" in row:
-        row["pat_name_family"] = _upper(row["pat_name_family"])
-    if "post_code" in row:
-        row["post_code"] = _upper(row["post_code"])
-
-    if target_table == "LOAD_PMIADDRS":
-        if "address_type" in row and not row["address_type"]:
-            row["address_type"] = "H"
-        if "applies_start" in row and not row["applies_start"]:
-            row["applies_start"] = "01/01/2000"
-        if "applies_end" in row and not row["applies_end"]:
-            row["applies_end"] = "31/12/9999"
-
-    if target_table == "LOAD_PMICONTACTS":
-        if "contact_type" in row and not row["contact_type"]:
-            row["contact_type"] = "NOK"
-        if "applies_start" in row and not row["applies_start"]:
-            row["applies_start"] = "01/01/2000"
-        if "applies_end" in row and not row["applies_end"]:
-            row["applies_end"] = "31/12/9999"
-
-
-def _apply_adt_plugins(target_table: str, row: Dict[str, str], source_row: Dict[str, str], row_num: int) -> None:
-    if not target_table.startswith("LOAD_ADT"):
-        return
-
-    if target_table == "LOAD_ADT_ADMISSIONS":
-        adm = _parse_date(row.get("admit_date", ""))
-        if adm and "estimated_discharge_date" in row and not row["estimated_discharge_date"]:
-            row["estimated_discharge_date"] = _fmt_date(adm + timedelta(days=3))
-        if adm and "discharge_date" in row and not row["discharge_date"]:
-            row["discharge_date"] = _fmt_date(adm + timedelta(days=3))
-        if "admission_type" in row and not row["admission_type"]:
-            row["admission_type"] = "ELEC"
-        if "admit_type" in row and not row["admit_type"]:
-            row["admit_type"] = "E"
-
-    if target_table == "LOAD_ADT_EPISODES":
-        if "episode_order" in row and not row["episode_order"]:
-            row["episode_order"] = "1"
-        if "duration_of_episode" in row and not row["duration_of_episode"]:
-            row["duration_of_episode"] = "3"
-
-    if target_table == "LOAD_ADT_WARDSTAYS":
-        if "is_home_stay" in row and not row["is_home_stay"]:
-            row["is_home_stay"] = "N"
-        if "is_awol" in row and not row["is_awol"]:
-            row["is_awol"] = "N"
-        if "bed_location" in row and not row["bed_location"]:
-            row["bed_location"] = f"BED{row_num:03d}"
-
-
-def _apply_opd_plugins(target_table: str, row: Dict[str, str], source_row: Dict[str, str], row_num: int) -> None:
-    if not target_table.startswith("LOAD_OPD"):
-        return
-
-    if target_table == "LOAD_OPD_APPOINTMENTS":
-        if "walkin_flag" in row and not row["walkin_flag"]:
-            row["walkin_flag"] = "N"
-        if "time_arrived" in row and not row["time_arrived"]:
-            row["time_arrived"] = "09:00"
-        if "time_seen" in row and not row["time_seen"]:
-            row["time_seen"] = "09:20"
-        if "time_complete" in row and not row["time_complete"]:
-            row["time_complete"] = "09:40"
-
-    if target_table == "LOAD_OPDWAITLISTDEF":
-        if "deferral_start" in row and not row["deferral_start"]:
-            row["deferral_start"] = "01/01/2024"
-        if "deferral_end" in row and not row["deferral_end"]:
-            row["deferral_end"] = "08/01/2024"
+def _fill(default: str) -> RuleFn:
+    return lambda value, row, source_row, row_num: value or default
+
+
+def _upper_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    return _upper(value)
+
+
+def _digits_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def _main_crn_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    return value or (source_row.get("InternalPatientNumber") or source_row.get("Intpatno") or "").strip()
+
+
+def _title_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    return value or _default_title(row.get("sex", ""))
+
+
+def _discharge_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    # Default a missing discharge to three days after a parseable admission date.
+    return value or _days_after(row.get("admit_date", ""), 3)
+
+
+def _bed_rule(value: str, row: Mapping[str, str], source_row: Mapping[str, str], row_num: int) -> str:
+    return value or f"BED{row_num:03d}"
+
+
+register_domain_plugin(
+    DomainPlugin(
+        "pmi",
+        ("LOAD_PMI*",),
+        {
+            "main_crn_type": _fill("PAS"),
+            "main_crn": _main_crn_rule,
+            "nhs_number": _digits_rule,
+            "title": _title_rule,
+            "date_registered": _fill("01/01/2000"),
+            "pat_name_1": _upper_rule,
+            "pat_name_family": _upper_rule,
+            "post_code": _upper_rule,
+        },
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "pmi_addresses",
+        ("LOAD_PMIADDRS",),
+        {"address_type": _fill("H"), "applies_start": _fill("01/01/2000"), "applies_end": _fill("31/12/9999")},
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "pmi_contacts",
+        ("LOAD_PMICONTACTS",),
+        {"contact_type": _fill("NOK"), "applies_start": _fill("01/01/2000"), "applies_end": _fill("31/12/9999")},
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "adt_admissions",
+        ("LOAD_ADT_ADMISSIONS",),
+        {
+            "estimated_discharge_date": _discharge_rule,
+            "discharge_date": _discharge_rule,
+            "admission_type": _fill("ELEC"),
+            "admit_type": _fill("E"),
+        },
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "adt_episodes",
+        ("LOAD_ADT_EPISODES",),
+        {"episode_order": _fill("1"), "duration_of_episode": _fill("3")},
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "adt_wardstays",
+        ("LOAD_ADT_WARDSTAYS",),
+        {"is_home_stay": _fill("N"), "is_awol": _fill("N"), "bed_location": _bed_rule},
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "opd_appointments",
+        ("LOAD_OPD_APPOINTMENTS",),
+        {
+            "walkin_flag": _fill("N"),
+            "time_arrived": _fill("09:00"),
+            "time_seen": _fill("09:20"),
+            "time_complete": _fill("09:40"),
+        },
+    )
+)
+register_domain_plugin(
+    DomainPlugin(
+        "opd_deferrals",
+        ("LOAD_OPDWAITLISTDEF",),
+        {"deferral_start": _fill("01/01/2024"), "deferral_end": _fill("08/01/2024")},
+    )
+)
+
+
+def compile_domain_plugins(target_table: str, headers: Sequence[str]) -> Optional[RowPlugin]:
+    """Bind the rules of every plugin that applies to this table and has its column present.
+
+    Rules are bound to column positions in `headers`, so the returned function updates the
+    view's value list directly. Returns None when nothing applies, so the caller can skip
+    the plugin step entirely.
+    """
+    index = HeaderIndex(headers)
+    bound: List[Tuple[int, RuleFn]] = []
+    for plugin in DOMAIN_PLUGINS:
+        if not plugin.applies_to(target_table):
+            continue
+        bound.extend((index.positions[col], rule) for col, rule in plugin.rules.items() if col in index.positions)
+    if not bound:
+        return None
+
+    def apply(row: TargetRowView, source_row: Mapping[str, str], row_num: int) -> None:
+        values = row.values
+        for pos, rule in bound:
+            values[pos] = rule(values[pos], row, source_row, row_num)
+
+    return apply
+
+
+def apply_domain_plugins(target_table: str, row: Dict[str, str], source_row: Mapping[str, str], row_num: int) -> None:
+    """Apply the table's plugins to a dict row in place (convenience for one-off rows)."""
+    headers = tuple(row)
+    apply = _compiled_for(target_table, headers)
+    if apply is not None:
+        view = TargetRowView(HeaderIndex(headers), list(row.values()))
+        apply(view, source_row, row_num)
+        row.update(zip(headers, view.values))
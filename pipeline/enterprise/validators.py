@@ -1,30 +1,124 @@
-from datetime import datetime
+import re
+from typing import List, Optional, Sequence
+
+
+# Modulus-11 weights for the first nine NHS number digits.
+_NHS_WEIGHTS = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+# The day, month and year forms strptime accepts for "%d/%m/%Y".
+_DATE_DDMMYYYY = re.compile(r"(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])/(1[0-2]|0[1-9]|[1-9])/(\d\d\d\d)")
+_MONTH_DAYS = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_ASCII_DIGITS = frozenset("0123456789")
+
+
+def _numpy():
+    # NumPy only speeds the batch checks up; without it they fall back to a Python loop.
+    try:
+        import numpy  # type: ignore
+    except Exception:
+        return None
+    return numpy
+
+
+def _date_ok(day: int, month: int, year: int) -> bool:
+    if year < 1 or day > _MONTH_DAYS[month]:
+        return False
+    return month != 2 or day < 29 or (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0))
 
 
 def is_valid_date_ddmmyyyy(value: str) -> bool:
     if not value:
         return True
-    try:
-        datetime.strptime(value, "%d/%m/%Y")
-        return True
-    except ValueError:
-        return False
+    m = _DATE_DDMMYYYY.fullmatch(value)
+    return m is not None and _date_ok(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+
+
+def nhs_check_digit(base9: str) -> Optional[str]:
+    """Check digit for nine NHS number digits; None when the remainder makes them unusable."""
+    chk = 11 - sum(int(ch) * w for ch, w in zip(base9, _NHS_WEIGHTS)) % 11
+    if chk == 11:
+        return "0"
+    if chk == 10:
+        return None
+    return str(chk)
+
+
+def _nhs_digits(value: str) -> str:
+    if len(value) == 10 and value.isdigit():
+        return value
+    return "".join(ch for ch in value if ch.isdigit())
 
 
 def is_valid_nhs_number(value: str) -> bool:
-    digits = "".join(ch for ch in value if ch.isdigit())
+    digits = _nhs_digits(value)
     if len(digits) != 10:
         return False
-    base9 = digits[:9]
-    check = int(digits[9])
-    total = 0
-    for idx, ch in enumerate(base9):
-        total += int(ch) * (10 - idx)
-    rem = total % 11
-    expected = 11 - rem
-    if expected == 11:
-        expected = 0
-    if expected == 10:
-        return False
-    return check == expected
+    return nhs_check_digit(digits[:9]) == str(int(digits[9]))
+
+
+def _ascii_digit_matrix(np, strings: Sequence[str], width: int):
+    """(len(strings), width) array of digit values for equal-width ASCII digit strings."""
+    buf = "".join(strings).encode("ascii")
+    return np.frombuffer(buf, dtype=np.uint8).reshape(len(strings), width).astype(np.int64) - 48
+
+
+def nhs_check_digits(base9s: Sequence[str]) -> List[Optional[str]]:
+    """`nhs_check_digit` over a column of nine-digit strings."""
+    np = _numpy()
+    if np is None or not base9s or not all(len(b) == 9 and _ASCII_DIGITS.issuperset(b) for b in base9s):
+        return [nhs_check_digit(b) for b in base9s]
+    chk = 11 - (_ascii_digit_matrix(np, base9s, 9) @ np.array(_NHS_WEIGHTS)) % 11
+    return [None if c == 10 else str(c % 11) for c in chk.tolist()]
+
+
+def nhs_number_mask(values: Sequence[str]) -> List[bool]:
+    """`is_valid_nhs_number` over a column: True where the value passes the modulus-11 check."""
+    np = _numpy()
+    if np is None:
+        return [is_valid_nhs_number(v) for v in values]
+    digits = [_nhs_digits(v) for v in values]
+    mask = [False] * len(digits)
+    # Non-ASCII digits (which isdigit accepts) are rare; check them one at a time.
+    rows = []
+    for i, d in enumerate(digits):
+        if len(d) == 10:
+            if d.isascii():
+                rows.append(i)
+            else:
+                mask[i] = is_valid_nhs_number(d)
+    if rows:
+        m = _ascii_digit_matrix(np, [digits[i] for i in rows], 10)
+        expected = (11 - (m[:, :9] @ np.array(_NHS_WEIGHTS)) % 11) % 11
+        ok = (expected != 10) & (m[:, 9] == expected)
+        for i, v in zip(rows, ok.tolist()):
+            mask[i] = v
+    return mask
+
 
+def date_ddmmyyyy_mask(values: Sequence[str]) -> List[bool]:
+    """`is_valid_date_ddmmyyyy` over a column; blank values pass."""
+    np = _numpy()
+    if np is None:
+        return [is_valid_date_ddmmyyyy(v) for v in values]
+    mask = [True] * len(values)
+    # Zero-padded DD/MM/YYYY is the usual shape; anything else takes the regex path.
+    rows = []
+    for i, v in enumerate(values):
+        if len(v) == 10 and v[2] == "/" and v[5] == "/" and v.isascii():
+            rows.append(i)
+        elif v:
+            mask[i] = is_valid_date_ddmmyyyy(v)
+    if rows:
+        raw = np.frombuffer("".join(values[i] for i in rows).encode("ascii"), dtype=np.uint8).reshape(len(rows), 10)
+        digit_cols = [0, 1, 3, 4, 6, 7, 8, 9]
+        m = raw[:, digit_cols].astype(np.int64) - 48
+        digits_ok = ((m >= 0) & (m <= 9)).all(axis=1)
+        day = m[:, 0] * 10 + m[:, 1]
+        month = m[:, 2] * 10 + m[:, 3]
+        year = m[:, 4] * 1000 + m[:, 5] * 100 + m[:, 6] * 10 + m[:, 7]
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_days = np.array(_MONTH_DAYS)[np.clip(month, 0, 12)] - ((month == 2) & ~leap)
+        ok = digits_ok & (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+        for i, v, plain in zip(rows, ok.tolist(), digits_ok.tolist()):
+            # e.g. " 5/03/2020", which strptime accepts
+            mask[i] = v if plain else is_valid_date_ddmmyyyy(values[i])
+    return mask
@@ -25,6 +25,8 @@ import argparse
 from pathlib import Path
 from datetime import date
 
+from enterprise.validators import nhs_check_digit, nhs_check_digits
+
 # ────────────────────────────────────────────────────────────────────────────
 # Paths
 # ────────────────────────────────────────────────────────────────────────────
@@ -180,35 +182,27 @@ def p(i):
     return ACTIVE_PATIENTS[i % len(ACTIVE_PATIENTS)]
 
 
-def _nhs_check_digit(base9: str):
-    total = 0
-    for idx, ch in enumerate(base9):
-        total += int(ch) * (10 - idx)
-    rem = total % 11
-    chk = 11 - rem
-    if chk == 11:
-        return "0"
-    if chk == 10:
-        return None
-    return str(chk)
-
-
-def _make_nhs_number(seed_num: int):
-    # Build a valid 10-digit NHS number.
-    n = seed_num
-    while True:
-        base9 = "{:09d}".format(n % 1_000_000_000)
-        check = _nhs_check_digit(base9)
-        if check is not None:
-            return base9 + check
-        n += 1
+def _make_nhs_numbers(first_seed: int, count: int):
+    # Build valid 10-digit NHS numbers for seeds first_seed .. first_seed + count - 1; a seed
+    # whose digits have no check digit moves on to the next seed that has one.
+    bases = ["{:09d}".format(n % 1_000_000_000) for n in range(first_seed, first_seed + count)]
+    out = []
+    for n, base9, check in zip(range(first_seed, first_seed + count), bases, nhs_check_digits(bases)):
+        while check is None:
+            n += 1
+            base9 = "{:09d}".format(n % 1_000_000_000)
+            check = nhs_check_digit(base9)
+        out.append(base9 + check)
+    return out
 
 
 def _build_patient_roster(rows):
     roster = list(PATIENTS[: min(rows, len(PATIENTS))])
+    # NHS number of patient idx (1-based) comes from seed 943476590 + idx.
+    nhs_numbers = _make_nhs_numbers(943476591, max(rows, len(roster)))
     # Ensure first seed cohort also uses checksum-valid NHS numbers.
     for idx, rec in enumerate(roster, start=1):
-        rec["nhs"] = _make_nhs_number(943476590 + idx)
+        rec["nhs"] = nhs_numbers[idx - 1]
     if rows <= len(roster):
         return roster
 
@@ -225,7 +219,7 @@ def _build_patient_roster(rows):
 
     for idx in range(len(roster) + 1, rows + 1):
         mrn = "MRN{:05d}".format(10000 + idx)
-        nhs = _make_nhs_number(943476590 + idx)
+        nhs = nhs_numbers[idx - 1]
         sex = "1" if idx % 2 else "2"
         year = 1945 + (idx % 55)
         month = ((idx - 1) % 12) + 1
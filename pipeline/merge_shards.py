@@ -0,0 +1,102 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from enterprise.contract_etl import merge_contract_shards
+from enterprise.output_formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+from enterprise.shards import find_shard_dirs
+from enterprise.sinks import IssueSink, RejectSink
+from run_contract_migration import report_paths, resolve_load_target, write_run_reports
+
+
+def _parse_args():
+    p = argparse.ArgumentParser(
+        description="Merge the shard_<i>_of_<N> outputs of run_contract_migration.py --shard into one set of target tables and reports."
+    )
+    p.add_argument(
+        "--output-dir",
+        default="mock_data/target_contract",
+        help="Folder holding the shard folders (relative to data_migration root); merged tables are written here.",
+    )
+    p.add_argument(
+        "--target-catalog-file",
+        default="schemas/target_schema_catalog.csv",
+        help="Target schema catalog CSV path relative to data_migration root (column types for --load-target).",
+    )
+    p.add_argument(
+        "--output-format",
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=sorted(OUTPUT_FORMATS),
+        help="Format of the merged tables; shards may have been written in any format.",
+    )
+    p.add_argument(
+        "--load-target",
+        default="",
+        help="Also bulk-load every merged table into staging LOAD_ tables: sqlite:///path.db or postgresql://...",
+    )
+    p.add_argument("--load-schema", default="public", help="PostgreSQL schema for staging tables.")
+    p.add_argument(
+        "--load-untyped",
+        action="store_true",
+        help="Create staging columns as text instead of the target catalog types.",
+    )
+    return p.parse_args()
+
+
+def main():
+    args = _parse_args()
+    root = Path(__file__).resolve().parents[1]
+    output_dir = root / args.output_dir
+    target_catalog_csv = root / args.target_catalog_file
+    load_target = resolve_load_target(root, args.load_target, target_catalog_csv, args.load_schema, args.load_untyped)
+
+    try:
+        shards = find_shard_dirs(output_dir)
+    except ValueError as ex:
+        raise SystemExit(str(ex))
+    # Run settings are the same in every shard (the merge checks); take them from shard 1.
+    shard_report_path = report_paths(shards[0][1])["report_json"]
+    shard_report = json.loads(shard_report_path.read_text(encoding="utf-8")) if shard_report_path.exists() else {}
+    inherited = ("source_dir", "contract_file", "target_catalog_file", "crosswalk_dir", "impute_mode", "crosswalk_normalisation", "reject_sample_cap")
+
+    report_dir = root / "reports"
+    paths = report_paths(report_dir)
+    started = time.perf_counter()
+    with IssueSink(paths["issues_csv"]) as issues, RejectSink(paths["rejects_csv"]) as rejects:
+        try:
+            stats, _, _ = merge_contract_shards(
+                output_dir,
+                issue_sink=issues,
+                reject_sink=rejects,
+                output_format=args.output_format,
+                load_target=load_target,
+            )
+        except ValueError as ex:
+            raise SystemExit(str(ex))
+    elapsed = round(time.perf_counter() - started, 3)
+
+    report = write_run_reports(
+        report_dir,
+        stats,
+        issues,
+        rejects,
+        elapsed,
+        {
+            **{key: shard_report[key] for key in inherited if key in shard_report},
+            "output_dir": str(output_dir),
+            "output_format": args.output_format,
+            "merged_shards": [str(folder) for _, folder in shards],
+            "load_target": load_target.display_name if load_target is not None else "",
+        },
+    )
+
+    print("Shard merge completed.")
+    print("Status:", report["status"])
+    print("Shards merged:", len(shards))
+    print("Tables written:", report["tables_written"])
+    print("Report:", paths["report_json"])
+
+
+if __name__ == "__main__":
+    main()
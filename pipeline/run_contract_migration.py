@@ -1,12 +1,20 @@
 import argparse
 import csv
 import json
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from enterprise.contract_etl import build_contract_targets
-from enterprise.io import write_issues_csv
+from enterprise.bulk_load import LoadTarget, load_column_types
+from enterprise.contract_etl import TableRunStats, build_contract_targets
+from enterprise.crosswalks import KEY_NORMALISATIONS
+from enterprise.output_formats import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS
+from enterprise.sampling import DEFAULT_SAMPLE_SEED, DEFAULT_SAMPLE_STRATEGY, SAMPLE_STRATEGIES, SampleSpec, proportion_interval
+from enterprise.shards import ShardSpec
+from enterprise.telemetry import STAGES
+from enterprise.sinks import DEFAULT_REJECT_SAMPLE_CAP, IssueSink, RejectSink
+from enterprise.source_cache import DEFAULT_BUDGET_MB
 
 
 def _parse_args():
@@ -38,12 +46,96 @@ def _parse_args():
         default="schemas/crosswalks",
         help="Crosswalk directory containing source_value->target_value CSV files.",
     )
+    p.add_argument(
+        "--crosswalk-normalise",
+        nargs="*",
+        default=[],
+        choices=KEY_NORMALISATIONS,
+        help="Fallback key folding for crosswalk lookups after the exact match: case, space (collapse whitespace), zeros (leading zeros on numeric codes).",
+    )
     p.add_argument(
         "--impute-mode",
         default="strict",
         choices=["strict", "pre_production"],
         help="strict keeps only mapped values; pre_production applies fallback imputation for completeness testing.",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to build target tables in parallel (1 = in-process, sequential).",
+    )
+    p.add_argument(
+        "--source-cache-mb",
+        type=int,
+        default=DEFAULT_BUDGET_MB,
+        help="Memory budget for source tables shared by several target tables (0 disables the cache).",
+    )
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip target tables whose inputs are unchanged since the last run and reuse their recorded stats.",
+    )
+    p.add_argument(
+        "--reject-sample-cap",
+        type=int,
+        default=DEFAULT_REJECT_SAMPLE_CAP,
+        help="Detailed reject rows kept per (table, field, crosswalk, value); counts stay exact (0 = counts only).",
+    )
+    p.add_argument(
+        "--output-format",
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=sorted(OUTPUT_FORMATS),
+        help="Target table file format; parquet and arrow are columnar and require pyarrow.",
+    )
+    p.add_argument(
+        "--load-target",
+        default="",
+        help="Also bulk-load every built table into staging LOAD_ tables: sqlite:///path.db (relative to data_migration root) or postgresql://... (requires psycopg2).",
+    )
+    p.add_argument(
+        "--load-schema",
+        default="public",
+        help="PostgreSQL schema for staging tables.",
+    )
+    p.add_argument(
+        "--load-untyped",
+        action="store_true",
+        help="Create staging columns as text instead of the target catalog types.",
+    )
+    p.add_argument(
+        "--profile-stages",
+        action="store_true",
+        help="Time source read, transform, crosswalk, plugin and write stages per table (adds per-row overhead).",
+    )
+    p.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record peak tracemalloc memory per table (slows the build down noticeably).",
+    )
+    p.add_argument(
+        "--overlap-io",
+        action="store_true",
+        help="Parse base sources ahead on a reader thread and write output on a writer thread, overlapping I/O with transforms (helps most on network storage).",
+    )
+    p.add_argument(
+        "--shard",
+        default="",
+        help="Build only shard i/N of every base source (rows split by patient-key hash) into <output-dir>/shard_<i>_of_<N>, with its own reports there; combine with merge_shards.py.",
+    )
+    p.add_argument(
+        "--sample",
+        type=int,
+        default=0,
+        help="Dry run on at most N rows of every base source, into <output-dir>/sample_<strategy>_<N> with its own reports; the report extrapolates ratios to the full extract (0 = full run).",
+    )
+    p.add_argument(
+        "--sample-strategy",
+        default=DEFAULT_SAMPLE_STRATEGY,
+        choices=SAMPLE_STRATEGIES,
+        help="head: first N rows; random: seeded random rows; patients: whole patients chosen by seeded patient-key hash, the same patients in every table.",
+    )
+    p.add_argument("--sample-seed", type=int, default=DEFAULT_SAMPLE_SEED, help="Seed for the random and patients samples.")
     return p.parse_args()
 
 
@@ -57,100 +149,355 @@ def _write_stats_csv(path: Path, stats_rows: List[Dict[str, str]]) -> None:
         "columns_populated",
         "mapped_fields",
         "column_population_ratio",
-    ]
+        "rows_loaded",
+        "elapsed_s",
+        "rows_per_sec",
+        "peak_traced_kb",
+    ] + [f"{stage}_s" for stage in STAGES]
     with path.open("w", encoding="utf-8", newline="") as f:
         w = csv.DictWriter(f, fieldnames=fields)
         w.writeheader()
         w.writerows(stats_rows)
 
 
-def _write_rejects_csv(path: Path, rows: List[Dict[str, str]]) -> None:
+def _write_column_stats_csv(path: Path, rows: List[Dict[str, object]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    fields = ["severity", "category", "table_name", "field_name", "record_id", "source_value", "crosswalk_name", "message"]
+    fields = [
+        "target_table",
+        "column_name",
+        "rows_written",
+        "populated_count",
+        "population_ratio",
+        "distinct_estimate",
+        "distinct_exact",
+        "max_length",
+    ]
     with path.open("w", encoding="utf-8", newline="") as f:
         w = csv.DictWriter(f, fieldnames=fields)
         w.writeheader()
         w.writerows(rows)
 
 
-def main():
-    args = _parse_args()
-    root = Path(__file__).resolve().parents[1]
-    source_dir = root / args.source_dir
-    output_dir = root / args.output_dir
-    contract_csv = root / args.contract_file
-    target_catalog_csv = root / args.target_catalog_file
-    crosswalk_dir = root / args.crosswalk_dir
+def _write_sample_estimates_csv(path: Path, rows: List[Dict[str, object]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fields = [
+        "target_table",
+        "metric",
+        "column_name",
+        "sample_rows",
+        "sample_count",
+        "design_effect",
+        "ratio",
+        "ci95_low",
+        "ci95_high",
+        "estimated_rows",
+        "estimated_count",
+        "estimated_count_low",
+        "estimated_count_high",
+    ]
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        w.writerows(rows)
 
-    stats, issues, rejects = build_contract_targets(
-        root=root,
-        source_dir=source_dir,
-        output_dir=output_dir,
-        contract_csv=contract_csv,
-        target_catalog_csv=target_catalog_csv,
-        crosswalk_dir=crosswalk_dir,
-        impute_mode=args.impute_mode,
-    )
 
-    stats_rows = []
+def _sample_estimates(stats: List[TableRunStats], rejects: RejectSink, sample: SampleSpec) -> List[Dict[str, object]]:
+    """Extrapolate each sampled table to its full source: row counts, column population
+    ratios and per-field crosswalk reject rates, with approximate 95% intervals on the
+    ratios. A head sample is not random, so it gets no intervals; a patients sample counts
+    each patient once (see proportion_interval)."""
+    reject_counts: Dict[tuple, int] = {}
+    for (table, field_name, _, _), n in rejects.counts.items():
+        reject_counts[(table, field_name)] = reject_counts.get((table, field_name), 0) + n
+    out: List[Dict[str, object]] = []
     for s in stats:
-        ratio = round((s.columns_populated / s.columns_total), 4) if s.columns_total else 0.0
-        stats_rows.append(
+        if s.source_rows_total is None:
+            continue
+        scale = s.source_rows_total / s.source_rows_sampled if s.source_rows_sampled else 1.0
+        estimated_rows = int(round(s.rows_written * scale))
+        design_effect = 1.0
+        if s.source_patients_sampled:
+            design_effect = s.source_rows_sampled / s.source_patients_sampled
+        out.append(
             {
                 "target_table": s.target_table,
-                "source_table": s.source_table,
-                "rows_written": s.rows_written,
-                "columns_total": s.columns_total,
-                "columns_populated": s.columns_populated,
-                "mapped_fields": s.mapped_fields,
-                "column_population_ratio": ratio,
+                "metric": "rows_written",
+                "column_name": "",
+                "sample_rows": s.source_rows_sampled,
+                "sample_count": s.rows_written,
+                "estimated_rows": estimated_rows,
+                "estimated_count": estimated_rows,
             }
         )
+        measured = [("column_populated", c["column_name"], int(c["populated_count"])) for c in s.column_stats]
+        measured += [
+            ("crosswalk_reject", field_name, n)
+            for (table, field_name), n in sorted(reject_counts.items())
+            if table == s.target_table
+        ]
+        for metric, column, count in measured:
+            ratio, low, high = proportion_interval(count, s.rows_written, estimated_rows, design_effect)
+            row = {
+                "target_table": s.target_table,
+                "metric": metric,
+                "column_name": column,
+                "sample_rows": s.rows_written,
+                "sample_count": count,
+                "ratio": round(ratio, 4),
+                "estimated_rows": estimated_rows,
+                "estimated_count": int(round(ratio * estimated_rows)),
+            }
+            if sample.representative:
+                row.update(
+                    {
+                        "design_effect": round(design_effect, 4),
+                        "ci95_low": round(low, 4),
+                        "ci95_high": round(high, 4),
+                        "estimated_count_low": int(round(low * estimated_rows)),
+                        "estimated_count_high": int(round(high * estimated_rows)),
+                    }
+                )
+            out.append(row)
+    return out
+
+
+def resolve_load_target(root: Path, url: str, target_catalog_csv: Path, schema: str, untyped: bool) -> Optional[LoadTarget]:
+    if not url:
+        return None
+    if url.startswith("sqlite:///") and not Path(url[len("sqlite:///"):]).is_absolute():
+        url = f"sqlite:///{root / url[len('sqlite:///'):]}"
+    return LoadTarget(url, load_column_types(target_catalog_csv), schema=schema, typed=not untyped)
 
-    stats_csv = root / "reports" / "contract_migration_table_stats.csv"
-    _write_stats_csv(stats_csv, stats_rows)
 
-    issues_csv = root / "reports" / "contract_migration_issues.csv"
-    write_issues_csv(issues_csv, issues)
-    rejects_csv = root / "reports" / "contract_migration_rejects.csv"
-    _write_rejects_csv(rejects_csv, rejects)
+def report_paths(report_dir: Path) -> Dict[str, Path]:
+    return {
+        "table_stats_csv": report_dir / "contract_migration_table_stats.csv",
+        "column_stats_csv": report_dir / "contract_migration_column_stats.csv",
+        "issues_csv": report_dir / "contract_migration_issues.csv",
+        "rejects_csv": report_dir / "contract_migration_rejects.csv",
+        "reject_summary_csv": report_dir / "contract_migration_reject_summary.csv",
+        "report_json": report_dir / "contract_migration_report.json",
+    }
+
+
+def write_run_reports(
+    report_dir: Path,
+    stats: List[TableRunStats],
+    issues: IssueSink,
+    rejects: RejectSink,
+    elapsed: float,
+    settings: Dict[str, object],
+    sample: Optional[SampleSpec] = None,
+) -> Dict[str, object]:
+    """Write the stats, column stats, reject summary and report JSON for a finished run.
+
+    Issues and rejects have already been streamed to their CSVs through the sinks. A
+    `sample` run also gets its full-extract estimates.
+    """
+    paths = report_paths(report_dir)
+    rejects.write_summary(paths["reject_summary_csv"])
+
+    stats_rows = []
+    column_rows = []
+    telemetry = []
+    for s in stats:
+        ratio = round((s.columns_populated / s.columns_total), 4) if s.columns_total else 0.0
+        # Reused tables were not built this run, so they carry no timings.
+        rows_per_sec = round(s.rows_written / s.elapsed_s, 1) if s.elapsed_s and not s.reused else ""
+        row = {
+            "target_table": s.target_table,
+            "source_table": s.source_table,
+            "rows_written": s.rows_written,
+            "columns_total": s.columns_total,
+            "columns_populated": s.columns_populated,
+            "mapped_fields": s.mapped_fields,
+            "column_population_ratio": ratio,
+            "rows_loaded": "" if s.rows_loaded is None else s.rows_loaded,
+            "elapsed_s": "" if s.reused else s.elapsed_s,
+            "rows_per_sec": rows_per_sec,
+            "peak_traced_kb": "" if s.peak_traced_kb is None else s.peak_traced_kb,
+        }
+        for stage in STAGES:
+            row[f"{stage}_s"] = s.stage_seconds.get(stage, "")
+        stats_rows.append(row)
+        if not s.reused:
+            telemetry.append(
+                {
+                    "target_table": s.target_table,
+                    "rows_written": s.rows_written,
+                    "elapsed_s": s.elapsed_s,
+                    "rows_per_sec": rows_per_sec or None,
+                    "peak_traced_kb": s.peak_traced_kb,
+                    "stage_seconds": s.stage_seconds or None,
+                }
+            )
+        for c in s.column_stats:
+            populated = int(c["populated_count"])
+            column_rows.append(
+                {
+                    "target_table": s.target_table,
+                    "column_name": c["column_name"],
+                    "rows_written": s.rows_written,
+                    "populated_count": populated,
+                    "population_ratio": round(populated / s.rows_written, 4) if s.rows_written else 0.0,
+                    "distinct_estimate": c["distinct_estimate"],
+                    "distinct_exact": "Y" if c["distinct_exact"] else "N",
+                    "max_length": c["max_length"],
+                }
+            )
+
+    _write_stats_csv(paths["table_stats_csv"], stats_rows)
+    _write_column_stats_csv(paths["column_stats_csv"], column_rows)
 
     total_rows = sum(s.rows_written for s in stats)
     total_cols = sum(s.columns_total for s in stats)
     total_populated = sum(s.columns_populated for s in stats)
 
-    sev_counts = {"ERROR": 0, "WARN": 0, "INFO": 0}
-    for i in issues:
-        sev_counts[i["severity"]] = sev_counts.get(i["severity"], 0) + 1
+    sev_counts = issues.severity_counts
 
     report = {
         "run_at_utc": datetime.now(timezone.utc).isoformat(),
         "status": "PASS" if sev_counts.get("ERROR", 0) == 0 else "FAIL",
-        "source_dir": str(source_dir),
-        "output_dir": str(output_dir),
-        "contract_file": str(contract_csv),
-        "target_catalog_file": str(target_catalog_csv),
-        "crosswalk_dir": str(crosswalk_dir),
-        "impute_mode": args.impute_mode,
+        **settings,
+        "elapsed_s": elapsed,
+        "rows_per_sec": round(sum(s.rows_written for s in stats if not s.reused) / elapsed, 1) if elapsed else 0.0,
         "tables_written": len(stats),
+        "tables_reused": sum(1 for s in stats if s.reused),
         "rows_written_total": total_rows,
+        "rows_loaded_total": sum(s.rows_loaded or 0 for s in stats),
         "columns_total": total_cols,
         "columns_populated": total_populated,
         "overall_column_population_ratio": round(total_populated / total_cols, 4) if total_cols else 0.0,
         "issue_counts": sev_counts,
-        "crosswalk_reject_count": len(rejects),
-        "table_stats_csv": str(stats_csv),
-        "issues_csv": str(issues_csv),
-        "rejects_csv": str(rejects_csv),
+        "crosswalk_reject_count": rejects.total,
+        "crosswalk_reject_groups": len(rejects.counts),
+        "crosswalk_reject_rows_sampled": rejects.rows_written,
+        **{name: str(path) for name, path in paths.items() if name != "report_json"},
+        # Slowest tables first.
+        "table_telemetry": sorted(telemetry, key=lambda t: -t["elapsed_s"]),
     }
-    report_path = root / "reports" / "contract_migration_report.json"
-    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    estimates = _sample_estimates(stats, rejects, sample) if sample is not None else []
+    if estimates:
+        estimates_csv = report_dir / "contract_migration_sample_estimates.csv"
+        _write_sample_estimates_csv(estimates_csv, estimates)
+        sampled = [s for s in stats if s.source_rows_total is not None]
+        reject_estimates = [e for e in estimates if e["metric"] == "crosswalk_reject"]
+        report["sample_estimates"] = {
+            "source_rows_sampled": sum(s.source_rows_sampled for s in sampled),
+            "source_rows_total": sum(s.source_rows_total for s in sampled),
+            "rows_written": sum(e["sample_count"] for e in estimates if e["metric"] == "rows_written"),
+            "estimated_rows_written": sum(e["estimated_rows"] for e in estimates if e["metric"] == "rows_written"),
+            "estimates_csv": str(estimates_csv),
+            # Most rejected fields first, as the full extract would see them.
+            "crosswalk_rejects": sorted(reject_estimates, key=lambda e: -e["estimated_count"]),
+        }
+    paths["report_json"].write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def main():
+    args = _parse_args()
+    root = Path(__file__).resolve().parents[1]
+    source_dir = root / args.source_dir
+    output_dir = root / args.output_dir
+    contract_csv = root / args.contract_file
+    target_catalog_csv = root / args.target_catalog_file
+    crosswalk_dir = root / args.crosswalk_dir
+    report_dir = root / "reports"
+    shard = None
+    if args.shard:
+        try:
+            shard = ShardSpec.parse(args.shard)
+        except ValueError as ex:
+            raise SystemExit(str(ex))
+        if args.load_target:
+            raise SystemExit("--load-target cannot be combined with --shard; pass it to merge_shards.py instead.")
+        # Each shard keeps its tables and partial reports together for merge_shards.py.
+        output_dir = output_dir / shard.dir_name
+        report_dir = output_dir
+    sample = None
+    if args.sample:
+        try:
+            sample = SampleSpec(args.sample, args.sample_strategy, args.sample_seed)
+        except ValueError as ex:
+            raise SystemExit(str(ex))
+        if shard is not None or args.load_target:
+            raise SystemExit("--sample cannot be combined with --shard or --load-target.")
+        # A dry run must not overwrite the full run's tables and reports.
+        output_dir = output_dir / sample.dir_name
+        report_dir = output_dir
+
+    load_target = resolve_load_target(root, args.load_target, target_catalog_csv, args.load_schema, args.load_untyped)
+
+    # Issues and rejects stream straight to their CSVs while the tables are built.
+    paths = report_paths(report_dir)
+    started = time.perf_counter()
+    with IssueSink(paths["issues_csv"]) as issues, RejectSink(paths["rejects_csv"]) as rejects:
+        stats, _, _ = build_contract_targets(
+            root=root,
+            source_dir=source_dir,
+            output_dir=output_dir,
+            contract_csv=contract_csv,
+            target_catalog_csv=target_catalog_csv,
+            crosswalk_dir=crosswalk_dir,
+            impute_mode=args.impute_mode,
+            workers=max(1, args.workers),
+            source_cache_mb=args.source_cache_mb,
+            incremental=args.incremental,
+            issue_sink=issues,
+            reject_sink=rejects,
+            reject_sample_cap=args.reject_sample_cap,
+            output_format=args.output_format,
+            load_target=load_target,
+            crosswalk_normalisation=args.crosswalk_normalise,
+            profile_stages=args.profile_stages,
+            trace_memory=args.trace_memory,
+            shard=shard,
+            overlap_io=args.overlap_io,
+            sample=sample,
+        )
+    elapsed = round(time.perf_counter() - started, 3)
+
+    report = write_run_reports(
+        report_dir,
+        stats,
+        issues,
+        rejects,
+        elapsed,
+        {
+            "source_dir": str(source_dir),
+            "output_dir": str(output_dir),
+            "contract_file": str(contract_csv),
+            "target_catalog_file": str(target_catalog_csv),
+            "crosswalk_dir": str(crosswalk_dir),
+            "impute_mode": args.impute_mode,
+            "crosswalk_normalisation": args.crosswalk_normalise,
+            "output_format": args.output_format,
+            "workers": max(1, args.workers),
+            "shard": str(shard) if shard is not None else "",
+            "sample": str(sample) if sample is not None else "",
+            "sample_representative": sample.representative if sample is not None else None,
+            "overlap_io": args.overlap_io,
+            "stage_profiling": args.profile_stages,
+            "memory_tracing": args.trace_memory,
+            "incremental": args.incremental,
+            "load_target": load_target.display_name if load_target is not None else "",
+            "reject_sample_cap": args.reject_sample_cap,
+        },
+        sample,
+    )
 
     print("Contract-driven migration pipeline completed.")
     print("Status:", report["status"])
     print("Tables written:", report["tables_written"])
     print("Output directory:", output_dir)
-    print("Report:", report_path)
+    if "sample_estimates" in report:
+        est = report["sample_estimates"]
+        print(
+            f"Sample {sample}: {est['source_rows_sampled']} of {est['source_rows_total']} source rows built; "
+            f"estimated full-run rows: {est['estimated_rows_written']}"
+        )
+    print("Report:", paths["report_json"])
 
 
 if __name__ == "__main__":
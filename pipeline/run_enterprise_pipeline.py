@@ -9,6 +9,7 @@ from enterprise.checks import (
     check_target_referential_integrity,
 )
 from enterprise.io import write_issues_csv
+from enterprise.key_index import DEFAULT_BLOOM_BITS_PER_KEY, DEFAULT_KEY_INDEX, DEFAULT_SQLITE_CACHE_MB, KEY_INDEXES
 
 
 def _parse_args():
@@ -20,6 +21,29 @@ def _parse_args():
         default="reports/mapping_contract.csv",
         help="Mapping contract CSV path (relative to data_migration root).",
     )
+    p.add_argument(
+        "--ri-key-index",
+        default=DEFAULT_KEY_INDEX,
+        choices=sorted(KEY_INDEXES),
+        help="Where target RI checks hold parent keys: memory, or sqlite (Bloom filter plus an on-disk index, for tables too large for RAM).",
+    )
+    p.add_argument(
+        "--ri-work-dir",
+        default="",
+        help="Folder for the sqlite key index files (relative to data_migration root; default: system temp).",
+    )
+    p.add_argument(
+        "--ri-bloom-bits-per-key",
+        type=int,
+        default=DEFAULT_BLOOM_BITS_PER_KEY,
+        help="Bloom filter bits per parent key for --ri-key-index sqlite.",
+    )
+    p.add_argument(
+        "--ri-cache-mb",
+        type=int,
+        default=DEFAULT_SQLITE_CACHE_MB,
+        help="SQLite page cache per open key index for --ri-key-index sqlite.",
+    )
     return p.parse_args()
 
 
@@ -33,7 +57,14 @@ def main():
     issues = []
     issues.extend(check_source_quality(source_dir, args.min_patients))
     issues.extend(check_mapping_contract(contract_path))
-    issues.extend(check_target_referential_integrity(target_dir))
+    index_options = {}
+    if args.ri_key_index == "sqlite":
+        index_options = {
+            "work_dir": root / args.ri_work_dir if args.ri_work_dir else None,
+            "bits_per_key": args.ri_bloom_bits_per_key,
+            "cache_mb": args.ri_cache_mb,
+        }
+    issues.extend(check_target_referential_integrity(target_dir, key_index=args.ri_key_index, index_options=index_options))
 
     issues_rows = [i.__dict__ for i in issues]
     issues_csv = root / "reports" / "enterprise_pipeline_issues.csv"
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise.bulk_load import LoadTarget
+from enterprise.contract_etl import _StreamingTableWriter
+from enterprise.output_formats import open_table_output
+
+
+def _writer(target: LoadTarget, folder: Path) -> _StreamingTableWriter:
+    return _StreamingTableWriter(open_table_output(folder, "LOAD_PMI", ["x"], "csv"), [target.open_table("LOAD_PMI", ["x"])])
+
+
+def test_failed_build_keeps_the_loaded_table(tmp_path):
+    target = LoadTarget(f"sqlite:///{tmp_path / 'staging.db'}", {})
+    with _writer(target, tmp_path) as writer:
+        for i in range(5):
+            writer.write_values([str(i)])
+
+    with pytest.raises(RuntimeError):
+        with _writer(target, tmp_path) as writer:
+            writer.write_values(["9"])
+            raise RuntimeError("build failed")
+
+    assert target.count_rows("LOAD_PMI") == 5
+    assert not list(tmp_path.glob("*.stage"))
@@ -0,0 +1,84 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise.contract_etl import _plan_joins
+from enterprise.joins import JoinIndexCache, join_rows
+from enterprise.rows import HeaderIndex
+
+
+def _write_csv(path: Path, rows) -> None:
+    with path.open("w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def _secondary(path: Path, field: str, per_key: int) -> None:
+    rows = [["InternalPatientNumber", "EpisodeNumber", field]]
+    for patient in ("P1", "P2"):
+        rows.extend([patient, "E1", f"{field}-{patient}-{n}"] for n in range(per_key))
+    _write_csv(path, rows)
+
+
+def test_two_one_to_many_secondaries_expand_on_one_driver(tmp_path):
+    _secondary(tmp_path / "FCEEXT.csv", "Diag", 3)
+    _secondary(tmp_path / "CONSEPISODE.csv", "Cons", 3)
+    base = HeaderIndex(["InternalPatientNumber", "EpisodeNumber"])
+
+    layout, issues = _plan_joins(
+        "LOAD_ADT_ARCHIVE",
+        base,
+        ["CONSEPISODE", "FCEEXT"],
+        tmp_path,
+        None,
+        JoinIndexCache(),
+        {"CONSEPISODE": ["Cons"], "FCEEXT": ["Diag", "DiagDate"]},
+    )
+    rows = list(join_rows([["P1", "E1"], ["P2", "E1"]], layout))
+
+    assert issues == []
+    assert [j.source_table for j in layout.joins if j.expand] == ["FCEEXT"]
+    # One row per FCEEXT match, not 3 x 3 per base row.
+    assert len(rows) == 6
+    diag = layout.resolve("FCEEXT", "Diag")
+    cons = layout.resolve("CONSEPISODE", "Cons")
+    assert [r[diag] for r in rows[:3]] == ["Diag-P1-0", "Diag-P1-1", "Diag-P1-2"]
+    assert {r[cons] for r in rows[:3]} == {"Cons-P1-0"}
+
+
+def test_non_expanding_target_takes_first_match(tmp_path):
+    _secondary(tmp_path / "FCEEXT.csv", "Diag", 3)
+    base = HeaderIndex(["InternalPatientNumber", "EpisodeNumber"])
+    layout, _ = _plan_joins("LOAD_ADT_EPISODES", base, ["FCEEXT"], tmp_path, None, JoinIndexCache())
+    rows = list(join_rows([["P1", "E1"], ["P3", "E1"]], layout))
+
+    assert rows == [["P1", "E1", "P1", "E1", "Diag-P1-0"], ["P3", "E1", "", "", ""]]
+
+
+def test_base_column_wins_over_joined_column(tmp_path):
+    _write_csv(
+        tmp_path / "CPSGREFERRAL.csv",
+        [["InternalPatientNumber", "EpisodeNumber", "ReceivedDate", "Urgency"], ["P1", "E1", "02/02/2020", "U"]],
+    )
+    base = HeaderIndex(["InternalPatientNumber", "EpisodeNumber", "ReceivedDate"])
+    mapped = {"CPSGREFERRAL": ["ReceivedDate", "Urgency"]}
+
+    layout, _ = _plan_joins("LOAD_CMTY_APPOINTMENTS", base, ["CPSGREFERRAL"], tmp_path, None, JoinIndexCache(), mapped)
+    rows = list(join_rows([["P1", "E1", "01/01/2020"], ["P2", "E1", "03/03/2020"]], layout))
+
+    # ReceivedDate keeps the base source's value, hit or miss; only Urgency is joined.
+    received = layout.resolve("CPSGREFERRAL", "ReceivedDate")
+    urgency = layout.resolve("CPSGREFERRAL", "Urgency")
+    assert [(r[received], r[urgency]) for r in rows] == [("01/01/2020", "U"), ("03/03/2020", "")]
+
+
+def test_secondary_fully_covered_by_base_is_not_joined(tmp_path):
+    _secondary(tmp_path / "CPSGREFERRAL.csv", "ReceivedDate", 3)
+    base = HeaderIndex(["InternalPatientNumber", "EpisodeNumber", "ReceivedDate"])
+
+    layout, _ = _plan_joins(
+        "LOAD_OPD_ARCHIVE", base, ["CPSGREFERRAL"], tmp_path, None, JoinIndexCache(), {"CPSGREFERRAL": ["ReceivedDate"]}
+    )
+
+    assert layout.joins == []
@@ -0,0 +1,78 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise import source_cache
+from enterprise.contract_etl import _TableTask, _prefetch_base_rows
+from enterprise.source_cache import SourceTableCache
+
+
+def _pmi_task(source_dir: Path) -> _TableTask:
+    return _TableTask(
+        target_table="patient",
+        field_rules={},
+        headers=[],
+        date_fields=set(),
+        base_source="PMI",
+        join_sources=[],
+        source_dir=source_dir,
+        output_dir=source_dir / "out",
+        crosswalks={},
+        impute_mode="strict",
+        reject_sample_cap=0,
+        output_format="csv",
+        load_target=None,
+        profile_stages=False,
+        shard=None,
+        overlap_io=True,
+        sample=None,
+    )
+
+
+def _gated_loads(monkeypatch):
+    """Hold every cache fill until the returned `release` event is set.
+
+    Returns the threads that ran a fill, `release`, and a `loaded` event set once a fill
+    has finished. A fill made on the calling thread would hold it until the wait times out.
+    """
+    threads = []
+    release = threading.Event()
+    loaded = threading.Event()
+    load = source_cache._load_columns
+
+    def gated_load(path, budget_bytes):
+        threads.append(threading.get_ident())
+        release.wait(5)
+        try:
+            return load(path, budget_bytes)
+        finally:
+            loaded.set()
+
+    monkeypatch.setattr(source_cache, "_load_columns", gated_load)
+    return threads, release, loaded
+
+
+def test_shared_source_is_cached_on_the_reader_thread(tmp_path, monkeypatch):
+    (tmp_path / "PMI.csv").write_text("InternalPatientNumber,Surname\nP1,Smith\nP2,Jones\n")
+    threads, release, loaded = _gated_loads(monkeypatch)
+    cache = SourceTableCache(1 << 20, {tmp_path / "PMI.csv": 2})
+    task = _pmi_task(tmp_path)
+
+    first = _prefetch_base_rows(task, cache)
+    second = _prefetch_base_rows(task, cache)
+    # Both opens returned while the parse is still held, so it overlaps this thread.
+    opened_before_load = not loaded.is_set()
+    release.set()
+    rows = [[list(r) for r in first], [list(r) for r in second]]
+    first.close()
+    second.close()
+
+    # The parse ran once, off this thread.
+    assert opened_before_load
+    assert threads and threading.get_ident() not in threads
+    assert len(threads) == 1
+    assert rows[0] == rows[1] == [["InternalPatientNumber", "Surname"], ["P1", "Smith"], ["P2", "Jones"]]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size_bytes == 0
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from enterprise.sinks import TableRejects
+
+
+def test_detail_rows_are_capped_per_table_and_kept_out_of_the_manifest(tmp_path):
+    rejects = TableRejects("LOAD_PMI", sample_cap=2, table_cap=5)
+    for row in range(1, 101):
+        rejects.add("sex", "sex", f"V{row % 50}", row)
+
+    assert rejects.total == 100
+    assert len(rejects.counts) == 50
+    assert len(rejects.details) == 5
+    assert set(rejects.to_dict()) == {"counts"}
+
+    rejects.save_details(tmp_path)
+    restored = TableRejects.from_dict("LOAD_PMI", rejects.to_dict(), 2, tmp_path)
+    assert restored.counts == rejects.counts
+    assert restored.details == rejects.details
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class SourceTargetConnector(ABC):
@@ -14,3 +14,7 @@ class SourceTargetConnector(ABC):
     @abstractmethod
     def sample_rows(self, table_name: str, limit: int = 20) -> List[Dict[str, str]]:
         raise NotImplementedError
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        """Row count when the connector can get it cheaply, else None."""
+        return None
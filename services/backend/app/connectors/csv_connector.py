@@ -1,10 +1,24 @@
 import csv
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from ..pipeline_support import csv_row_count
 from .base import SourceTargetConnector
 
 
+# Columnar target outputs (run_contract_migration --output-format) are served alongside CSV.
+COLUMNAR_SUFFIXES = (".parquet", ".arrow")
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # type: ignore
+    except Exception as ex:
+        raise NotImplementedError("Columnar table dependency missing. Install pyarrow to read parquet/arrow tables.") from ex
+    return pyarrow
+
+
 class CsvFolderConnector(SourceTargetConnector):
     def __init__(self, folder: Path):
         self.folder = folder
@@ -12,9 +26,24 @@ class CsvFolderConnector(SourceTargetConnector):
     def list_tables(self) -> List[str]:
         if not self.folder.exists():
             return []
-        return sorted(p.stem for p in self.folder.glob("*.csv"))
+        names = {p.stem for p in self.folder.glob("*.csv")}
+        for suffix in COLUMNAR_SUFFIXES:
+            names.update(p.stem for p in self.folder.glob(f"*{suffix}"))
+        return sorted(names)
+
+    def _columnar_path(self, table_name: str) -> Optional[Path]:
+        if (self.folder / f"{table_name}.csv").exists():
+            return None
+        for suffix in COLUMNAR_SUFFIXES:
+            p = self.folder / f"{table_name}{suffix}"
+            if p.exists():
+                return p
+        return None
 
     def describe_table(self, table_name: str) -> List[Dict[str, str]]:
+        columnar = self._columnar_path(table_name)
+        if columnar is not None:
+            return [{"column_name": h, "inferred_type": "string"} for h in self._columnar_schema(columnar)]
         path = self.folder / f"{table_name}.csv"
         if not path.exists():
             return []
@@ -23,9 +52,56 @@ class CsvFolderConnector(SourceTargetConnector):
         return [{"column_name": h, "inferred_type": "string"} for h in headers]
 
     def sample_rows(self, table_name: str, limit: int = 20) -> List[Dict[str, str]]:
+        columnar = self._columnar_path(table_name)
+        if columnar is not None:
+            return self._columnar_sample(columnar, limit)
         path = self.folder / f"{table_name}.csv"
         if not path.exists():
             return []
         with path.open("r", encoding="utf-8", newline="") as f:
-            rows = list(csv.DictReader(f))
-        return rows[: max(0, limit)]
+            return list(islice(csv.DictReader(f), max(0, limit)))
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        columnar = self._columnar_path(table_name)
+        if columnar is not None:
+            return self._columnar_count(columnar)
+        path = self.folder / f"{table_name}.csv"
+        if not path.exists():
+            return None
+        return csv_row_count(path)
+
+    def _columnar_schema(self, path: Path) -> List[str]:
+        pa = _pyarrow()
+        if path.suffix == ".parquet":
+            import pyarrow.parquet as pq  # type: ignore
+
+            return list(pq.read_schema(str(path)).names)
+        with pa.memory_map(str(path)) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+
+    def _columnar_count(self, path: Path) -> int:
+        pa = _pyarrow()
+        if path.suffix == ".parquet":
+            import pyarrow.parquet as pq  # type: ignore
+
+            # Row counts come from the footer metadata; no data pages are read.
+            return pq.ParquetFile(str(path)).metadata.num_rows
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+    def _columnar_sample(self, path: Path, limit: int) -> List[Dict[str, str]]:
+        pa = _pyarrow()
+        limit = max(0, limit)
+        if path.suffix == ".parquet":
+            import pyarrow.parquet as pq  # type: ignore
+
+            # Read only the leading row group(s) needed for the sample.
+            batches = pq.ParquetFile(str(path)).iter_batches(batch_size=max(1, limit))
+            batch = next(batches, None)
+            rows = batch.to_pylist() if batch is not None else []
+        else:
+            with pa.memory_map(str(path)) as source:
+                reader = pa.ipc.open_file(source)
+                rows = reader.get_batch(0).slice(0, limit).to_pylist() if reader.num_record_batches else []
+        return [{k: "" if v is None else str(v) for k, v in r.items()} for r in rows[:limit]]
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .csv_connector import CsvFolderConnector
 
@@ -28,3 +28,7 @@ class CacheIrisEmulatorConnector:
     def sample_rows(self, table_name: str, limit: int = 20) -> List[Dict[str, str]]:
         local = table_name.split(".")[-1].upper()
         return self._csv.sample_rows(local, limit=limit)
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        local = table_name.split(".")[-1].upper()
+        return self._csv.count_rows(local)
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .csv_connector import CsvFolderConnector
 
@@ -36,3 +36,7 @@ class PostgresEmulatorConnector:
         for r in rows:
             out.append({k.lower(): v for k, v in r.items()})
         return out
+
+    def count_rows(self, table_name: str) -> Optional[int]:
+        local = table_name.split(".")[-1]
+        return self._csv.count_rows(local.upper())
@@ -35,6 +35,7 @@ from .models import (
 from .audit_store import AuditStore
 from .saas_store import DEFAULT_DMM_PERMISSIONS, SaaSStore
 from .security import create_token, decode_token, parse_bearer_token
+from .pipeline_support import nhs_number_mask
 from .services.artifact_service import profile_schema, read_csv, read_json
 from .state_store import RuntimeStateStore
 
@@ -42,6 +43,8 @@ MAPPING_WORKBENCH_FILE = REPORTS_DIR / "mapping_workbench.json"
 QUALITY_HISTORY_FILE = REPORTS_DIR / "quality_history.json"
 QUALITY_KPI_CONFIG_FILE = REPORTS_DIR / "quality_kpi_config.json"
 SNAPSHOT_DIR = REPORTS_DIR / "snapshots"
+# Target table files produced by run_contract_migration in any --output-format.
+TARGET_TABLE_PATTERNS = ("*.csv", "*.parquet", "*.arrow")
 SAAS_STORE_FILE = DATA_MIGRATION_ROOT / "services" / "backend" / "data" / "saas_store.json"
 VERSION_MANIFEST_FILE = DATA_MIGRATION_ROOT / "services" / "version_manifest.json"
 DOCS_DIR = DATA_MIGRATION_ROOT / "docs"
@@ -491,7 +494,7 @@ def _compute_source_kpi_rows() -> List[Dict[str, object]]:
     nhs_nonblank = [v for v in nhs_values if v]
     dup_count = len(nhs_nonblank) - len(set(nhs_nonblank))
     missing_nhs = len([v for v in nhs_values if not v])
-    invalid_nhs = len([v for v in nhs_nonblank if not re.match(r"^\d{10}$", v)])
+    invalid_nhs = nhs_number_mask(nhs_nonblank).count(False)
 
     postcode_values = [_nonnul(r.get(post_col, "")) for r in pat_rows] if post_col else []
     missing_postcode = len([v for v in postcode_values if not v])
@@ -599,14 +602,16 @@ def _create_snapshot(label: str) -> str:
         "contract_migration_issues.csv",
         "enterprise_pipeline_issues.csv",
         "contract_migration_rejects.csv",
+        "contract_migration_reject_summary.csv",
     ]
     for fn in report_files:
         _copy_if_exists(REPORTS_DIR / fn, root / "reports" / fn)
 
     target_contract_dir = DATA_MIGRATION_ROOT / "mock_data" / "target_contract"
     if target_contract_dir.exists():
-        for p in target_contract_dir.glob("*.csv"):
-            _copy_if_exists(p, root / "target_contract" / p.name)
+        for pattern in TARGET_TABLE_PATTERNS:
+            for p in target_contract_dir.glob(pattern):
+                _copy_if_exists(p, root / "target_contract" / p.name)
 
     metadata = {
         "snapshot_id": snap_id,
@@ -637,10 +642,11 @@ def _restore_snapshot(snapshot_id: str) -> None:
         _copy_if_exists(p, REPORTS_DIR / p.name)
     target_contract_dir = DATA_MIGRATION_ROOT / "mock_data" / "target_contract"
     target_contract_dir.mkdir(parents=True, exist_ok=True)
-    for p in target_contract_dir.glob("*.csv"):
-        p.unlink(missing_ok=True)
-    for p in (root / "target_contract").glob("*.csv"):
-        _copy_if_exists(p, target_contract_dir / p.name)
+    for pattern in TARGET_TABLE_PATTERNS:
+        for p in target_contract_dir.glob(pattern):
+            p.unlink(missing_ok=True)
+        for p in (root / "target_contract").glob(pattern):
+            _copy_if_exists(p, target_contract_dir / p.name)
 
 
 def _bootstrap_workbench() -> List[Dict[str, object]]:
@@ -1908,6 +1914,7 @@ def connector_explore(spec: ConnectorSpec, request: Request):
         previews[t] = {
             "columns": connector.describe_table(t)[:50],
             "sample_rows": connector.sample_rows(t, limit=5),
+            "row_count": connector.count_rows(t),
         }
     return {
         "connector_type": spec.connector_type,
@@ -1952,6 +1959,7 @@ def connector_preview(payload: Dict[str, Any], request: Request):
         "table_name": table_name,
         "columns": connector.describe_table(table_name)[:200],
         "sample_rows": connector.sample_rows(table_name, limit=limit),
+        "row_count": connector.count_rows(table_name),
         "available_tables": len(tables),
     }
 
@@ -1987,14 +1995,14 @@ def connector_types():
 def default_csv_source():
     connector = build_connector("csv", str(Path(MOCK_SOURCE_DIR)))
     tables = connector.list_tables()
-    return {"table_count": len(tables), "tables": tables}
+    return {"table_count": len(tables), "tables": tables, "row_counts": {t: connector.count_rows(t) for t in tables}}
 
 
 @app.get("/api/connectors/default/csv-target-contract")
 def default_csv_target_contract():
     connector = build_connector("csv", str(Path(MOCK_TARGET_CONTRACT_DIR)))
     tables = connector.list_tables()
-    return {"table_count": len(tables), "tables": tables}
+    return {"table_count": len(tables), "tables": tables, "row_counts": {t: connector.count_rows(t) for t in tables}}
 
 
 @app.post("/api/runs/execute")
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+# The pipeline is shipped next to the backend (repo root, /app in the image); its row
+# counter and validators are shared so the API and the migration agree. This is the one
+# place the backend puts it on the import path.
+_PIPELINE_DIR = Path(__file__).resolve().parents[3] / "pipeline"
+if str(_PIPELINE_DIR) not in sys.path:
+    sys.path.append(str(_PIPELINE_DIR))
+
+from enterprise.io import count_csv_rows  # noqa: E402
+from enterprise.validators import nhs_number_mask  # noqa: E402
+
+__all__ = ["csv_row_count", "nhs_number_mask"]
+
+
+def csv_row_count(path: Path) -> int:
+    """Data rows of a CSV file, without parsing it; cached until the file changes."""
+    if not path.exists():
+        return 0
+    return count_csv_rows(path)